@@ -0,0 +1,16 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth import get_user_model
+
+
+class ScopedModelBackend(ModelBackend):
+    # Load the session user together with the relations nearly every view
+    # touches, so request.user.assigned_ministry / volunteer_profile are free.
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related(
+                'assigned_ministry', 'volunteer_profile'
+            ).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+from .scope import MinistryScope
+
+
+class MinistryScopeMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.scope = SimpleLazyObject(lambda: MinistryScope(request.user))
+        return self.get_response(request)
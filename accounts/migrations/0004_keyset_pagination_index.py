@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_assigned_ministry_user_is_suspended'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['created_at', 'id'], name='accounts_user_created_id_idx'),
+        ),
+    ]
@@ -24,6 +24,9 @@ class User(AbstractUser):
     updated_at = models.DateTimeField(auto_now=True)
     is_suspended = models.BooleanField(default=False, help_text='Suspended users cannot log in')
     
+    class Meta(AbstractUser.Meta):
+        indexes = [models.Index(fields=['created_at', 'id'], name='accounts_user_created_id_idx')]
+    
     def __str__(self):
         return f"{self.get_full_name() or self.username} ({self.get_role_display()})"
     
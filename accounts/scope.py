@@ -0,0 +1,42 @@
+from django.utils.functional import cached_property
+
+
+class MinistryScope:
+    # Per-request view of what the current user manages. Built lazily by
+    # MinistryScopeMiddleware and exposed as request.scope; the id sets are
+    # loaded at most once per request.
+    def __init__(self, user):
+        self.user = user
+        self.ministry = None
+        self.is_ministry_staff = False
+        if user.is_authenticated:
+            self.ministry = user.get_managed_ministry()
+            self.is_ministry_staff = user.is_priest() or user.is_coordinator()
+
+    @property
+    def ministry_id(self):
+        return self.ministry.id if self.ministry else None
+
+    @cached_property
+    def volunteer_ids(self):
+        if self.ministry is None:
+            return frozenset()
+        return frozenset(self.ministry.volunteers.values_list('id', flat=True))
+
+    @cached_property
+    def event_ids(self):
+        if self.ministry is None:
+            return frozenset()
+        return frozenset(self.ministry.events.values_list('id', flat=True))
+
+    def manages_volunteer(self, volunteer):
+        if self.ministry is None:
+            return False
+        # A single check is one EXISTS query; only reuse the id set when
+        # something in this request has already loaded it.
+        if 'volunteer_ids' in self.__dict__:
+            return volunteer.pk in self.volunteer_ids
+        return self.ministry.volunteers.filter(pk=volunteer.pk).exists()
+
+    def manages_event(self, event):
+        return self.ministry is not None and event.ministry_id == self.ministry.id
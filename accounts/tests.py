@@ -1,3 +1,22 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from ccvms.testing import QueryCountMixin
+from .models import User
 
-# Create your tests here.
+
+@override_settings(AUDIT_ASYNC=False)
+class UserViewQueryTests(QueryCountMixin, TestCase):
+    def test_delete_loads_the_user_once(self):
+        admin = User.objects.create_user('admin', role='administrator')
+        other = User.objects.create_user('other', role='volunteer')
+        self.client.force_login(admin)
+        # Checked on POST, which redirects. The signed-in user accounts for
+        # the other read.
+        self.assertReads(reverse('accounts:user_delete', args=[other.pk]), User, times=2, method='post')
+    
+    def test_sessions_from_the_plain_model_backend_still_resolve(self):
+        user = User.objects.create_user('old', role='volunteer')
+        self.client.force_login(user, backend='django.contrib.auth.backends.ModelBackend')
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user, user)
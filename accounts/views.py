@@ -8,6 +8,9 @@ from django.db import transaction
 from django.db.models import Q
 from volunteers.models import Volunteer
 from .forms import VolunteerSignupForm, UserManagementForm, UserEditForm
+from ccvms.mixins import CachedObjectMixin
+from ccvms.pagination import KeysetPaginationMixin
+from audit.writer import record
 from .models import User
 
 
@@ -48,7 +51,7 @@ def volunteer_signup(request):
     return render(request, 'accounts/signup.html', {'form': form})
 
 
-class UserListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class UserListView(LoginRequiredMixin, UserPassesTestMixin, KeysetPaginationMixin, ListView):
     model = User
     template_name = 'accounts/user_list.html'
     context_object_name = 'users'
@@ -110,7 +113,7 @@ class UserUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         return super().form_valid(form)
 
 
-class UserDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class UserDeleteView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, DeleteView):
     model = User
     template_name = 'accounts/user_confirm_delete.html'
     success_url = reverse_lazy('accounts:user_list')
@@ -138,6 +141,7 @@ class UserSuspendView(LoginRequiredMixin, UserPassesTestMixin, View):
         user.save()
         
         status = 'suspended' if user.is_suspended else 'unsuspended'
+        record('suspend', f'{status.capitalize()} user {user.username}', obj=user, request=request)
         messages.success(request, f'{user.get_full_name()} has been {status}.')
         return redirect('accounts:user_list')
 
@@ -158,10 +162,11 @@ class AssignRoleView(LoginRequiredMixin, UserPassesTestMixin, View):
         if current_user.is_administrator():
             target_user.role = new_role
             target_user.save()
+            record('assign', f'Changed role of {target_user.username} to {new_role}', obj=target_user, request=request)
             messages.success(request, f'{target_user.get_full_name()} role changed to {target_user.get_role_display()}.')
         
         elif current_user.is_priest():
-            ministry = current_user.get_managed_ministry()
+            ministry = request.scope.ministry
             if not ministry:
                 messages.error(request, 'You must be assigned to a ministry to change roles.')
                 return redirect('accounts:user_list')
@@ -178,13 +183,14 @@ class AssignRoleView(LoginRequiredMixin, UserPassesTestMixin, View):
                 messages.error(request, 'Target user must have a volunteer profile.')
                 return redirect('accounts:user_list')
             
-            if not target_user.volunteer_profile.ministries.filter(id=ministry.id).exists():
+            if not request.scope.manages_volunteer(target_user.volunteer_profile):
                 messages.error(request, 'You can only promote volunteers within your ministry.')
                 return redirect('accounts:user_list')
             
             target_user.role = new_role
             target_user.assigned_ministry = ministry
             target_user.save()
+            record('assign', f'Promoted {target_user.username} to coordinator of {ministry.name}', obj=target_user, request=request)
             messages.success(request, f'{target_user.get_full_name()} promoted to Coordinator of {ministry.name}.')
         else:
             messages.error(request, 'You do not have permission to assign roles.')
@@ -205,10 +211,12 @@ class AssignMinistryView(LoginRequiredMixin, UserPassesTestMixin, View):
             ministry = get_object_or_404(Ministry, pk=ministry_id)
             target_user.assigned_ministry = ministry
             target_user.save()
+            record('assign', f'Assigned {target_user.username} to ministry {ministry.name}', obj=target_user, request=request)
             messages.success(request, f'{target_user.get_full_name()} has been assigned to {ministry.name}.')
         else:
             target_user.assigned_ministry = None
             target_user.save()
+            record('assign', f'Removed {target_user.username} from their ministry', obj=target_user, request=request)
             messages.success(request, f'{target_user.get_full_name()} has been removed from their ministry.')
         
         return redirect('accounts:user_list')
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0001_initial'),
+        ('events', '0003_event_counter_caches'),
+        ('volunteers', '0004_keyset_pagination_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['marked_at', 'id'], name='attendance_marked_at_id_idx'),
+        ),
+    ]
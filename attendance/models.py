@@ -1,4 +1,5 @@
-from django.db import models
+from collections import Counter
+from django.db import models, transaction
 from django.conf import settings
 
 class Attendance(models.Model):
@@ -19,6 +20,48 @@ class Attendance(models.Model):
     class Meta:
         unique_together = ('event', 'volunteer')
         ordering = ['-marked_at']
+        indexes = [models.Index(fields=['marked_at', 'id'], name='attendance_marked_at_id_idx')]
     
     def __str__(self):
         return f"{self.volunteer} - {self.event.title} ({self.get_status_display()})"
+
+    @classmethod
+    def bulk_mark(cls, event, entries, marked_by=None):
+        # entries: {volunteer_id: (status, notes)}. One transaction and a fixed
+        # number of queries whatever the roster size, apart from the upsert,
+        # which Django splits at SQLite's bound-parameter limit (one statement
+        # per 166 rows); returns per-status counts.
+        from reports.models import DashboardStats
+        from events.recommendations import invalidate
+        from communications.push import publish_attendance
+        from ccvms import fragments
+
+        valid_statuses = dict(cls.STATUS_CHOICES)
+        records = [
+            cls(event=event, volunteer_id=volunteer_id, status=status, notes=notes, marked_by=marked_by)
+            for volunteer_id, (status, notes) in entries.items()
+            if status in valid_statuses
+        ]
+        if not records:
+            return Counter()
+        
+        with transaction.atomic():
+            existing = set(
+                cls.objects.filter(event=event, volunteer_id__in=[r.volunteer_id for r in records])
+                .values_list('volunteer_id', flat=True)
+            )
+            cls.objects.bulk_create(
+                records,
+                update_conflicts=True,
+                unique_fields=['event', 'volunteer'],
+                update_fields=['status', 'notes', 'marked_by'],
+            )
+            # bulk_create skips post_save, so keep the dashboard counter and
+            # widgets, the recommendation features and live dashboards in step
+            # here.
+            DashboardStats.apply_deltas({'total_attendance': len(records) - len(existing)})
+            invalidate(record.volunteer_id for record in records)
+            publish_attendance(event)
+            transaction.on_commit(lambda: fragments.bump(cls))
+        
+        return Counter(record.status for record in records)
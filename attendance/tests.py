@@ -1,3 +1,80 @@
-from django.test import TestCase
+import datetime
+import math
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from ccvms.testing import QueryCountMixin
+from events.models import Event
+from ministries.models import Ministry
+from volunteers.models import Volunteer
+from .models import Attendance
 
-# Create your tests here.
+
+@override_settings(AUDIT_ASYNC=False)
+class AttendanceViewQueryTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        ministry = Ministry.objects.create(name='Choir', description='')
+        self.admin = User.objects.create_user('admin', role='administrator')
+        start = timezone.now() - datetime.timedelta(days=1)
+        event = Event.objects.create(
+            title='Mass',
+            description='',
+            location='Church',
+            ministry=ministry,
+            start_datetime=start,
+            end_datetime=start + datetime.timedelta(hours=1),
+        )
+        user = User.objects.create_user('volunteer', role='volunteer')
+        volunteer = Volunteer.objects.create(user=user, gender='F', age=30)
+        self.attendance = Attendance.objects.create(event=event, volunteer=volunteer, status='present')
+        self.client.force_login(self.admin)
+    
+    def test_edit_and_delete_load_the_record_once(self):
+        for name in ('edit', 'delete'):
+            with self.subTest(name):
+                self.assertReads(reverse(f'attendance:{name}', args=[self.attendance.pk]), Attendance)
+
+
+@override_settings(AUDIT_ASYNC=False)
+class BulkMarkQueryTests(TestCase):
+    def setUp(self):
+        self.ministry = Ministry.objects.create(name='Choir', description='')
+        self.start = timezone.now() - datetime.timedelta(days=1)
+    
+    def event_with_roster(self, size):
+        event = Event.objects.create(
+            title=f'Mass for {size}',
+            description='',
+            location='Church',
+            ministry=self.ministry,
+            start_datetime=self.start,
+            end_datetime=self.start + datetime.timedelta(hours=1),
+        )
+        users = User.objects.bulk_create([User(username=f'volunteer{size}-{i}', role='volunteer') for i in range(size)])
+        volunteers = Volunteer.objects.bulk_create([Volunteer(user=user, gender='F', age=30) for user in users])
+        return event, {volunteer.pk: ('present', '') for volunteer in volunteers}
+    
+    def count_queries(self, size):
+        # (other queries, INSERT statements) for marking a roster of `size`,
+        # twice so the update path is measured as well as the insert.
+        event, entries = self.event_with_roster(size)
+        counts = []
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                Attendance.bulk_mark(event, entries)
+            inserts = sum(query['sql'].startswith('INSERT INTO "attendance_attendance"') for query in queries)
+            counts.append((len(queries) - inserts, inserts))
+        return counts
+    
+    def test_query_count_does_not_grow_with_the_roster(self):
+        small, large = self.count_queries(10), self.count_queries(500)
+        self.assertEqual([other for other, _ in small], [other for other, _ in large])
+        # The upsert is one statement per batch Django splits it into at the
+        # backend's bound-parameter limit, not one per row.
+        fields = [field for field in Attendance._meta.concrete_fields if not field.primary_key]
+        batch_size = connection.ops.bulk_batch_size(fields, [None] * 500)
+        self.assertEqual([inserts for _, inserts in small], [1, 1])
+        self.assertEqual([inserts for _, inserts in large], [math.ceil(500 / batch_size)] * 2)
@@ -4,13 +4,15 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.db.models import Count, Q
+from ccvms.mixins import CachedObjectMixin
+from ccvms.pagination import KeysetPaginationMixin
 from .models import Attendance
 from .forms import AttendanceForm, BulkAttendanceForm
 from events.models import Event
 from volunteers.models import Volunteer
 
 
-class AttendanceListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class AttendanceListView(LoginRequiredMixin, UserPassesTestMixin, KeysetPaginationMixin, ListView):
     model = Attendance
     template_name = 'attendance/list.html'
     context_object_name = 'attendance_records'
@@ -29,15 +31,9 @@ class AttendanceListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
         if status:
             queryset = queryset.filter(status=status)
         
-        user = self.request.user
-        if user.is_coordinator():
-            ministry = user.get_managed_ministry()
-            if ministry:
-                queryset = queryset.filter(event__ministry=ministry)
-        elif user.is_priest():
-            ministry = user.get_managed_ministry()
-            if ministry:
-                queryset = queryset.filter(event__ministry=ministry)
+        scope = self.request.scope
+        if scope.is_ministry_staff and scope.ministry:
+            queryset = queryset.filter(event__ministry=scope.ministry)
         
         return queryset
 
@@ -53,10 +49,10 @@ class AttendanceCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     
     def get_form(self, form_class=None):
         form = super().get_form(form_class)
-        user = self.request.user
+        scope = self.request.scope
         
-        if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
+        if scope.is_ministry_staff:
+            ministry = scope.ministry
             if ministry:
                 form.fields['event'].queryset = Event.objects.filter(ministry=ministry, is_active=True)
                 form.fields['volunteer'].queryset = Volunteer.objects.filter(ministries=ministry, is_active=True)
@@ -67,17 +63,16 @@ class AttendanceCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         return form
     
     def form_valid(self, form):
-        user = self.request.user
+        scope = self.request.scope
         event = form.cleaned_data['event']
         volunteer = form.cleaned_data['volunteer']
         
-        if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
-            if not ministry or event.ministry != ministry:
+        if scope.is_ministry_staff:
+            if not scope.manages_event(event):
                 messages.error(self.request, 'You can only mark attendance for events in your ministry.')
                 return self.form_invalid(form)
             
-            if not volunteer.ministries.filter(id=ministry.id).exists():
+            if not scope.manages_volunteer(volunteer):
                 messages.error(self.request, 'You can only mark attendance for volunteers in your ministry.')
                 return self.form_invalid(form)
         
@@ -90,8 +85,9 @@ class AttendanceCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         return super().form_valid(form)
 
 
-class AttendanceUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class AttendanceUpdateView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, UpdateView):
     model = Attendance
+    select_related = ('event', 'volunteer__user')
     form_class = AttendanceForm
     template_name = 'attendance/form.html'
     success_url = reverse_lazy('attendance:list')
@@ -107,9 +103,7 @@ class AttendanceUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
             return True
         
         if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
-            if ministry and attendance.event.ministry == ministry:
-                return True
+            return self.request.scope.manages_event(attendance.event)
         
         return False
     
@@ -118,8 +112,9 @@ class AttendanceUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         return super().form_valid(form)
 
 
-class AttendanceDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class AttendanceDeleteView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, DeleteView):
     model = Attendance
+    select_related = ('event', 'volunteer__user')
     template_name = 'attendance/confirm_delete.html'
     success_url = reverse_lazy('attendance:list')
     
@@ -134,9 +129,7 @@ class AttendanceDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
             return True
         
         if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
-            if ministry and attendance.event.ministry == ministry:
-                return True
+            return self.request.scope.manages_event(attendance.event)
         
         return False
 
@@ -153,9 +146,7 @@ class BulkAttendanceView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
             return True
         
         if user.is_priest() or user.is_coordinator():
-            ministry = user.get_managed_ministry()
-            if ministry and event.ministry == ministry:
-                return True
+            return self.request.scope.manages_event(event)
         
         return False
     
@@ -183,13 +174,12 @@ class BulkAttendanceView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         return context
     
     def _get_allowed_events(self):
-        user = self.request.user
+        scope = self.request.scope
         queryset = Event.objects.filter(is_active=True)
         
-        if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
-            if ministry:
-                queryset = queryset.filter(ministry=ministry)
+        if scope.is_ministry_staff:
+            if scope.ministry:
+                queryset = queryset.filter(ministry=scope.ministry)
             else:
                 queryset = queryset.none()
         
@@ -203,22 +193,22 @@ class BulkAttendanceView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
             messages.error(request, 'You do not have permission to mark attendance for this event.')
             return redirect('attendance:bulk_mark')
         
-        updated_count = 0
-        for volunteer in event.assigned_volunteers.all():
-            status = request.POST.get(f'status_{volunteer.id}')
-            notes = request.POST.get(f'notes_{volunteer.id}', '')
-            
+        entries = {}
+        for volunteer_id in event.assigned_volunteers.values_list('id', flat=True):
+            status = request.POST.get(f'status_{volunteer_id}')
             if status:
-                Attendance.objects.update_or_create(
-                    event=event,
-                    volunteer=volunteer,
-                    defaults={
-                        'status': status,
-                        'notes': notes,
-                        'marked_by': request.user
-                    }
-                )
-                updated_count += 1
-        
-        messages.success(request, f'Attendance marked for {updated_count} volunteers.')
+                entries[volunteer_id] = (status, request.POST.get(f'notes_{volunteer_id}', ''))
+        
+        status_counts = Attendance.bulk_mark(event, entries, marked_by=request.user)
+        updated_count = sum(status_counts.values())
+        
+        breakdown = ', '.join(
+            f'{status_counts[status]} {label.lower()}'
+            for status, label in Attendance.STATUS_CHOICES
+            if status_counts[status]
+        )
+        if breakdown:
+            messages.success(request, f'Attendance marked for {updated_count} volunteers ({breakdown}).')
+        else:
+            messages.success(request, f'Attendance marked for {updated_count} volunteers.')
         return redirect('attendance:bulk_mark')
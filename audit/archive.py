@@ -0,0 +1,142 @@
+import datetime
+import gzip
+import json
+import os
+from pathlib import Path
+from django.conf import settings
+from django.db import transaction
+from .models import AuditLog
+
+ARCHIVE_FIELDS = (
+    'id', 'timestamp', 'user_id', 'user__username', 'action', 'model_name',
+    'object_id', 'description', 'ip_address', 'user_agent',
+)
+
+SEGMENT_SUFFIX = '.jsonl.gz'
+INDEX_SUFFIX = '.index.json'
+
+
+def archive_dir():
+    return Path(getattr(settings, 'AUDIT_ARCHIVE_DIR', settings.BASE_DIR / 'audit_archive'))
+
+
+def segment_name(timestamp):
+    return f'auditlog-{timestamp.astimezone(datetime.timezone.utc):%Y-%m}'
+
+
+def _serialize(row):
+    row = dict(row)
+    row['username'] = row.pop('user__username')
+    row['timestamp'] = row['timestamp'].isoformat()
+    return json.dumps(row, separators=(',', ':'))
+
+
+def load_index(name, directory=None):
+    path = (directory or archive_dir()) / f'{name}{INDEX_SUFFIX}'
+    if not path.exists():
+        return None
+    with path.open() as handle:
+        return json.load(handle)
+
+
+def _save_index(name, index, directory):
+    path = directory / f'{name}{INDEX_SUFFIX}'
+    tmp = path.with_suffix('.tmp')
+    with tmp.open('w') as handle:
+        json.dump(index, handle, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _append_segment(name, rows, directory):
+    # Each call appends one gzip member; readers see the concatenation as a
+    # single stream, so a month can be archived across several runs.
+    with gzip.open(directory / f'{name}{SEGMENT_SUFFIX}', 'at', encoding='utf-8') as handle:
+        for row in rows:
+            handle.write(_serialize(row))
+            handle.write('\n')
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    index = load_index(name, directory) or {
+        'segment': f'{name}{SEGMENT_SUFFIX}', 'count': 0, 'first': None, 'last': None,
+        'users': [], 'actions': [], 'models': [],
+    }
+    first = min(row['timestamp'] for row in rows).isoformat()
+    last = max(row['timestamp'] for row in rows).isoformat()
+    index['count'] += len(rows)
+    index['first'] = min(filter(None, [index['first'], first]))
+    index['last'] = max(filter(None, [index['last'], last]))
+    index['users'] = sorted(set(index['users']) | {row['user__username'] for row in rows if row['user__username']})
+    index['actions'] = sorted(set(index['actions']) | {row['action'] for row in rows})
+    index['models'] = sorted(set(index['models']) | {row['model_name'] for row in rows if row['model_name']})
+    _save_index(name, index, directory)
+
+
+def archive_before(cutoff, chunk_size=2000, directory=None):
+    # Moves rows older than `cutoff` out of the table one chunk at a time. A
+    # chunk is only deleted after it has been written and fsynced, so an
+    # interrupted run can at worst archive a chunk twice, never lose it.
+    directory = directory or archive_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    archived = 0
+    while True:
+        # '-id' matches the ascending rowid stored in the '-timestamp' index.
+        rows = list(
+            AuditLog.objects.filter(timestamp__lt=cutoff)
+            .order_by('timestamp', '-id')
+            .values(*ARCHIVE_FIELDS)[:chunk_size]
+        )
+        if not rows:
+            return archived
+
+        segments = {}
+        for row in rows:
+            segments.setdefault(segment_name(row['timestamp']), []).append(row)
+        for name, segment_rows in sorted(segments.items()):
+            _append_segment(name, segment_rows, directory)
+
+        with transaction.atomic():
+            AuditLog.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        archived += len(rows)
+
+
+def segments(directory=None):
+    directory = directory or archive_dir()
+    if not directory.exists():
+        return []
+    return sorted(path.name[:-len(INDEX_SUFFIX)] for path in directory.glob(f'*{INDEX_SUFFIX}'))
+
+
+def search(start=None, end=None, username=None, action=None, model_name=None, object_id=None, directory=None):
+    # Streams matching entries (oldest first) straight from the compressed
+    # segments. Segment indexes are checked first so months outside the time
+    # range, or without the requested user/action/model, are never opened.
+    directory = directory or archive_dir()
+    parse = datetime.datetime.fromisoformat
+
+    for name in segments(directory):
+        index = load_index(name, directory)
+        if start and parse(index['last']) < start or end and parse(index['first']) >= end:
+            continue
+        if username and username not in index['users']:
+            continue
+        if action and action not in index['actions']:
+            continue
+        if model_name and model_name not in index['models']:
+            continue
+
+        with gzip.open(directory / index['segment'], 'rt', encoding='utf-8') as handle:
+            for line in handle:
+                entry = json.loads(line)
+                entry['timestamp'] = parse(entry['timestamp'])
+                if start and entry['timestamp'] < start or end and entry['timestamp'] >= end:
+                    continue
+                if username and entry['username'] != username:
+                    continue
+                if action and entry['action'] != action:
+                    continue
+                if model_name and entry['model_name'] != model_name:
+                    continue
+                if object_id is not None and entry['object_id'] != object_id:
+                    continue
+                yield entry
@@ -0,0 +1,53 @@
+import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from audit import archive
+from audit.models import AuditLog
+
+
+class Command(BaseCommand):
+    help = 'Move audit log entries older than the retention period into monthly compressed archive segments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'AUDIT_RETENTION_DAYS', 365),
+            help='Keep entries newer than this many days in the database (default: AUDIT_RETENTION_DAYS).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of rows written and deleted per batch.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many entries would be archived.',
+        )
+        parser.add_argument(
+            '--vacuum',
+            action='store_true',
+            help='Run VACUUM afterwards to return the freed pages to the filesystem (SQLite only).',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+
+        if options['dry_run']:
+            count = AuditLog.objects.filter(timestamp__lt=cutoff).count()
+            self.stdout.write(f'{count} audit log entries older than {cutoff:%Y-%m-%d %H:%M} would be archived.')
+            return
+
+        archived = archive.archive_before(cutoff, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {archived} audit log entries older than {cutoff:%Y-%m-%d %H:%M} to {archive.archive_dir()}.'
+        ))
+
+        if options['vacuum'] and archived and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+            self.stdout.write('Database vacuumed.')
@@ -0,0 +1,15 @@
+from .writer import current_request
+
+
+class AuditContextMiddleware:
+    # Makes the current request available to audit receivers, which only get
+    # the model instance from Django's signals.
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
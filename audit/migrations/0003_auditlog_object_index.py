@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0002_alter_auditlog_timestamp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['model_name', 'object_id', '-timestamp'], name='audit_audit_model_n_26ea7d_idx'),
+        ),
+    ]
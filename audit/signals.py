@@ -0,0 +1,54 @@
+from django.apps import apps
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .writer import current_request, record
+
+# Models whose create/update/delete through the web UI are audited. Users are
+# only audited on create and delete; their other changes are recorded by the
+# views that make them (approve, suspend, assign role/ministry) and logins
+# would otherwise add an update entry for last_login.
+AUDITED_MODELS = [
+    'volunteers.Volunteer',
+    'ministries.Ministry',
+    'ministries.Program',
+    'events.Event',
+    'events.Task',
+    'events.EventReport',
+    'attendance.Attendance',
+    'communications.Announcement',
+    'feedback.VolunteerEvaluation',
+    'feedback.EventFeedback',
+]
+
+
+@receiver(user_logged_in)
+def audit_login(sender, request, user, **kwargs):
+    record('login', f'{user.username} logged in', user=user, request=request)
+
+
+@receiver(user_logged_out)
+def audit_logout(sender, request, user, **kwargs):
+    if user is not None:
+        record('logout', f'{user.username} logged out', user=user, request=request)
+
+
+def _audit_save(sender, instance, created, raw=False, **kwargs):
+    if raw or current_request.get() is None:
+        return
+    if created:
+        record('create', f'Created {sender._meta.verbose_name} #{instance.pk}', obj=instance)
+    elif sender is not apps.get_model('accounts', 'User'):
+        record('update', f'Updated {sender._meta.verbose_name} #{instance.pk}', obj=instance)
+
+
+def _audit_delete(sender, instance, **kwargs):
+    if current_request.get() is None:
+        return
+    record('delete', f'Deleted {sender._meta.verbose_name} #{instance.pk}', obj=instance)
+
+
+for label in AUDITED_MODELS + ['accounts.User']:
+    model = apps.get_model(label)
+    post_save.connect(_audit_save, sender=model, dispatch_uid=f'audit_save_{label}')
+    post_delete.connect(_audit_delete, sender=model, dispatch_uid=f'audit_delete_{label}')
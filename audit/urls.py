@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'audit'
+
+urlpatterns = [
+    path('', views.AuditLogListView.as_view(), name='log_list'),
+    path('archive/', views.AuditArchiveView.as_view(), name='archive'),
+]
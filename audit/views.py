@@ -0,0 +1,111 @@
+import datetime
+from django.contrib.auth import get_user_model
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.utils import timezone
+from itertools import islice
+from django.views.generic import ListView, TemplateView
+from ccvms.pagination import KeysetPaginationMixin
+from . import archive
+from .models import AuditLog
+from .signals import AUDITED_MODELS
+
+
+def _parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _start_of_day(date):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+def _time_range(params):
+    date_from = _parse_date(params.get('date_from'))
+    date_to = _parse_date(params.get('date_to'))
+    return (
+        _start_of_day(date_from) if date_from else None,
+        _start_of_day(date_to + datetime.timedelta(days=1)) if date_to else None,
+    )
+
+
+class AuditLogListView(LoginRequiredMixin, UserPassesTestMixin, KeysetPaginationMixin, ListView):
+    model = AuditLog
+    template_name = 'audit/log_list.html'
+    context_object_name = 'logs'
+    paginate_by = 50
+
+    def test_func(self):
+        return self.request.user.can_view_audit_logs()
+
+    def get_queryset(self):
+        # Every filter is an equality on the leading column(s) of one of the
+        # AuditLog indexes, with the time range and keyset cursor on timestamp
+        # after it, so each page is a single index range scan.
+        # SQLite stores the rowid ascending inside the '-timestamp' indexes, so
+        # an ascending id tiebreaker lets the page be read straight off them.
+        queryset = super().get_queryset().select_related('user').order_by('-timestamp', 'id')
+        params = self.request.GET
+
+        username = params.get('user')
+        if username:
+            user_id = get_user_model().objects.filter(username=username).values_list('pk', flat=True).first()
+            queryset = queryset.filter(user_id=user_id) if user_id else queryset.none()
+
+        action = params.get('action')
+        if action in dict(AuditLog.ACTION_CHOICES):
+            queryset = queryset.filter(action=action)
+
+        model_name = params.get('model_name')
+        if model_name:
+            queryset = queryset.filter(model_name=model_name)
+            object_id = params.get('object_id', '')
+            if object_id.isdigit():
+                queryset = queryset.filter(object_id=int(object_id))
+
+        start, end = _time_range(params)
+        if start:
+            queryset = queryset.filter(timestamp__gte=start)
+        if end:
+            queryset = queryset.filter(timestamp__lt=end)
+
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['action_choices'] = AuditLog.ACTION_CHOICES
+        context['model_names'] = sorted(AUDITED_MODELS + ['accounts.User'])
+        return context
+
+
+class AuditArchiveView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    template_name = 'audit/archive_list.html'
+    result_limit = 500
+
+    def test_func(self):
+        return self.request.user.can_view_audit_logs()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        params = self.request.GET
+        start, end = _time_range(params)
+        action = params.get('action')
+        object_id = params.get('object_id', '')
+
+        matches = archive.search(
+            start=start,
+            end=end,
+            username=params.get('user') or None,
+            action=action if action in dict(AuditLog.ACTION_CHOICES) else None,
+            model_name=params.get('model_name') or None,
+            object_id=int(object_id) if object_id.isdigit() else None,
+        )
+        logs = list(islice(matches, self.result_limit + 1))
+        context['logs'] = logs[:self.result_limit]
+        context['truncated'] = len(logs) > self.result_limit
+        context['result_limit'] = self.result_limit
+        context['segments'] = archive.segments()
+        context['action_choices'] = AuditLog.ACTION_CHOICES
+        context['model_names'] = sorted(AUDITED_MODELS + ['accounts.User'])
+        return context
@@ -0,0 +1,143 @@
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import threading
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+current_request = contextvars.ContextVar('audit_request', default=None)
+
+
+class AuditWriter:
+    # Buffers AuditLog rows in memory and writes them with bulk_create from a
+    # background thread, either every `flush_interval` seconds or as soon as
+    # `batch_size` rows are waiting. Requests only pay for a queue put.
+    def __init__(self, batch_size=100, flush_interval=2.0, max_queue=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._registered = False
+
+    def enqueue(self, entry):
+        if not getattr(settings, 'AUDIT_ASYNC', True) or not self._ensure_thread():
+            self._write([entry])
+            return
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self._write([entry])
+            return
+        if self.queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def _running(self):
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    def _ensure_thread(self):
+        if self._stopping.is_set():
+            return False
+        if self._running():
+            return True
+        with self._lock:
+            if self._running():
+                return True
+            # A forked worker inherits the queue but not the thread.
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            try:
+                self._thread.start()
+            except RuntimeError:
+                self._thread = None
+                return False
+            if not self._registered:
+                atexit.register(self.stop)
+                self._registered = True
+        return True
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            close_old_connections()
+
+    def _drain(self):
+        entries = []
+        while True:
+            try:
+                entries.append(self.queue.get_nowait())
+            except queue.Empty:
+                return entries
+
+    def flush(self):
+        entries = self._drain()
+        for start in range(0, len(entries), self.batch_size):
+            self._write(entries[start:start + self.batch_size])
+        return len(entries)
+
+    def _write(self, entries):
+        from .models import AuditLog
+        try:
+            try:
+                AuditLog.objects.bulk_create(entries)
+            except IntegrityError:
+                # A user was deleted between being audited and the flush.
+                self._detach_missing_users(entries)
+                AuditLog.objects.bulk_create(entries)
+        except Exception:
+            logger.exception('Could not write %d audit log entries.', len(entries))
+
+    def _detach_missing_users(self, entries):
+        from django.contrib.auth import get_user_model
+        user_ids = {entry.user_id for entry in entries if entry.user_id is not None}
+        existing = set(get_user_model().objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        for entry in entries:
+            if entry.user_id not in existing:
+                entry.user_id = None
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._running():
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+writer = AuditWriter(
+    batch_size=getattr(settings, 'AUDIT_BATCH_SIZE', 100),
+    flush_interval=getattr(settings, 'AUDIT_FLUSH_INTERVAL', 2.0),
+)
+
+
+def _client_ip(request):
+    return request.META.get('REMOTE_ADDR') or None
+
+
+def record(action, description, obj=None, user=None, request=None):
+    from .models import AuditLog
+    request = request or current_request.get()
+    if user is None and request is not None:
+        user = getattr(request, 'user', None)
+    if user is not None and not user.is_authenticated:
+        user = None
+
+    writer.enqueue(AuditLog(
+        user_id=user.pk if user is not None else None,
+        action=action,
+        model_name=obj._meta.label if obj is not None else '',
+        object_id=obj.pk if obj is not None else None,
+        description=description,
+        ip_address=_client_ip(request) if request is not None else None,
+        user_agent=request.META.get('HTTP_USER_AGENT', '')[:500] if request is not None else '',
+        timestamp=timezone.now(),
+    ))
@@ -3,14 +3,46 @@ ASGI config for ccvms project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Live dashboard streams (communications:stream) hold their connection open,
+so run the project under an ASGI server, e.g. ``uvicorn ccvms.asgi:application``,
+to keep them off worker threads.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
+from django.urls import reverse
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ccvms.settings')
 
-application = get_asgi_application()
+
+class StreamingASGIHandler(ASGIHandler):
+    # ASGIHandler.__call__ wraps each request in asgiref's
+    # ThreadSensitiveContext, which gives it its own thread for sync
+    # middleware and ORM calls, kept until the response finishes. An event
+    # stream never finishes, so it calls ASGIHandler.handle() directly and
+    # borrows the shared sync thread instead; idle streams then hold no
+    # thread at all. This relies on __call__ being only that wrapper around
+    # handle(), which communications.tests.StreamingASGIHandlerTests checks
+    # against the installed Django.
+    def __init__(self):
+        from communications.push import hub
+        
+        super().__init__()
+        self.stream_paths = {reverse('communications:stream')}
+        hub.serving = True
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get('path', '').removeprefix(scope.get('root_path', ''))
+        if scope['type'] == 'http' and path in self.stream_paths:
+            await self.handle(scope, receive, send)
+        else:
+            await super().__call__(scope, receive, send)
+
+
+django.setup(set_prefix=False)
+application = StreamingASGIHandler()
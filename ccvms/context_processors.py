@@ -0,0 +1,23 @@
+from functools import partial
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from . import fragments
+
+
+def render_navigation(user):
+    # The links depend only on the role, so every user with the same role and
+    # ministry shares one copy.
+    html = fragments.cached(
+        'navigation',
+        [user.role, user.assigned_ministry_id],
+        [],
+        lambda: render_to_string('nav_links.html', {'user': user}),
+    )
+    return mark_safe(html)
+
+
+def navigation(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'nav_links': partial(render_navigation, user)}
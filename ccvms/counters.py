@@ -0,0 +1,98 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete, pre_save
+
+_UNKNOWN = object()
+
+
+def related_count(queryset, fk_name):
+    # Correlated COUNT(*) of `queryset` rows pointing at the outer row, usable in
+    # annotate() or update().
+    counts = queryset.filter(**{fk_name: OuterRef('pk')}).order_by().values(fk_name).annotate(n=Count('pk')).values('n')
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def _recount(owner, counter, pks):
+    if pks:
+        owner.objects.filter(pk__in=pks).update(**{counter: owner.counter_expressions()[counter]})
+
+
+def track_m2m_count(owner, field_name, counter):
+    field = owner._meta.get_field(field_name)
+    through = field.remote_field.through
+    owner_fk = field.m2m_field_name()
+    target_fk = field.m2m_reverse_field_name()
+    stash = f'_{owner._meta.model_name}_{counter}_owner_ids'
+
+    def owner_ids_for(target_pk):
+        return list(through.objects.filter(**{target_fk: target_pk}).values_list(owner_fk, flat=True))
+
+    def on_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+        if action == 'post_add' and pk_set:
+            # pk_set only holds rows that were actually inserted.
+            if reverse:
+                owner.objects.filter(pk__in=pk_set).update(**{counter: F(counter) + 1})
+            else:
+                owner.objects.filter(pk=instance.pk).update(**{counter: F(counter) + len(pk_set)})
+        elif action == 'post_remove' and pk_set:
+            # pk_set is whatever the caller passed, linked or not, so recount.
+            _recount(owner, counter, pk_set if reverse else [instance.pk])
+        elif action == 'pre_clear' and reverse:
+            setattr(instance, stash, owner_ids_for(instance.pk))
+        elif action == 'post_clear':
+            if reverse:
+                _recount(owner, counter, getattr(instance, stash, []))
+            else:
+                owner.objects.filter(pk=instance.pk).update(**{counter: 0})
+
+    # Deleting a target row cascades through the join table without m2m_changed.
+    def before_target_delete(sender, instance, **kwargs):
+        setattr(instance, stash, owner_ids_for(instance.pk))
+
+    def after_target_delete(sender, instance, **kwargs):
+        _recount(owner, counter, getattr(instance, stash, []))
+
+    uid = f'{owner._meta.label_lower}.{counter}'
+    m2m_changed.connect(on_m2m_changed, sender=through, weak=False, dispatch_uid=uid)
+    pre_delete.connect(before_target_delete, sender=field.related_model, weak=False, dispatch_uid=uid)
+    post_delete.connect(after_target_delete, sender=field.related_model, weak=False, dispatch_uid=uid)
+
+
+def track_fk_count(child, fk_name, counter):
+    owner = child._meta.get_field(fk_name).related_model
+    attname = child._meta.get_field(fk_name).attname
+    stash = f'_{owner._meta.model_name}_{counter}_owner_id'
+
+    # The owner a saved row was loaded with, so moving it to another owner
+    # adjusts both counters. Read through __dict__ so a deferred foreign key
+    # isn't fetched for every row; it is looked up before a save or delete
+    # instead.
+    def remember_owner(sender, instance, **kwargs):
+        setattr(instance, stash, None if instance.pk is None else instance.__dict__.get(attname, _UNKNOWN))
+
+    def resolve_owner(sender, instance, raw=False, **kwargs):
+        if not raw and getattr(instance, stash, None) is _UNKNOWN:
+            setattr(instance, stash, child._base_manager.filter(pk=instance.pk).values_list(attname, flat=True).first())
+
+    def after_save(sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        old = None if created else getattr(instance, stash, None)
+        new = getattr(instance, attname)
+        if old != new:
+            if old is not None:
+                owner.objects.filter(pk=old).update(**{counter: F(counter) - 1})
+            if new is not None:
+                owner.objects.filter(pk=new).update(**{counter: F(counter) + 1})
+        setattr(instance, stash, new)
+
+    def after_delete(sender, instance, **kwargs):
+        old = getattr(instance, stash, None)
+        owner.objects.filter(pk=getattr(instance, attname) if old is None else old).update(**{counter: F(counter) - 1})
+
+    uid = f'{owner._meta.label_lower}.{counter}'
+    post_init.connect(remember_owner, sender=child, weak=False, dispatch_uid=uid)
+    pre_save.connect(resolve_owner, sender=child, weak=False, dispatch_uid=uid)
+    pre_delete.connect(resolve_owner, sender=child, weak=False, dispatch_uid=uid)
+    post_save.connect(after_save, sender=child, weak=False, dispatch_uid=uid)
+    post_delete.connect(after_delete, sender=child, weak=False, dispatch_uid=uid)
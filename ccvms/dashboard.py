@@ -0,0 +1,148 @@
+from django.template.loader import render_to_string
+from django.utils import timezone
+from events.models import Event, EventReport
+from attendance.models import Attendance
+from communications.models import Announcement
+from feedback.models import VolunteerEvaluation
+from ministries.models import Ministry
+from . import fragments
+
+
+def upcoming_events(user, now):
+    return {'upcoming_events': Event.objects.filter(is_active=True, start_datetime__gte=now).order_by('start_datetime')[:5]}
+
+
+def recent_communications(user, now):
+    return {'recent_communications': Announcement.feed_for(user, now)[:5]}
+
+
+def coordinated_events(user, now):
+    return {
+        'coordinated_events': Event.objects.filter(
+            coordinator=user,
+            is_active=True,
+            start_datetime__gte=now
+        ).order_by('start_datetime')[:10],
+    }
+
+
+def my_reports(user, now):
+    return {'my_reports': EventReport.objects.filter(submitted_by=user).order_by('-created_at')[:5]}
+
+
+def recent_feedback(user, now):
+    return {'recent_feedback': VolunteerEvaluation.objects.select_related('volunteer__user').order_by('-created_at')[:5]}
+
+
+def my_events(user, now):
+    return {
+        'my_events': Event.objects.filter(
+            assigned_volunteers__user=user,
+            is_active=True,
+            start_datetime__gte=now
+        ).order_by('start_datetime')[:5],
+    }
+
+
+def my_ministries(user, now):
+    return {'my_ministries': Ministry.objects.filter(volunteers__user=user, is_active=True)}
+
+
+def my_summary(user, now):
+    return {
+        **my_events(user, now),
+        **my_ministries(user, now),
+        'my_attendance': Attendance.objects.filter(volunteer__user=user).count(),
+    }
+
+
+# name -> template per role, the context it needs, whether it differs between
+# users sharing a role and ministry, and the models it is built from, whose
+# version stamps (bumped from reports.signals) are part of its cache key.
+# Anything time-based goes stale after FRAGMENT_CACHE_TIMEOUT at most.
+FRAGMENTS = {
+    'upcoming_events': {
+        'templates': {
+            'administrator': 'dashboards/fragments/admin_upcoming_events.html',
+            'priest': 'dashboards/fragments/priest_upcoming_events.html',
+        },
+        'context': upcoming_events,
+        'per_user': False,
+        'models': ['events.Event'],
+    },
+    'recent_communications': {
+        'templates': {
+            'priest': 'dashboards/fragments/priest_recent_communications.html',
+            'volunteer': 'dashboards/fragments/volunteer_recent_communications.html',
+        },
+        'context': recent_communications,
+        'per_user': True,
+        'models': [
+            'communications.Announcement',
+            'communications.AnnouncementRole',
+            'communications.Announcement_target_ministries',
+            'ministries.Ministry',
+            'ministries.Ministry_volunteers',
+        ],
+    },
+    'coordinated_events': {
+        'templates': {'coordinator': 'dashboards/fragments/coordinator_coordinated_events.html'},
+        'context': coordinated_events,
+        'per_user': True,
+        'models': ['events.Event', 'events.Event_assigned_volunteers', 'events.Task', 'events.EventReport'],
+    },
+    'my_reports': {
+        'templates': {'coordinator': 'dashboards/fragments/coordinator_my_reports.html'},
+        'context': my_reports,
+        'per_user': True,
+        'models': ['events.EventReport'],
+    },
+    'recent_feedback': {
+        'templates': {'coordinator': 'dashboards/fragments/coordinator_recent_feedback.html'},
+        'context': recent_feedback,
+        'per_user': False,
+        'models': ['feedback.VolunteerEvaluation', 'volunteers.Volunteer'],
+    },
+    'my_summary': {
+        'templates': {'volunteer': 'dashboards/fragments/volunteer_my_summary.html'},
+        'context': my_summary,
+        'per_user': True,
+        'models': [
+            'volunteers.Volunteer',
+            'events.Event',
+            'events.Event_assigned_volunteers',
+            'ministries.Ministry',
+            'ministries.Ministry_volunteers',
+            'attendance.Attendance',
+        ],
+    },
+    'my_events': {
+        'templates': {'volunteer': 'dashboards/fragments/volunteer_my_events.html'},
+        'context': my_events,
+        'per_user': True,
+        'models': ['volunteers.Volunteer', 'events.Event', 'events.Event_assigned_volunteers'],
+    },
+    'my_ministries': {
+        'templates': {'volunteer': 'dashboards/fragments/volunteer_my_ministries.html'},
+        'context': my_ministries,
+        'per_user': True,
+        'models': ['volunteers.Volunteer', 'ministries.Ministry', 'ministries.Ministry_volunteers'],
+    },
+}
+
+
+def fragments_for(user):
+    return [name for name, spec in FRAGMENTS.items() if user.role in spec['templates']]
+
+
+def render_fragment(name, user):
+    # Shared by users with the same role and ministry unless the content is
+    # personal. The HTML holds no request-specific state.
+    spec = FRAGMENTS[name]
+    key_parts = [user.role, user.assigned_ministry_id, user.pk if spec['per_user'] else '-']
+
+    def render():
+        context = spec['context'](user, timezone.now())
+        return render_to_string(spec['templates'][user.role], context)
+
+    return fragments.cached(name, key_parts, spec['models'], render)
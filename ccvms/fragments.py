@@ -0,0 +1,96 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+# Rendered HTML shared by everyone with the same role and ministry (or by one
+# user, for personal content). Each key ends with the version stamps of the
+# models the content is built from and a write only bumps its model's stamp,
+# so stale entries are simply never looked up again and invalidation needs no
+# key scans.
+
+
+def _label(model):
+    return model.lower() if isinstance(model, str) else model._meta.label_lower
+
+
+def _stamp_key(model):
+    return f'stamp:{_label(model)}'
+
+
+def stamps(models):
+    # One cache round trip. A missing stamp starts from the clock rather than
+    # 0, so entries written under an evicted stamp can't come back.
+    keys = [_stamp_key(model) for model in models]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, time.time_ns(), None)
+        found.update(cache.get_many(missing))
+    return [found[key] for key in keys]
+
+
+def bump(*models):
+    for model in models:
+        key = _stamp_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def bump_on(model):
+    # Bumps the model's stamp whenever a row is saved or deleted, or, for a
+    # many-to-many through model, whenever links are added or removed. This
+    # waits for the commit so a concurrent request can't cache the old rows
+    # under the new stamp.
+    def on_change(sender, raw=False, action=None, **kwargs):
+        if not raw and action in (None, 'post_add', 'post_remove', 'post_clear'):
+            transaction.on_commit(lambda: bump(model))
+
+    uid = f'fragments.{_label(model)}'
+    post_save.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+    m2m_changed.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+
+
+def _stats_key(name, outcome):
+    return f'fragment-stats:{name}:{outcome}'
+
+
+def _count(name, outcome):
+    if not getattr(settings, 'FRAGMENT_CACHE_STATS', True):
+        return
+    key = _stats_key(name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def cached(name, key_parts, models, render):
+    # `render` is only called on a miss.
+    key = ':'.join(['fragment', name, *map(str, key_parts), *map(str, stamps(models))])
+    html = cache.get(key)
+    if html is None:
+        _count(name, 'misses')
+        html = render()
+        cache.set(key, html, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 300))
+    else:
+        _count(name, 'hits')
+    return html
+
+
+def stats(names):
+    # {name: (hits, misses)} since the counters were last reset.
+    counts = cache.get_many([_stats_key(name, outcome) for name in names for outcome in ('hits', 'misses')])
+    return {
+        name: (counts.get(_stats_key(name, 'hits'), 0), counts.get(_stats_key(name, 'misses'), 0))
+        for name in names
+    }
+
+
+def reset_stats(names):
+    cache.delete_many([_stats_key(name, outcome) for name in names for outcome in ('hits', 'misses')])
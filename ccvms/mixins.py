@@ -0,0 +1,18 @@
+class CachedObjectMixin:
+    # Fetch the view's object once per request. UserPassesTestMixin.test_func
+    # runs before get()/post(), so without this the row is loaded twice or more.
+    # Set `select_related` to whatever the permission check and template need.
+    select_related = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        return queryset
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object()
+        return self._cached_object
@@ -0,0 +1,203 @@
+import base64
+import datetime
+import json
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder trims datetimes to milliseconds, which would make the
+    # cursor compare unequal to the row it was taken from.
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values, reverse=False):
+    payload = json.dumps({'k': values, 'r': reverse}, cls=_CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return payload['k'], bool(payload['r'])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor(str(exc))
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.next_query = ''
+        self.previous_query = ''
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    # Pages through `queryset` by comparing against the last row's sort key
+    # instead of OFFSET, so deep pages cost the same as the first one. The sort
+    # key is the queryset's ordering plus the primary key as a tiebreaker.
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.fields = []
+        for name in ordering:
+            descending = name.startswith('-')
+            self.fields.append((name.lstrip('-'), descending))
+        if self.fields[-1][0] not in ('pk', queryset.model._meta.pk.name):
+            self.fields.append(('pk', self.fields[-1][1]))
+
+    @classmethod
+    def supports(cls, queryset):
+        ordering = cls.ordering_of(queryset)
+        if not ordering:
+            return False
+        opts = queryset.model._meta
+        for name in ordering:
+            if not isinstance(name, str) or '__' in name or name.lstrip('-') == '?':
+                return False
+            name = name.lstrip('-')
+            if name == 'pk':
+                continue
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                return False
+            if field.null or field.is_relation:
+                return False
+        return True
+
+    @staticmethod
+    def ordering_of(queryset):
+        if queryset.query.order_by:
+            return list(queryset.query.order_by)
+        if queryset.query.default_ordering:
+            return list(queryset.model._meta.ordering)
+        return []
+
+    @cached_property
+    def count(self):
+        # Only evaluated if a template asks for it.
+        return self.queryset.count()
+
+    def _order_by(self, reverse):
+        return [
+            f"{'-' if descending != reverse else ''}{name}"
+            for name, descending in self.fields
+        ]
+
+    def _after(self, values, reverse):
+        # Rows strictly after `values` in (possibly reversed) sort order, as
+        # a sargable range on the leading column AND-ed with the full tuple
+        # comparison.
+        def beyond(name, descending):
+            return f"{name}__{'lt' if descending != reverse else 'gt'}"
+
+        opts = self.queryset.model._meta
+        values = [
+            opts.pk.to_python(value) if name == 'pk' else opts.get_field(name).to_python(value)
+            for (name, _), value in zip(self.fields, values)
+        ]
+
+        condition = Q()
+        for index, (name, descending) in enumerate(self.fields):
+            step = Q(**{beyond(name, descending): values[index]})
+            for prior_index in range(index):
+                step &= Q(**{self.fields[prior_index][0]: values[prior_index]})
+            condition |= step
+
+        leading, descending = self.fields[0]
+        leading_range = f"{leading}__{'lte' if descending != reverse else 'gte'}"
+        return Q(**{leading_range: values[0]}) & condition
+
+    def _key(self, obj):
+        return [getattr(obj, name) for name, _ in self.fields]
+
+    def page(self, cursor=None):
+        reverse = False
+        queryset = self.queryset
+        if cursor:
+            values, reverse = decode_cursor(cursor)
+            if len(values) != len(self.fields):
+                raise InvalidCursor('Cursor does not match this ordering.')
+            try:
+                queryset = queryset.filter(self._after(values, reverse))
+            except Exception as exc:
+                raise InvalidCursor(str(exc))
+
+        rows = list(queryset.order_by(*self._order_by(reverse))[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or reverse:
+                next_cursor = encode_cursor(self._key(rows[-1]))
+            if (has_more and reverse) or (cursor and not reverse):
+                previous_cursor = encode_cursor(self._key(rows[0]), reverse=True)
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+
+class KeysetPaginationMixin:
+    # ListView mixin: uses keyset pages (?cursor=...) whenever the queryset is
+    # ordered by plain non-null columns, and falls back to Django's numbered
+    # pages for anything else or when an old ?page= link is followed.
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_kwarg in self.request.GET or not KeysetPaginator.supports(queryset):
+            paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+            page.next_query = page.previous_query = ''
+            if page.has_next():
+                page.next_query = self._query(self.page_kwarg, page.next_page_number())
+            if page.has_previous():
+                page.previous_query = self._query(self.page_kwarg, page.previous_page_number())
+            return (paginator, page, object_list, is_paginated)
+
+        paginator = KeysetPaginator(queryset, page_size, KeysetPaginator.ordering_of(queryset))
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Invalid page cursor.')
+
+        if page.next_cursor:
+            page.next_query = self._query(self.cursor_kwarg, page.next_cursor)
+        if page.previous_cursor:
+            page.previous_query = self._query(self.cursor_kwarg, page.previous_cursor)
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def _query(self, key, value):
+        params = self.request.GET.copy()
+        params.pop(self.page_kwarg, None)
+        params.pop(self.cursor_kwarg, None)
+        params[key] = value
+        return params.urlencode()
@@ -59,6 +59,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.MinistryScopeMiddleware',
+    'audit.middleware.AuditContextMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -76,6 +78,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'communications.context_processors.notifications',
+                'ccvms.context_processors.navigation',
             ],
         },
     },
@@ -91,6 +95,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file rather than SQLite's shared in-memory database, whose
+        # table locks fail concurrent writers instead of making them wait;
+        # the signup concurrency tests rely on it.
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -144,6 +152,14 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
+# Sessions record the backend that logged the user in. ModelBackend stays
+# listed so sessions created before ScopedModelBackend still resolve; new
+# logins go through the scoped backend first.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.ScopedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Login URLs
 LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'dashboard'
@@ -155,3 +171,64 @@ EMAIL_HOST = 'localhost'
 EMAIL_PORT = 1025
 EMAIL_USE_TLS = False
 DEFAULT_FROM_EMAIL = 'noreply@ccvms.local'
+
+# Announcement emails are sent from a background thread in batches of
+# EMAIL_FANOUT_BATCH_SIZE over one connection. Transient SMTP failures are
+# retried up to EMAIL_FANOUT_MAX_RETRIES times, waiting EMAIL_FANOUT_RETRY_DELAY
+# seconds and doubling each time. Set EMAIL_FANOUT_ASYNC = False to send inline.
+EMAIL_FANOUT_ASYNC = True
+EMAIL_FANOUT_BATCH_SIZE = 100
+EMAIL_FANOUT_MAX_RETRIES = 3
+EMAIL_FANOUT_RETRY_DELAY = 1.0
+
+# Unread notification counts are cached per user and dropped whenever that
+# user's notifications change. Use a cache shared by all worker processes
+# (Memcached, Redis) in production so invalidation reaches every process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+NOTIFICATION_COUNT_TIMEOUT = 86400
+
+# Read notifications older than this are deleted by `manage.py prune_notifications`.
+NOTIFICATION_RETENTION_DAYS = 90
+
+# Dashboard widgets and the navigation links are cached as rendered HTML per
+# role and ministry, and re-rendered when the rows they show change;
+# time-based content ("upcoming") refreshes after this many seconds at most.
+# With FRAGMENT_CACHE_STATS on, hits and misses are counted per fragment
+# (`manage.py fragment_cache_stats`).
+FRAGMENT_CACHE_TIMEOUT = 300
+FRAGMENT_CACHE_STATS = True
+
+# Live dashboard updates (communications.push) are streamed as server-sent
+# events. Serve the project with an ASGI server (see ccvms/asgi.py) so each
+# open stream is a coroutine rather than a thread. Every process polls the
+# shared PushMessage table every PUSH_POLL_INTERVAL seconds; clients get a
+# keep-alive comment every PUSH_HEARTBEAT seconds, and one that falls
+# PUSH_CLIENT_QUEUE_SIZE messages behind is told to reload. Messages are only
+# stored by processes started through ccvms.asgi unless PUSH_ENABLED is set to
+# True or False; rows older than PUSH_RETENTION_SECONDS are deleted as new ones
+# are published, or by `manage.py prune_push_messages`.
+PUSH_ENABLED = None
+PUSH_POLL_INTERVAL = 1.0
+PUSH_HEARTBEAT = 15
+PUSH_CLIENT_QUEUE_SIZE = 100
+PUSH_RETENTION_SECONDS = 600
+PUSH_RETRY_MS = 3000
+
+# Audit log: entries are queued and written in batches by a background thread.
+# Set AUDIT_ASYNC = False to write each entry as it is recorded.
+AUDIT_ASYNC = True
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL = 2.0
+
+# Entries older than this are moved to compressed monthly files in
+# AUDIT_ARCHIVE_DIR by `manage.py archive_audit_logs`.
+AUDIT_RETENTION_DAYS = 365
+AUDIT_ARCHIVE_DIR = BASE_DIR / 'audit_archive'
+
+# Recurring events: occurrences this many days ahead are created as Event rows
+# by `manage.py materialize_event_series`; later ones stay virtual until used.
+EVENT_SERIES_WINDOW_DAYS = 14
@@ -0,0 +1,30 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountMixin:
+    # Assertions for TestCase subclasses that guard views against loading
+    # the same row more than once or querying once per related row.
+    
+    def request_with_queries(self, url, method='get', data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data)
+        self.assertLess(response.status_code, 400)
+        return response, [query['sql'] for query in queries]
+    
+    def assertReads(self, url, model, times=1, method='get', data=None):
+        # Rows joined in with select_related don't count: only queries
+        # selecting FROM the model's own table do.
+        _, queries = self.request_with_queries(url, method, data)
+        table = f'FROM "{model._meta.db_table}"'
+        reads = [sql for sql in queries if sql.startswith('SELECT') and table in sql]
+        self.assertEqual(len(reads), times, f'{url} read {model._meta.db_table} {len(reads)} time(s):\n' + '\n'.join(reads))
+    
+    def assertConstantQueries(self, url, grow):
+        # The page runs as many queries after grow() adds related rows as
+        # before. It is rendered once first so cached rows are filled.
+        self.request_with_queries(url)
+        _, before = self.request_with_queries(url)
+        grow()
+        _, after = self.request_with_queries(url)
+        self.assertEqual(len(after), len(before), '\n'.join(after))
@@ -0,0 +1,54 @@
+from django.test import TestCase, override_settings
+from accounts.models import User
+from volunteers.models import Volunteer
+from .pagination import KeysetPaginator
+
+
+@override_settings(AUDIT_ASYNC=False)
+class KeysetPaginatorTests(TestCase):
+    per_page = 4
+    
+    @classmethod
+    def setUpTestData(cls):
+        # 23 rows: every date_joined is today and ages repeat, so the sort
+        # keys are full of ties only the primary key can break.
+        for i in range(23):
+            user = User.objects.create_user(f'volunteer{i}', role='volunteer')
+            Volunteer.objects.create(user=user, gender='F', age=20 + i % 3)
+    
+    def walk(self, ordering):
+        queryset = Volunteer.objects.order_by(*ordering)
+        paginator = KeysetPaginator(queryset, self.per_page, ordering)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            self.assertEqual(len(pages[-1]), self.per_page)
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return paginator, pages
+    
+    def test_walks_every_row_once_in_order(self):
+        # ordering -> the same order with the primary key tiebreaker the
+        # paginator adds, in the direction of the last column.
+        orderings = {
+            ('-date_joined',): ['-date_joined', '-pk'],
+            ('age', '-date_joined'): ['age', '-date_joined', '-pk'],
+            ('-age', 'pk'): ['-age', 'pk'],
+        }
+        for ordering, full_ordering in orderings.items():
+            with self.subTest(ordering=ordering):
+                _, pages = self.walk(list(ordering))
+                seen = [volunteer.pk for page in pages for volunteer in page]
+                self.assertEqual(seen, list(Volunteer.objects.order_by(*full_ordering).values_list('pk', flat=True)))
+                self.assertEqual(len(pages), 6)
+                self.assertEqual(len(pages[-1]), 3)
+                self.assertFalse(pages[-1].has_next())
+    
+    def test_previous_cursors_walk_back_to_the_first_page(self):
+        paginator, pages = self.walk(['age', '-date_joined'])
+        self.assertFalse(pages[0].has_previous())
+        
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            self.assertTrue(page.has_previous())
+            page = paginator.page(page.previous_cursor)
+            self.assertEqual(list(page), list(expected))
+        self.assertFalse(page.has_previous())
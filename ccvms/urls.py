@@ -2,11 +2,12 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from .views import DashboardView
+from .views import DashboardView, DashboardFragmentView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', DashboardView.as_view(), name='dashboard'),
+    path('dashboard/fragments/<slug:name>/', DashboardFragmentView.as_view(), name='dashboard_fragment'),
     path('accounts/', include('accounts.urls')),
     path('volunteers/', include('volunteers.urls')),
     path('ministries/', include('ministries.urls')),
@@ -15,6 +16,7 @@ urlpatterns = [
     path('communications/', include('communications.urls')),
     path('reports/', include('reports.urls')),
     path('feedback/', include('feedback.urls')),
+    path('audit/', include('audit.urls')),
 ]
 
 if settings.DEBUG:
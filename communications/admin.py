@@ -1,5 +1,11 @@
 from django.contrib import admin
-from .models import Announcement, EmailLog
+from .forms import AnnouncementForm
+from .models import Announcement, EmailDelivery, EmailLog, Notification
+
+class AnnouncementAdminForm(AnnouncementForm):
+    class Meta(AnnouncementForm.Meta):
+        # The admin brings its own date and ministry widgets.
+        widgets = {}
 
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
@@ -7,9 +13,26 @@ class AnnouncementAdmin(admin.ModelAdmin):
     list_filter = ['priority', 'is_active', 'created_at']
     search_fields = ['title', 'message']
     filter_horizontal = ['target_ministries']
+    form = AnnouncementAdminForm
+    fields = ['title', 'message', 'priority', 'created_by', 'target_roles', 'target_ministries', 'is_active', 'expires_at']
 
 @admin.register(EmailLog)
 class EmailLogAdmin(admin.ModelAdmin):
-    list_display = ['subject', 'sent_by', 'sent_at', 'success']
+    list_display = ['subject', 'announcement', 'sent_by', 'sent_at', 'success']
     list_filter = ['success', 'sent_at']
     search_fields = ['subject', 'recipients']
+    raw_id_fields = ['announcement']
+
+@admin.register(EmailDelivery)
+class EmailDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['email', 'announcement', 'status', 'attempts', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['email', 'announcement__title']
+    raw_id_fields = ['email_log', 'announcement', 'recipient']
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['title', 'user', 'kind', 'created_at', 'read_at']
+    list_filter = ['kind', 'created_at']
+    search_fields = ['title', 'user__username']
+    raw_id_fields = ['user']
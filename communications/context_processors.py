@@ -0,0 +1,10 @@
+from functools import partial
+from .notifications import unread_count
+
+
+def notifications(request):
+    # Lazy, so pages that don't show the badge don't touch the cache.
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'unread_notifications': partial(unread_count, user)}
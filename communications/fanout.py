@@ -0,0 +1,217 @@
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.template.loader import render_to_string
+from .models import Announcement, EmailDelivery, EmailLog
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY = 60.0
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def render(announcement):
+    # Subject and body are the same for every recipient, so they are rendered
+    # once per run rather than once per message.
+    prefix = 'URGENT: ' if announcement.priority == 'urgent' else ''
+    subject = f'{prefix}{announcement.title}'
+    body = render_to_string('communications/email/announcement.txt', {'announcement': announcement})
+    return subject, body
+
+
+def is_transient(error):
+    # Worth retrying: dropped or refused connections and 4xx replies. A 5xx
+    # reply (bad address, rejected content) fails the recipient straight away.
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPConnectError):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class Sender:
+    # Keeps one backend connection open for a whole run. Each message is
+    # passed to send_messages() on its own so every recipient gets an outcome
+    # and a retry never repeats a message that already went out; after a
+    # transient failure the connection is reopened and the message retried
+    # with exponential backoff.
+    def __init__(self, connection, max_retries, retry_delay, sleep=time.sleep):
+        self.connection = connection
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.sleep = sleep
+        self.is_open = False
+
+    def open(self):
+        if not self.is_open:
+            self.connection.open()
+            self.is_open = True
+
+    def close(self):
+        if self.is_open:
+            self.is_open = False
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+
+    def deliver(self, message):
+        # (attempts, error message or '')
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                self.open()
+                self.connection.send_messages([message])
+                return attempts, ''
+            except Exception as error:
+                if not is_transient(error) or attempts > self.max_retries:
+                    return attempts, f'{type(error).__name__}: {error}'
+                self.close()
+                self.sleep(min(self.retry_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+def _recipient_batches(announcement, size):
+    # (user id, email) batches in id order. Users who already received this
+    # announcement are skipped, so an interrupted run can simply be repeated.
+    delivered = EmailDelivery.objects.filter(announcement=announcement, status=EmailDelivery.SENT).values('recipient_id')
+    recipients = announcement.audience().exclude(email='').exclude(pk__in=delivered).order_by('pk').values_list('pk', 'email')
+    last = 0
+    while True:
+        batch = list(recipients.filter(pk__gt=last)[:size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1][0]
+
+
+def _record(announcement, subject, body, sent_by, batch, outcomes):
+    failures = [error for _, error in outcomes if error]
+    with transaction.atomic():
+        log = EmailLog.objects.create(
+            announcement=announcement,
+            subject=subject,
+            recipients=','.join(email for _, email in batch),
+            body=body,
+            sent_by=sent_by,
+            success=not failures,
+            error_message=f'{len(failures)} of {len(batch)} failed; first: {failures[0]}' if failures else '',
+        )
+        EmailDelivery.objects.bulk_create([
+            EmailDelivery(
+                email_log=log,
+                announcement=announcement,
+                recipient_id=user_id,
+                email=email,
+                status=EmailDelivery.FAILED if error else EmailDelivery.SENT,
+                attempts=attempts,
+                error_message=error,
+            )
+            for (user_id, email), (attempts, error) in zip(batch, outcomes)
+        ])
+
+
+def send(announcement, sent_by=None, connection=None, batch_size=None, max_retries=None, retry_delay=None):
+    # Emails the announcement to its audience in batches over one reused
+    # connection, writing an EmailLog per batch and an EmailDelivery per
+    # recipient. Returns a Counter of delivery statuses.
+    subject, body = render(announcement)
+    sender = Sender(
+        connection or get_connection(),
+        _setting('EMAIL_FANOUT_MAX_RETRIES', 3) if max_retries is None else max_retries,
+        _setting('EMAIL_FANOUT_RETRY_DELAY', 1.0) if retry_delay is None else retry_delay,
+    )
+    totals = Counter()
+    try:
+        for batch in _recipient_batches(announcement, batch_size or _setting('EMAIL_FANOUT_BATCH_SIZE', 100)):
+            outcomes = [
+                sender.deliver(EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [email]))
+                for _, email in batch
+            ]
+            _record(announcement, subject, body, sent_by, batch, outcomes)
+            totals.update(EmailDelivery.FAILED if error else EmailDelivery.SENT for _, error in outcomes)
+    finally:
+        sender.close()
+    return totals
+
+
+class FanoutWorker:
+    # Runs queued fan-outs one after another on a background thread, so the
+    # request that posts an announcement only pays for a queue put.
+    def __init__(self):
+        self.queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def submit(self, announcement_id, sent_by_id=None):
+        if not _setting('EMAIL_FANOUT_ASYNC', True) or not self._ensure_thread():
+            self._send(announcement_id, sent_by_id)
+            return
+        self.queue.put((announcement_id, sent_by_id))
+
+    def join(self):
+        self.queue.join()
+
+    def _running(self):
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    def _ensure_thread(self):
+        if self._running():
+            return True
+        with self._lock:
+            if self._running():
+                return True
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='email-fanout', daemon=True)
+            try:
+                self._thread.start()
+            except RuntimeError:
+                self._thread = None
+                return False
+        return True
+
+    def _run(self):
+        while True:
+            announcement_id, sent_by_id = self.queue.get()
+            try:
+                self._send(announcement_id, sent_by_id)
+            finally:
+                close_old_connections()
+                self.queue.task_done()
+
+    def _send(self, announcement_id, sent_by_id):
+        from django.contrib.auth import get_user_model
+        try:
+            announcement = Announcement.objects.filter(pk=announcement_id).first()
+            if announcement is None:
+                return
+            sent_by = get_user_model().objects.filter(pk=sent_by_id).first() if sent_by_id else None
+            totals = send(announcement, sent_by=sent_by)
+            logger.info('Announcement %s emailed: %d sent, %d failed.', announcement_id,
+                        totals[EmailDelivery.SENT], totals[EmailDelivery.FAILED])
+        except Exception:
+            logger.exception('Could not email announcement %s.', announcement_id)
+
+
+worker = FanoutWorker()
+
+
+def queue_announcement(announcement, sent_by=None):
+    # Starts the fan-out once the announcement and its targeting are
+    # committed.
+    transaction.on_commit(lambda: worker.submit(announcement.pk, sent_by.pk if sent_by is not None else None))
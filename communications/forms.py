@@ -1,10 +1,25 @@
 from django import forms
+from django.contrib.auth import get_user_model
 from .models import Announcement
 
+User = get_user_model()
+
 class AnnouncementForm(forms.ModelForm):
+    target_roles = forms.MultipleChoiceField(
+        choices=User.ROLE_CHOICES,
+        required=False,
+        widget=forms.CheckboxSelectMultiple(),
+        help_text='Leave empty to reach every role',
+    )
+    email_audience = forms.BooleanField(
+        required=False,
+        label='Email this announcement',
+        help_text='Send it to everyone it targets; people who already received it are skipped',
+    )
+
     class Meta:
         model = Announcement
-        fields = ['title', 'message', 'priority', 'target_roles', 'target_ministries', 
+        fields = ['title', 'message', 'priority', 'target_roles', 'target_ministries',
                   'is_active', 'expires_at']
         widgets = {
             'message': forms.Textarea(attrs={'rows': 6}),
@@ -12,5 +27,24 @@ class AnnouncementForm(forms.ModelForm):
             'target_ministries': forms.CheckboxSelectMultiple(),
         }
         help_texts = {
-            'target_roles': 'Enter comma-separated roles (e.g., administrator,priest,coordinator,volunteer)'
+            'target_ministries': 'Leave empty to reach every ministry',
         }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.creating = self.instance._state.adding
+        if self.instance.pk:
+            roles = self.instance.get_target_roles()
+            # Every role is stored for an untargeted announcement; show that
+            # as nothing ticked.
+            self.initial['target_roles'] = [] if len(roles) == len(User.ROLE_CHOICES) else roles
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        self.instance.set_target_roles(self.cleaned_data['target_roles'])
+        if self.creating:
+            # Only now are the targets saved, so the audience is known.
+            from .notifications import notify_announcement
+            from .push import publish_announcement
+            notify_announcement(self.instance)
+            publish_announcement(self.instance)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from communications.push import expired
+
+
+class Command(BaseCommand):
+    help = 'Delete live dashboard messages older than PUSH_RETENTION_SECONDS.'
+
+    def handle(self, *args, **options):
+        deleted, _ = expired().delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} push message(s).'))
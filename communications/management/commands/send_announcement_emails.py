@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from communications import fanout
+from communications.models import Announcement
+
+
+class Command(BaseCommand):
+    help = 'Email an announcement to its audience, skipping anyone it was already delivered to.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('announcement_id', type=int)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'EMAIL_FANOUT_BATCH_SIZE', 100),
+            help='Messages per batch (one EmailLog row each).',
+        )
+
+    def handle(self, *args, **options):
+        announcement = Announcement.objects.filter(pk=options['announcement_id']).first()
+        if announcement is None:
+            raise CommandError(f"Announcement {options['announcement_id']} does not exist.")
+        totals = fanout.send(announcement, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['sent']} sent, {totals['failed']} failed for \"{announcement.title}\"."
+        ))
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+ROLES = ['administrator', 'coordinator', 'priest', 'volunteer']
+PRIORITY_RANKS = {'low': 0, 'normal': 1, 'high': 2, 'urgent': 3}
+
+
+def forwards(apps, schema_editor):
+    Announcement = apps.get_model('communications', 'Announcement')
+    AnnouncementRole = apps.get_model('communications', 'AnnouncementRole')
+    rows = []
+    for announcement in Announcement.objects.only('id', 'priority', 'target_roles_csv').iterator(chunk_size=500):
+        roles = {role.strip().lower() for role in announcement.target_roles_csv.split(',')} & set(ROLES)
+        rows.extend(AnnouncementRole(announcement_id=announcement.id, role=role) for role in sorted(roles or ROLES))
+    AnnouncementRole.objects.bulk_create(rows, batch_size=500)
+    for priority, rank in PRIORITY_RANKS.items():
+        Announcement.objects.filter(priority=priority).update(priority_rank=rank)
+
+
+def backwards(apps, schema_editor):
+    Announcement = apps.get_model('communications', 'Announcement')
+    AnnouncementRole = apps.get_model('communications', 'AnnouncementRole')
+    roles = {}
+    for announcement_id, role in AnnouncementRole.objects.values_list('announcement_id', 'role'):
+        roles.setdefault(announcement_id, set()).add(role)
+    for announcement_id, targeted in roles.items():
+        if targeted != set(ROLES):
+            Announcement.objects.filter(pk=announcement_id).update(target_roles_csv=','.join(sorted(targeted)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0002_keyset_pagination_index'),
+        ('ministries', '0002_ministry_volunteers_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='announcement',
+            old_name='target_roles',
+            new_name='target_roles_csv',
+        ),
+        migrations.CreateModel(
+            name='AnnouncementRole',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=20)),
+                ('announcement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='target_roles', to='communications.announcement')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['role', 'announcement'], name='comms_role_announce_idx')],
+                'constraints': [models.UniqueConstraint(fields=('announcement', 'role'), name='comms_announce_role_uniq')],
+            },
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='priority_rank',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(forwards, backwards),
+        migrations.RemoveField(
+            model_name='announcement',
+            name='target_roles_csv',
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['-priority_rank', '-created_at', '-id'], name='comms_announce_feed_idx'),
+        ),
+    ]
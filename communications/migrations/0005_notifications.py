@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0004_email_deliveries'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('announcement', 'Announcement'), ('task', 'Task'), ('approval', 'Approval')], max_length=20)),
+                ('title', models.CharField(max_length=300)),
+                ('url', models.CharField(blank=True, max_length=300)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['user', '-created_at', '-id'], name='comms_notify_inbox_idx'), models.Index(condition=models.Q(('read_at__isnull', True)), fields=['user'], name='comms_notify_unread_idx'), models.Index(condition=models.Q(('read_at__isnull', False)), fields=['read_at'], name='comms_notify_read_idx')],
+            },
+        ),
+    ]
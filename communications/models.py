@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import Exists, OuterRef, Q
 from django.conf import settings
+from django.utils import timezone
 
 class Announcement(models.Model):
     PRIORITY_CHOICES = (
@@ -8,12 +10,15 @@ class Announcement(models.Model):
         ('high', 'High'),
         ('urgent', 'Urgent'),
     )
+    PRIORITY_RANKS = {'low': 0, 'normal': 1, 'high': 2, 'urgent': 3}
+    FEED_ORDERING = ['-priority_rank', '-created_at', '-id']
     
     title = models.CharField(max_length=200)
     message = models.TextField()
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='normal')
+    # Sortable copy of `priority`, set in save().
+    priority_rank = models.PositiveSmallIntegerField(default=1, editable=False)
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='announcements')
-    target_roles = models.CharField(max_length=200, blank=True, help_text='Comma-separated roles: administrator,priest,coordinator,volunteer')
     target_ministries = models.ManyToManyField('ministries.Ministry', blank=True, related_name='announcements')
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -21,11 +26,104 @@ class Announcement(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='comms_announce_created_id_idx'),
+            models.Index(fields=['-priority_rank', '-created_at', '-id'], name='comms_announce_feed_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.get_priority_display()})"
+    
+    def save(self, *args, **kwargs):
+        self.priority_rank = self.PRIORITY_RANKS.get(self.priority, 1)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'priority' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'priority_rank'}
+        super().save(*args, **kwargs)
+    
+    def get_target_roles(self):
+        return [row.role for row in self.target_roles.all()]
+    
+    def set_target_roles(self, roles):
+        # Untargeted announcements get a row for every role, so the feed is a
+        # plain join on the role table rather than an "any role" special case.
+        from django.contrib.auth import get_user_model
+        from django.db import transaction
+        from ccvms import fragments
+        
+        roles = set(roles) or {role for role, _ in get_user_model().ROLE_CHOICES}
+        self.target_roles.exclude(role__in=roles).delete()
+        AnnouncementRole.objects.bulk_create(
+            [AnnouncementRole(announcement=self, role=role) for role in sorted(roles)],
+            ignore_conflicts=True,
+        )
+        # bulk_create skips post_save, which would otherwise bump the stamp.
+        transaction.on_commit(lambda: fragments.bump(AnnouncementRole))
+    
+    @classmethod
+    def feed_for(cls, user, now=None):
+        # Active, unexpired announcements `user` can see, most important and
+        # newest first, as one query: the role must match a target_roles row
+        # and, when ministries are targeted, one of them must be the user's
+        # assigned ministry or one they volunteer in. Administrators see
+        # everything and authors always see their own.
+        now = now or timezone.now()
+        announcements = cls.objects.filter(is_active=True).filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+        if user.is_administrator():
+            return announcements.order_by(*cls.FEED_ORDERING)
+        
+        from ministries.models import Ministry
+        
+        targets = cls.target_ministries.through.objects.filter(announcement_id=OuterRef('pk'))
+        memberships = Ministry.volunteers.through.objects.filter(volunteer__user=user).values('ministry_id')
+        mine = Q(ministry_id__in=memberships)
+        if user.assigned_ministry_id:
+            mine |= Q(ministry_id=user.assigned_ministry_id)
+        visible = (
+            Exists(AnnouncementRole.objects.filter(announcement_id=OuterRef('pk'), role=user.role))
+            & (~Exists(targets) | Exists(targets.filter(mine)))
+        )
+        return announcements.filter(visible | Q(created_by=user)).order_by(*cls.FEED_ORDERING)
+    
+    def audience(self):
+        # Active, approved users this announcement targets: the reverse of
+        # feed_for(), without the administrator and author exceptions.
+        from django.contrib.auth import get_user_model
+        from ministries.models import Ministry
+        
+        users = get_user_model().objects.filter(
+            is_active=True,
+            is_suspended=False,
+            approval_status='approved',
+            role__in=self.target_roles.values('role'),
+        )
+        ministry_ids = self.target_ministries.values('id')
+        if self.target_ministries.exists():
+            users = users.filter(
+                Q(assigned_ministry__in=ministry_ids)
+                | Exists(Ministry.volunteers.through.objects.filter(
+                    volunteer__user=OuterRef('pk'), ministry_id__in=ministry_ids,
+                ))
+            )
+        return users
+
+
+class AnnouncementRole(models.Model):
+    announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, related_name='target_roles')
+    role = models.CharField(max_length=20)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['announcement', 'role'], name='comms_announce_role_uniq'),
+        ]
+        indexes = [models.Index(fields=['role', 'announcement'], name='comms_role_announce_idx')]
+    
+    def __str__(self):
+        return f"{self.announcement.title} → {self.role}"
 
 class EmailLog(models.Model):
+    # One row per batch of messages sent over a single connection.
+    announcement = models.ForeignKey(Announcement, on_delete=models.SET_NULL, null=True, blank=True, related_name='email_logs')
     subject = models.CharField(max_length=300)
     recipients = models.TextField(help_text='Comma-separated email addresses')
     body = models.TextField()
@@ -39,3 +137,78 @@ class EmailLog(models.Model):
     
     def __str__(self):
         return f"{self.subject} - {self.sent_at.date()}"
+
+
+class EmailDelivery(models.Model):
+    # Outcome for one recipient of an announcement email; see
+    # communications.fanout.
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+    
+    email_log = models.ForeignKey(EmailLog, on_delete=models.CASCADE, related_name='deliveries')
+    announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, related_name='email_deliveries')
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='email_deliveries')
+    email = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    attempts = models.PositiveSmallIntegerField(default=1)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'Email deliveries'
+        indexes = [models.Index(fields=['announcement', 'status', 'recipient'], name='comms_delivery_status_idx')]
+    
+    def __str__(self):
+        return f"{self.email}: {self.get_status_display()}"
+
+
+class Notification(models.Model):
+    # An item in a user's inbox; written in bulk by communications.notifications.
+    ANNOUNCEMENT = 'announcement'
+    TASK = 'task'
+    APPROVAL = 'approval'
+    KIND_CHOICES = (
+        (ANNOUNCEMENT, 'Announcement'),
+        (TASK, 'Task'),
+        (APPROVAL, 'Approval'),
+    )
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    title = models.CharField(max_length=300)
+    url = models.CharField(max_length=300, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='comms_notify_inbox_idx'),
+            models.Index(fields=['user'], condition=Q(read_at__isnull=True), name='comms_notify_unread_idx'),
+            models.Index(fields=['read_at'], condition=Q(read_at__isnull=False), name='comms_notify_read_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} → {self.user}"
+    
+    @property
+    def is_read(self):
+        return self.read_at is not None
+
+
+class PushMessage(models.Model):
+    # Short-lived outbox shared by every worker process: publishers insert a
+    # row and each process's push hub polls for new ids (communications.push).
+    kind = models.CharField(max_length=30)
+    data = models.JSONField(default=dict)
+    # {'roles': [...], 'ministries': [...]}; empty lists mean everyone.
+    audience = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    def __str__(self):
+        return f"{self.kind} #{self.pk}"
@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from .models import Notification
+
+BATCH_SIZE = 500
+
+
+def _cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user):
+    # Served from the cache; the count query only runs after a write for this
+    # user has invalidated it.
+    key = _cache_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user=user, read_at__isnull=True).count()
+        cache.set(key, count, getattr(settings, 'NOTIFICATION_COUNT_TIMEOUT', 86400))
+    return count
+
+
+def invalidate(user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+
+
+def notify(user_ids, kind, title, url=''):
+    # Writes one notification per user with bulk_create, BATCH_SIZE rows at a
+    # time, and drops each batch's cached counts.
+    user_ids = list(user_ids)
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        batch = user_ids[start:start + BATCH_SIZE]
+        Notification.objects.bulk_create([
+            Notification(user_id=user_id, kind=kind, title=title[:300], url=url)
+            for user_id in batch
+        ])
+        invalidate(batch)
+    return len(user_ids)
+
+
+def notify_announcement(announcement):
+    if not announcement.is_active:
+        return 0
+    user_ids = announcement.audience().exclude(pk=announcement.created_by_id).values_list('pk', flat=True)
+    return notify(
+        user_ids,
+        Notification.ANNOUNCEMENT,
+        announcement.title,
+        reverse('communications:detail', args=[announcement.pk]),
+    )
+
+
+def notify_task(task):
+    return notify(
+        [task.assigned_to.user_id],
+        Notification.TASK,
+        f'New task for {task.event.title}: {task.title}',
+        reverse('events:detail', args=[task.event_id]),
+    )
+
+
+def notify_approval(user, approved):
+    title = 'Your volunteer account has been approved' if approved else 'Your volunteer application was not approved'
+    return notify([user.pk], Notification.APPROVAL, title, reverse('dashboard') if approved else '')
+
+
+def mark_read(user, pk):
+    updated = Notification.objects.filter(user=user, pk=pk, read_at__isnull=True).update(read_at=timezone.now())
+    if updated:
+        invalidate([user.pk])
+    return updated
+
+
+def mark_all_read(user):
+    # A single UPDATE over the user's unread rows.
+    updated = Notification.objects.filter(user=user, read_at__isnull=True).update(read_at=timezone.now())
+    if updated:
+        invalidate([user.pk])
+    return updated
+
+
+def prune(before, batch_size=1000):
+    # Deletes read notifications older than `before`, batch_size rows per
+    # statement so a large backlog doesn't hold the write lock for long.
+    # Unread counts are unaffected.
+    deleted = 0
+    while True:
+        ids = list(
+            Notification.objects.filter(read_at__lt=before)
+            .order_by().values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += Notification.objects.filter(id__in=ids).delete()[0]
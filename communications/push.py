@@ -0,0 +1,245 @@
+import asyncio
+import contextvars
+import datetime
+import json
+import logging
+import time
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from .models import PushMessage
+
+logger = logging.getLogger(__name__)
+
+STAFF_ROLES = ['administrator', 'priest', 'coordinator']
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enabled():
+    # Off unless this process serves the live streams (ccvms.asgi) or
+    # PUSH_ENABLED says otherwise; under WSGI nobody reads the rows.
+    setting = _setting('PUSH_ENABLED', None)
+    return hub.serving if setting is None else setting
+
+
+def expired():
+    cutoff = timezone.now() - datetime.timedelta(seconds=_setting('PUSH_RETENTION_SECONDS', 600))
+    return PushMessage.objects.filter(created_at__lt=cutoff)
+
+
+_pruned_at = 0.0
+
+
+def _prune_due():
+    # At most one delete of expired rows per minute per process.
+    global _pruned_at
+    now = time.monotonic()
+    if now - _pruned_at < 60:
+        return False
+    _pruned_at = now
+    return True
+
+
+def publish(kind, data, roles=(), ministries=()):
+    # Stores the message for every worker process to pick up on its next
+    # poll; this process's hub is woken as soon as the row is committed.
+    if not enabled():
+        return None
+    if _prune_due():
+        expired().delete()
+    message = PushMessage.objects.create(
+        kind=kind,
+        data=data,
+        audience={'roles': sorted(roles), 'ministries': sorted(ministries)},
+    )
+    transaction.on_commit(hub.wake)
+    return message
+
+
+def publish_announcement(announcement):
+    if announcement.priority != 'urgent' or not announcement.is_active or not enabled():
+        return None
+    return publish(
+        'announcement',
+        {'title': announcement.title, 'url': reverse('communications:detail', args=[announcement.pk])},
+        roles=announcement.get_target_roles(),
+        ministries=announcement.target_ministries.values_list('id', flat=True),
+    )
+
+
+def publish_attendance(event):
+    from django.db.models import Count
+    from attendance.models import Attendance
+    
+    if not enabled():
+        return None
+    summary = dict(
+        Attendance.objects.filter(event=event).order_by()
+        .values_list('status').annotate(count=Count('id'))
+    )
+    return publish(
+        'attendance',
+        {'event': event.title, 'event_id': event.pk, 'summary': summary},
+        roles=STAFF_ROLES,
+        ministries=[event.ministry_id] if event.ministry_id else [],
+    )
+
+
+def format_message(message):
+    return f'id: {message.id}\nevent: {message.kind}\ndata: {json.dumps(message.data)}\n\n'
+
+
+class Subscriber:
+    # One open stream. Publishing never waits on a client: when its queue is
+    # full the oldest message is dropped and the client is told to resync.
+    def __init__(self, role, ministry_ids, is_admin=False, size=100):
+        self.role = role
+        self.ministry_ids = set(ministry_ids)
+        self.is_admin = is_admin
+        self.queue = asyncio.Queue(maxsize=size)
+        self.lagged = False
+
+    def wants(self, message):
+        if self.is_admin:
+            return True
+        roles = message.audience.get('roles')
+        ministries = message.audience.get('ministries')
+        if roles and self.role not in roles:
+            return False
+        return not ministries or not self.ministry_ids.isdisjoint(ministries)
+
+    def offer(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.lagged = True
+        self.queue.put_nowait(message)
+
+
+class Hub:
+    # In-process pub/sub for one event loop. A single polling task per
+    # process reads new PushMessage rows and hands them to matching
+    # subscribers, so idle connections cost a queue each, not a thread or a
+    # query. The task runs only while someone is subscribed.
+    def __init__(self):
+        self.serving = False
+        self.subscribers = set()
+        self.loop = None
+        self.last_id = None
+        self._wakeup = None
+        self._task = None
+
+    def subscribe(self, role, ministry_ids, is_admin=False):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.subscribers = set()
+            self._wakeup = asyncio.Event()
+            self._task = None
+        subscriber = Subscriber(role, ministry_ids, is_admin, _setting('PUSH_CLIENT_QUEUE_SIZE', 100))
+        self.subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            # A fresh context, so the task doesn't keep the first subscriber's
+            # request alive.
+            self._task = loop.create_task(self._poll(), context=contextvars.Context())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def wake(self):
+        # Callable from any thread.
+        loop = self.loop
+        if loop is not None and not loop.is_closed() and self.subscribers:
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    def dispatch(self, messages):
+        for message in messages:
+            for subscriber in list(self.subscribers):
+                if subscriber.wants(message):
+                    subscriber.offer(message)
+
+    async def _poll(self):
+        interval = _setting('PUSH_POLL_INTERVAL', 1.0)
+        try:
+            if self.last_id is None:
+                latest = await PushMessage.objects.order_by('-id').values_list('id', flat=True).afirst()
+                self.last_id = latest or 0
+            while self.subscribers:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                try:
+                    await self._fetch()
+                    await self._prune()
+                except Exception:
+                    logger.exception('Push hub poll failed.')
+        finally:
+            self.last_id = None
+
+    async def _fetch(self):
+        messages = [message async for message in PushMessage.objects.filter(id__gt=self.last_id).order_by('id')[:500]]
+        if messages:
+            self.last_id = messages[-1].id
+            self.dispatch(messages)
+
+    async def _prune(self):
+        if _prune_due():
+            await expired().adelete()
+
+
+hub = Hub()
+
+
+async def stream(role, ministry_ids, is_admin=False, last_event_id=None):
+    # Server-sent events for one client: messages as they arrive, a comment
+    # line every PUSH_HEARTBEAT seconds to keep proxies from closing the
+    # connection, and missed messages replayed after a reconnect.
+    heartbeat = _setting('PUSH_HEARTBEAT', 15)
+    yield f"retry: {_setting('PUSH_RETRY_MS', 3000)}\n\n"
+    subscriber = hub.subscribe(role, ministry_ids, is_admin)
+    try:
+        replayed = 0
+        if last_event_id is not None:
+            async for message in PushMessage.objects.filter(id__gt=last_event_id).order_by('id')[:500]:
+                replayed = message.id
+                if subscriber.wants(message):
+                    yield format_message(message)
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            if subscriber.lagged:
+                subscriber.lagged = False
+                yield 'event: resync\ndata: {}\n\n'
+            if message.id > replayed:
+                yield format_message(message)
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+def replay(role, ministry_ids, is_admin=False, last_event_id=None):
+    # Fallback for a WSGI server, where a request can't stay open without
+    # holding a thread: send what was missed and let the browser reconnect.
+    subscriber = Subscriber(role, ministry_ids, is_admin)
+    yield f"retry: {_setting('PUSH_RETRY_MS', 3000)}\n\n"
+    if last_event_id is None:
+        latest = PushMessage.objects.order_by('-id').values_list('id', flat=True).first()
+        if latest:
+            yield f'id: {latest}\n\n'
+        return
+    last_id = None
+    for message in PushMessage.objects.filter(id__gt=last_event_id).order_by('id')[:500]:
+        last_id = message.id
+        if subscriber.wants(message):
+            yield format_message(message)
+    if last_id:
+        # Moves the browser's Last-Event-ID past messages meant for others.
+        yield f'id: {last_id}\n\n'
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from attendance.models import Attendance
+from events.models import Task
+from . import notifications, push
+
+
+@receiver(post_save, sender=Task, dispatch_uid='notify_task_assigned')
+def notify_task_assigned(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        notifications.notify_task(instance)
+
+
+@receiver(post_save, sender=Attendance, dispatch_uid='push_attendance_saved')
+def push_attendance_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        push.publish_attendance(instance.event)
+
+
+@receiver(post_delete, sender=Attendance, dispatch_uid='push_attendance_deleted')
+def push_attendance_deleted(sender, instance, origin=None, **kwargs):
+    # Records cascading from a deleted event or volunteer don't need a live
+    # update each.
+    if getattr(origin, 'model', type(origin)) is Attendance:
+        push.publish_attendance(instance.event)
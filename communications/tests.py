@@ -1,3 +1,184 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import inspect
+from unittest import mock
+from asgiref.sync import ThreadSensitiveContext
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from accounts.models import User
+from attendance.models import Attendance
+from events.models import Event
+from ministries.models import Ministry
+from volunteers.models import Volunteer
+from . import push
+from .models import Announcement, PushMessage
 
-# Create your tests here.
+
+@override_settings(AUDIT_ASYNC=False)
+class PushPublishTests(TestCase):
+    def setUp(self):
+        push._pruned_at = 0.0
+        ministry = Ministry.objects.create(name='Choir', description='')
+        start = timezone.now() + datetime.timedelta(days=1)
+        self.event = Event.objects.create(
+            title='Mass',
+            description='',
+            location='Church',
+            ministry=ministry,
+            start_datetime=start,
+            end_datetime=start + datetime.timedelta(hours=1),
+        )
+        user = User.objects.create_user('volunteer', role='volunteer')
+        self.volunteer = Volunteer.objects.create(user=user, gender='F', age=30)
+    
+    def test_nothing_is_stored_when_no_process_streams(self):
+        self.assertFalse(push.hub.serving)
+        Attendance.objects.create(event=self.event, volunteer=self.volunteer, status='present')
+        Attendance.bulk_mark(self.event, {self.volunteer.id: ('late', '')})
+        self.assertFalse(PushMessage.objects.exists())
+    
+    @override_settings(PUSH_ENABLED=True, PUSH_RETENTION_SECONDS=600)
+    def test_publishing_prunes_expired_messages(self):
+        old = PushMessage.objects.create(kind='attendance', data={}, audience={})
+        PushMessage.objects.filter(pk=old.pk).update(created_at=timezone.now() - datetime.timedelta(seconds=601))
+        
+        Attendance.objects.create(event=self.event, volunteer=self.volunteer, status='present')
+        self.assertEqual(list(PushMessage.objects.values_list('kind', flat=True)), ['attendance'])
+        self.assertFalse(PushMessage.objects.filter(pk=old.pk).exists())
+    
+    @override_settings(PUSH_RETENTION_SECONDS=600)
+    def test_prune_command_deletes_expired_messages(self):
+        old = PushMessage.objects.create(kind='attendance', data={}, audience={})
+        PushMessage.objects.filter(pk=old.pk).update(created_at=timezone.now() - datetime.timedelta(seconds=601))
+        recent = PushMessage.objects.create(kind='attendance', data={}, audience={})
+        
+        call_command('prune_push_messages', stdout=mock.Mock())
+        self.assertEqual(list(PushMessage.objects.values_list('pk', flat=True)), [recent.pk])
+
+
+@override_settings(AUDIT_ASYNC=False)
+class AnnouncementFeedTests(TestCase):
+    def setUp(self):
+        choir = Ministry.objects.create(name='Choir', description='')
+        youth = Ministry.objects.create(name='Youth', description='')
+        self.users = {
+            'administrator': User.objects.create_user('admin', role='administrator'),
+            'priest': User.objects.create_user('priest', role='priest'),
+            'coordinator': User.objects.create_user('coordinator', role='coordinator', assigned_ministry=youth),
+            'volunteer': User.objects.create_user('volunteer', role='volunteer'),
+        }
+        volunteer = Volunteer.objects.create(user=self.users['volunteer'], gender='F', age=30)
+        choir.volunteers.add(volunteer)
+        
+        now = timezone.now()
+        # title -> (priority, roles, ministries, extra fields); created oldest
+        # first, so a newer announcement only wins within the same priority.
+        announcements = {
+            'Everyone': ('normal', [], [], {}),
+            'Urgent volunteers': ('urgent', ['volunteer'], [], {}),
+            'Priests': ('low', ['priest'], [], {}),
+            'Staff': ('high', ['priest', 'coordinator'], [], {}),
+            'Choir volunteers': ('high', ['volunteer'], [choir], {}),
+            'Youth': ('normal', [], [youth], {}),
+            'Urgent everyone': ('urgent', [], [], {}),
+            'Expired': ('urgent', [], [], {'expires_at': now - datetime.timedelta(minutes=1)}),
+            'Inactive': ('urgent', [], [], {'is_active': False}),
+        }
+        self.announcements = {}
+        for i, (title, (priority, roles, ministries, extra)) in enumerate(announcements.items()):
+            announcement = Announcement.objects.create(
+                title=title, message='', priority=priority, created_by=self.users['administrator'], **extra,
+            )
+            Announcement.objects.filter(pk=announcement.pk).update(created_at=now - datetime.timedelta(hours=10 - i))
+            announcement.set_target_roles(roles)
+            announcement.target_ministries.set(ministries)
+            self.announcements[title] = announcement
+    
+    def feed(self, role):
+        return list(Announcement.feed_for(self.users[role]).values_list('title', flat=True))
+    
+    def test_each_role_sees_its_announcements_urgent_first(self):
+        expected = {
+            'administrator': [
+                'Urgent everyone', 'Urgent volunteers', 'Choir volunteers', 'Staff', 'Youth', 'Everyone', 'Priests',
+            ],
+            'priest': ['Urgent everyone', 'Staff', 'Everyone', 'Priests'],
+            'coordinator': ['Urgent everyone', 'Staff', 'Youth', 'Everyone'],
+            'volunteer': ['Urgent everyone', 'Urgent volunteers', 'Choir volunteers', 'Everyone'],
+        }
+        for role, titles in expected.items():
+            with self.subTest(role=role):
+                self.assertEqual(self.feed(role), titles)
+    
+    def test_authors_see_their_own_announcements(self):
+        announcement = Announcement.objects.create(
+            title='Note to priests', message='', priority='low', created_by=self.users['coordinator'],
+        )
+        announcement.set_target_roles(['priest'])
+        
+        self.assertEqual(self.feed('coordinator')[-1], 'Note to priests')
+        self.assertEqual(self.feed('priest')[-2:], ['Note to priests', 'Priests'])
+        self.assertNotIn('Note to priests', self.feed('volunteer'))
+
+
+class StreamingASGIHandlerTests(SimpleTestCase):
+    def setUp(self):
+        from ccvms.asgi import StreamingASGIHandler
+        
+        serving = push.hub.serving
+        self.addCleanup(setattr, push.hub, 'serving', serving)
+        self.handler = StreamingASGIHandler()
+    
+    def test_django_still_wraps_handle_in_a_thread_sensitive_context(self):
+        # The handler skips ASGIHandler.__call__ for streams; that is only
+        # safe while __call__ adds nothing else around handle().
+        source = inspect.getsource(ASGIHandler.__call__)
+        self.assertIn('async with ThreadSensitiveContext():', source)
+        self.assertIn('await self.handle(scope, receive, send)', source)
+    
+    async def request(self, path, root_path=''):
+        messages = []
+        
+        async def receive():
+            if not messages:
+                messages.append(None)
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Event().wait()
+        
+        async def send(message):
+            messages.append(message)
+        
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'root_path': root_path,
+            'query_string': b'',
+            'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        }
+        contexts = []
+        
+        def context():
+            contexts.append(path)
+            return ThreadSensitiveContext()
+        
+        with mock.patch('django.core.handlers.asgi.ThreadSensitiveContext', context):
+            await self.handler(scope, receive, send)
+        return messages[1]['status'], bool(contexts)
+    
+    async def test_streams_skip_the_per_request_thread(self):
+        self.assertTrue(push.hub.serving)
+        # Anonymous, so the stream view answers at once.
+        self.assertEqual(await self.request('/communications/stream/'), (403, False))
+        self.assertEqual(await self.request('/ccvms/communications/stream/', root_path='/ccvms'), (403, False))
+        # Everything else, here a redirect to the slash-terminated URL, keeps
+        # Django's own per-request context.
+        self.assertEqual(await self.request('/communications/stream'), (301, True))
@@ -9,4 +9,8 @@ urlpatterns = [
     path('<int:pk>/', views.AnnouncementDetailView.as_view(), name='detail'),
     path('<int:pk>/edit/', views.AnnouncementUpdateView.as_view(), name='edit'),
     path('<int:pk>/delete/', views.AnnouncementDeleteView.as_view(), name='delete'),
+    path('notifications/', views.NotificationListView.as_view(), name='notifications'),
+    path('notifications/<int:pk>/open/', views.NotificationOpenView.as_view(), name='notification_open'),
+    path('notifications/read-all/', views.NotificationMarkAllReadView.as_view(), name='notifications_read_all'),
+    path('stream/', views.EventStreamView.as_view(), name='stream'),
 ]
@@ -1,21 +1,45 @@
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
-from .models import Announcement, EmailLog
+from django.contrib import messages
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views import View
+from ccvms.pagination import KeysetPaginationMixin
+from . import fanout, notifications, push
+from .models import Announcement, EmailLog, Notification
 from .forms import AnnouncementForm
 
-class AnnouncementListView(LoginRequiredMixin, ListView):
+class EmailAudienceMixin:
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if form.cleaned_data.get('email_audience'):
+            fanout.queue_announcement(self.object, self.request.user)
+            messages.info(self.request, 'The announcement is being emailed to its audience.')
+        return response
+
+class AnnouncementListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Announcement
     template_name = 'communications/list.html'
     context_object_name = 'announcements'
     paginate_by = 20
+    
+    def get_queryset(self):
+        return Announcement.feed_for(self.request.user).select_related('created_by')
 
 class AnnouncementDetailView(LoginRequiredMixin, DetailView):
     model = Announcement
     template_name = 'communications/detail.html'
     context_object_name = 'announcement'
+    
+    def get_queryset(self):
+        if self.request.user.can_manage_volunteers():
+            return Announcement.objects.all()
+        return Announcement.feed_for(self.request.user)
 
-class AnnouncementCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
+class AnnouncementCreateView(LoginRequiredMixin, UserPassesTestMixin, EmailAudienceMixin, CreateView):
     model = Announcement
     form_class = AnnouncementForm
     template_name = 'communications/form.html'
@@ -28,7 +52,7 @@ class AnnouncementCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView
         form.instance.created_by = self.request.user
         return super().form_valid(form)
 
-class AnnouncementUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class AnnouncementUpdateView(LoginRequiredMixin, UserPassesTestMixin, EmailAudienceMixin, UpdateView):
     model = Announcement
     form_class = AnnouncementForm
     template_name = 'communications/form.html'
@@ -44,3 +68,52 @@ class AnnouncementDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView
     
     def test_func(self):
         return self.request.user.can_manage_volunteers()
+
+class NotificationListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
+    model = Notification
+    template_name = 'communications/notifications.html'
+    context_object_name = 'notifications'
+    paginate_by = 30
+    
+    def get_queryset(self):
+        return Notification.objects.filter(user=self.request.user)
+
+class NotificationOpenView(LoginRequiredMixin, View):
+    def post(self, request, pk):
+        notifications.mark_read(request.user, pk)
+        url = Notification.objects.filter(user=request.user, pk=pk).values_list('url', flat=True).first()
+        if url and url_has_allowed_host_and_scheme(url, allowed_hosts={request.get_host()}):
+            return redirect(url)
+        return redirect('communications:notifications')
+
+class NotificationMarkAllReadView(LoginRequiredMixin, View):
+    def post(self, request):
+        count = notifications.mark_all_read(request.user)
+        messages.success(request, f'{count} notification(s) marked as read.')
+        return redirect('communications:notifications')
+
+class EventStreamView(View):
+    # Server-sent events for live dashboards. Under ASGI each client is an
+    # idle coroutine waiting on the push hub; under WSGI the missed messages
+    # are sent and the browser reconnects after PUSH_RETRY_MS.
+    async def get(self, request):
+        from ministries.models import Ministry
+        
+        user = await request.auser()
+        if not user.is_authenticated:
+            return HttpResponseForbidden()
+        ministry_ids = {
+            ministry_id async for ministry_id in
+            Ministry.volunteers.through.objects.filter(volunteer__user=user).values_list('ministry_id', flat=True)
+        }
+        if user.assigned_ministry_id:
+            ministry_ids.add(user.assigned_ministry_id)
+        last_event_id = request.headers.get('Last-Event-ID', '')
+        last_event_id = int(last_event_id) if last_event_id.isdigit() else None
+        args = (user.role, ministry_ids, user.is_administrator(), last_event_id)
+        
+        stream = push.stream(*args) if isinstance(request, ASGIRequest) else push.replay(*args)
+        response = StreamingHttpResponse(stream, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
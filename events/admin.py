@@ -1,5 +1,12 @@
 from django.contrib import admin
-from .models import Event, Task, EventReport
+from .models import Event, EventSeries, EventSeriesException, Task, EventReport, WaitlistEntry
+
+
+class WaitlistEntryInline(admin.TabularInline):
+    model = WaitlistEntry
+    extra = 0
+    raw_id_fields = ['volunteer']
+    readonly_fields = ['created_at']
 
 
 @admin.register(Event)
@@ -8,6 +15,22 @@ class EventAdmin(admin.ModelAdmin):
     list_filter = ['event_type', 'is_active', 'start_datetime', 'ministry']
     search_fields = ['title', 'description', 'location']
     filter_horizontal = ['assigned_volunteers']
+    readonly_fields = ['series', 'occurrence_start']
+    inlines = [WaitlistEntryInline]
+
+
+class EventSeriesExceptionInline(admin.TabularInline):
+    model = EventSeriesException
+    extra = 0
+
+
+@admin.register(EventSeries)
+class EventSeriesAdmin(admin.ModelAdmin):
+    list_display = ['title', 'event_type', 'ministry', 'frequency', 'start_datetime', 'until', 'is_active']
+    list_filter = ['frequency', 'event_type', 'is_active', 'ministry']
+    search_fields = ['title', 'description', 'location']
+    readonly_fields = ['materialized_until']
+    inlines = [EventSeriesExceptionInline]
 
 
 @admin.register(Task)
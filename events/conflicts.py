@@ -0,0 +1,91 @@
+from collections import defaultdict, namedtuple
+from django.db.models import F, Max, Q, Window
+from django.db.models.expressions import RowRange
+from django.db.models.functions import Lag
+from django.utils import timezone
+from volunteers.models import Volunteer
+from .models import Event
+
+Conflict = namedtuple('Conflict', ['volunteer', 'event', 'other'])
+
+
+def overlapping(start, end, prefix=''):
+    # Active events sharing any time with [start, end); touching end to
+    # start is not a clash. Served by the (start_datetime, end_datetime)
+    # index.
+    return Q(**{
+        f'{prefix}is_active': True,
+        f'{prefix}start_datetime__lt': end,
+        f'{prefix}end_datetime__gt': start,
+    })
+
+
+def _assignments():
+    return Event.assigned_volunteers.through.objects.all()
+
+
+def busy_volunteers(start, end, exclude_event=None):
+    # Subquery of volunteer ids already assigned to an event overlapping
+    # [start, end), for use in volunteer__in / id__in filters.
+    rows = _assignments().filter(overlapping(start, end, 'event__'))
+    if exclude_event is not None and exclude_event.pk:
+        rows = rows.exclude(event_id=exclude_event.pk)
+    return rows.values('volunteer_id')
+
+
+def find_conflicts(volunteer_ids, start, end, exclude_event=None):
+    # {volunteer id: [overlapping Event, ...]} for a whole set of volunteers
+    # in one query, e.g. everyone ticked on an assignment form.
+    rows = _assignments().filter(overlapping(start, end, 'event__'), volunteer_id__in=list(volunteer_ids))
+    if exclude_event is not None and exclude_event.pk:
+        rows = rows.exclude(event_id=exclude_event.pk)
+    conflicts = defaultdict(list)
+    for row in rows.select_related('event').order_by('event__start_datetime'):
+        conflicts[row.volunteer_id].append(row.event)
+    return dict(conflicts)
+
+
+def describe(conflicts, volunteers):
+    # One readable line per volunteer, for form errors and messages.
+    names = {volunteer.pk: volunteer.user.get_full_name() for volunteer in volunteers}
+    return [
+        f"{names.get(volunteer_id, f'Volunteer #{volunteer_id}')} is already assigned to "
+        + ', '.join(f"{event.title} ({timezone.localtime(event.start_datetime):%b %d, %H:%M})" for event in events)
+        for volunteer_id, events in conflicts.items()
+    ]
+
+
+def ministry_report(ministry, start, end):
+    # Every double-booking of the ministry's volunteers among events in
+    # [start, end), from one query: each volunteer's assignments are ordered
+    # by start time and an assignment clashes when it starts before the
+    # latest end among the ones before it. Events of other ministries count,
+    # since the volunteer can't attend both either way.
+    order = [F('event__start_datetime').asc(), F('event_id').asc()]
+    rows = (
+        _assignments()
+        .filter(overlapping(start, end, 'event__'), volunteer__ministries=ministry)
+        .annotate(
+            earlier_end=Window(Max('event__end_datetime'), partition_by=[F('volunteer_id')], order_by=order,
+                               frame=RowRange(start=None, end=-1)),
+            previous_event_id=Window(Lag('event_id'), partition_by=[F('volunteer_id')], order_by=order),
+        )
+        .filter(earlier_end__gt=F('event__start_datetime'))
+        .values_list('volunteer_id', 'event_id', 'previous_event_id')
+    )
+    rows = list(rows)
+    volunteers = Volunteer.objects.select_related('user').in_bulk({row[0] for row in rows})
+    events = Event.objects.in_bulk({event_id for row in rows for event_id in row[1:]})
+    conflicts = []
+    for volunteer_id, event_id, previous_event_id in rows:
+        event = events[event_id]
+        other = events.get(previous_event_id)
+        # The clash may be with a longer event further back; `other` is only
+        # named when it's the immediately preceding assignment.
+        conflicts.append(Conflict(
+            volunteers[volunteer_id],
+            event,
+            other if other is not None and other.end_datetime > event.start_datetime else None,
+        ))
+    conflicts.sort(key=lambda conflict: (conflict.event.start_datetime, conflict.volunteer.user.get_full_name()))
+    return conflicts
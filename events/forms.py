@@ -1,6 +1,8 @@
 from django import forms
-from .models import Event, Task, EventReport
+from .models import Event, EventSeries, Task, EventReport
 from volunteers.models import Volunteer
+from volunteers.availability import available_for_event
+from .conflicts import busy_volunteers, describe, find_conflicts
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -10,7 +12,7 @@ class EventForm(forms.ModelForm):
         model = Event
         fields = ['title', 'description', 'event_type', 'ministry', 'start_datetime', 
                   'end_datetime', 'location', 'coordinator', 'assigned_volunteers', 
-                  'max_volunteers', 'is_active']
+                  'max_volunteers', 'self_signup', 'is_active']
         widgets = {
             'description': forms.Textarea(attrs={'rows': 4}),
             'start_datetime': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
@@ -37,6 +39,80 @@ class EventForm(forms.ModelForm):
             self.fields['assigned_volunteers'].queryset = Volunteer.objects.filter(
                 ministries=ministry
             )
+        
+        if self.instance.pk and not self.is_bound:
+            # Only offer people who are free for the saved event time (plus
+            # anyone already assigned). The bound form keeps the full list so a
+            # changed start/end time cannot invalidate the submitted choices.
+            field = self.fields['assigned_volunteers']
+            field.queryset = (
+                available_for_event(field.queryset, self.instance, include_unrecorded=True)
+                .exclude(id__in=busy_volunteers(self.instance.start_datetime, self.instance.end_datetime, self.instance))
+                | field.queryset.filter(id__in=self.instance.assigned_volunteers.values('id'))
+            ).distinct()
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get('start_datetime')
+        end = cleaned_data.get('end_datetime')
+        volunteers = cleaned_data.get('assigned_volunteers')
+        if start and end and volunteers and cleaned_data.get('is_active', True):
+            conflicts = find_conflicts([volunteer.pk for volunteer in volunteers], start, end, self.instance)
+            for line in describe(conflicts, volunteers.select_related('user')):
+                self.add_error('assigned_volunteers', f'{line} at that time.')
+        limit = cleaned_data.get('max_volunteers')
+        if volunteers is not None and limit is not None and len(volunteers) > limit:
+            self.add_error('assigned_volunteers', f'This event only has room for {limit} volunteers.')
+        return cleaned_data
+    
+    def _save_m2m(self):
+        super()._save_m2m()
+        # Places opened by a higher limit or removed volunteers go to the
+        # waitlist, once the submitted roster is in place.
+        from .signup import promote
+        promote(self.instance.pk)
+
+
+class EventSeriesForm(forms.ModelForm):
+    weekdays = forms.TypedMultipleChoiceField(
+        choices=[(index, name) for index, name in enumerate(
+            ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        )],
+        coerce=int,
+        required=False,
+        widget=forms.CheckboxSelectMultiple(),
+        help_text="Leave empty to repeat on the first occurrence's weekday",
+    )
+    
+    class Meta:
+        model = EventSeries
+        fields = ['title', 'description', 'event_type', 'ministry', 'start_datetime', 'duration',
+                  'frequency', 'interval', 'weekdays', 'set_position', 'until', 'location',
+                  'coordinator', 'max_volunteers', 'is_active']
+        widgets = {
+            'description': forms.Textarea(attrs={'rows': 4}),
+            'start_datetime': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
+            'until': forms.DateInput(attrs={'type': 'date'}),
+        }
+    
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial['weekdays'] = self.instance.get_weekdays() if self.instance.weekdays else []
+        
+        if user and user.is_priest() and user.assigned_ministry:
+            ministry = user.assigned_ministry
+            self.fields['ministry'].widget = forms.HiddenInput()
+            self.fields['ministry'].initial = ministry
+            self.fields['ministry'].disabled = True
+            self.fields['coordinator'].queryset = User.objects.filter(
+                role='coordinator',
+                assigned_ministry=ministry
+            )
+    
+    def clean_weekdays(self):
+        return ','.join(str(day) for day in sorted(set(self.cleaned_data['weekdays'])))
 
 
 class TaskForm(forms.ModelForm):
@@ -85,6 +161,8 @@ class EventReportForm(forms.ModelForm):
 
 
 class AddVolunteerToEventForm(forms.Form):
+    recommendation_limit = 25
+    
     volunteers = forms.ModelMultipleChoiceField(
         queryset=Volunteer.objects.none(),
         widget=forms.CheckboxSelectMultiple(),
@@ -95,10 +173,61 @@ class AddVolunteerToEventForm(forms.Form):
     def __init__(self, *args, **kwargs):
         event = kwargs.pop('event', None)
         user = kwargs.pop('user', None)
+        show_all = kwargs.pop('show_all', False)
         super().__init__(*args, **kwargs)
+        self.event = event
+        self.recommendations = []
+        self.has_more = False
         
         if event and user and user.assigned_ministry:
             current_volunteers = event.assigned_volunteers.all()
-            self.fields['volunteers'].queryset = Volunteer.objects.filter(
-                ministries=user.assigned_ministry
+            candidates = available_for_event(
+                Volunteer.objects.filter(ministries=user.assigned_ministry),
+                event,
+                include_unrecorded=True,
             ).exclude(id__in=current_volunteers.values_list('id', flat=True))
+            self.fields['volunteers'].queryset = candidates
+            
+            if not self.is_bound:
+                # The best matches who are free, best first, with the top few
+                # flagged as suggestions; `show_all` lists every free
+                # candidate. A submitted form still accepts any candidate and
+                # reports clashes.
+                from .recommendations import rank
+                candidates = candidates.exclude(id__in=busy_volunteers(event.start_datetime, event.end_datetime, event))
+                limit = self.recommendation_limit
+                ranked = rank(event, candidates, limit=None if show_all else limit + 1)
+                self.has_more = not show_all and len(ranked) > limit
+                if not show_all:
+                    ranked = ranked[:limit]
+                self.recommendations = ranked[:limit]
+                volunteers = candidates.select_related('user').in_bulk([item.volunteer_id for item in ranked])
+                self.fields['volunteers'].choices = [
+                    (item.volunteer_id, self.candidate_label(volunteers[item.volunteer_id], item.score, position < limit))
+                    for position, item in enumerate(ranked)
+                    if item.volunteer_id in volunteers
+                ]
+    
+    def candidate_label(self, volunteer, score, suggested):
+        label = f"{volunteer.user.get_full_name()} ({score:.0%} match"
+        return f"{label}, suggested)" if suggested else f"{label})"
+    
+    def clean_volunteers(self):
+        volunteers = self.cleaned_data['volunteers']
+        if self.event is not None and volunteers:
+            conflicts = find_conflicts(
+                volunteers.values_list('id', flat=True),
+                self.event.start_datetime,
+                self.event.end_datetime,
+                self.event,
+            )
+            if conflicts:
+                raise forms.ValidationError([
+                    f'{line} at that time.' for line in describe(conflicts, volunteers.select_related('user'))
+                ])
+            limit = self.event.max_volunteers
+            if limit is not None and self.event.volunteers_count + len(volunteers) > limit:
+                raise forms.ValidationError(
+                    f'Only {max(limit - self.event.volunteers_count, 0)} of the {limit} places are still open.'
+                )
+        return volunteers
@@ -0,0 +1,144 @@
+import datetime
+import hashlib
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+PRODID = '-//CCVMS//Volunteer Schedule//EN'
+
+# How far back feeds go; calendar apps keep what they already downloaded.
+PAST_DAYS = 90
+
+_WEEKDAY_CODES = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+
+def escape(text):
+    return (
+        (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
+    )
+
+
+def fold(line):
+    # Content lines are limited to 75 octets; longer ones continue on lines
+    # starting with a space, without splitting a UTF-8 sequence.
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+        limit = 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def utc(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _local(name, value):
+    # Series repeat at a local time of day, so their start and excluded dates
+    # are given in the site time zone when it isn't UTC.
+    if settings.TIME_ZONE == 'UTC':
+        return f'{name}:{utc(value)}'
+    return f'{name};TZID={settings.TIME_ZONE}:{timezone.localtime(value):%Y%m%dT%H%M%S}'
+
+
+def rrule(series):
+    weekdays = series.get_weekdays()
+    parts = [f'FREQ={series.frequency.upper()}', f'INTERVAL={max(series.interval, 1)}']
+    if series.frequency == series.MONTHLY:
+        position = series.get_set_position()
+        parts.append('BYDAY=' + ','.join(f'{position}{_WEEKDAY_CODES[day]}' for day in weekdays))
+    else:
+        parts.append('BYDAY=' + ','.join(_WEEKDAY_CODES[day] for day in weekdays))
+    if series.until:
+        until = timezone.make_aware(datetime.datetime.combine(series.until, datetime.time(23, 59, 59)))
+        parts.append(f'UNTIL={utc(until)}')
+    return 'RRULE:' + ';'.join(parts)
+
+
+def event_lines(event, host):
+    yield 'BEGIN:VEVENT'
+    yield f'UID:event-{event.pk}@{host}'
+    yield f'DTSTAMP:{utc(event.updated_at)}'
+    yield f'DTSTART:{utc(event.start_datetime)}'
+    yield f'DTEND:{utc(event.end_datetime)}'
+    yield f'SUMMARY:{escape(event.title)}'
+    if event.location:
+        yield f'LOCATION:{escape(event.location)}'
+    if event.description:
+        yield f'DESCRIPTION:{escape(event.description)}'
+    yield 'END:VEVENT'
+
+
+def series_lines(series, host, skipped):
+    # One VEVENT for the whole series. Occurrences that have their own Event
+    # row (`skipped`) are feed events of their own, or cancelled, so they are
+    # excluded here along with the series' exception dates.
+    yield 'BEGIN:VEVENT'
+    yield f'UID:series-{series.pk}@{host}'
+    yield f'DTSTAMP:{utc(series.updated_at)}'
+    yield _local('DTSTART', series.start_datetime)
+    yield f'DURATION:PT{int(series.duration.total_seconds())}S'
+    yield rrule(series)
+    time_of_day = timezone.localtime(series.start_datetime).time()
+    excluded = set(skipped)
+    for exception in series.exceptions.all():
+        excluded.add(timezone.make_aware(datetime.datetime.combine(exception.date, time_of_day)))
+    for occurrence_start in sorted(excluded):
+        yield _local('EXDATE', occurrence_start)
+    yield f'SUMMARY:{escape(series.title)}'
+    if series.location:
+        yield f'LOCATION:{escape(series.location)}'
+    if series.description:
+        yield f'DESCRIPTION:{escape(series.description)}'
+    yield 'END:VEVENT'
+
+
+def window(events):
+    return events.filter(is_active=True, start_datetime__gte=timezone.now() - datetime.timedelta(days=PAST_DAYS))
+
+
+def etag(key, events, series=None):
+    # Strong validator from the feed's inputs. Assignment changes bump
+    # Event.updated_at (see events.signals) and exceptions bump the series,
+    # so count plus newest change covers edits, additions and removals.
+    state = [key]
+    for queryset in (events, series):
+        if queryset is None:
+            continue
+        summary = queryset.order_by().aggregate(count=Count('id'), latest=Max('updated_at'))
+        state += [summary['count'], summary['latest'].isoformat() if summary['latest'] else '']
+    return '"%s"' % hashlib.sha1(':'.join(map(str, state)).encode()).hexdigest()
+
+
+def stream(name, host, events, series=None):
+    # Yields the calendar a few KB at a time from one pass over `events`
+    # (a range query, streamed with iterator()) and, if given, the series.
+    yield fold('BEGIN:VCALENDAR') + fold('VERSION:2.0') + fold(f'PRODID:{PRODID}')
+    yield fold('CALSCALE:GREGORIAN') + fold('METHOD:PUBLISH') + fold(f'X-WR-CALNAME:{escape(name)}')
+
+    buffer = []
+    for event in events.order_by('start_datetime', 'id').iterator(chunk_size=500):
+        buffer.extend(fold(line) for line in event_lines(event, host))
+        if len(buffer) >= 500:
+            yield ''.join(buffer)
+            buffer = []
+
+    if series is not None:
+        from .models import Event
+
+        series = list(series.prefetch_related('exceptions'))
+        materialized = {}
+        for series_id, occurrence_start in Event.objects.filter(series__in=series).values_list('series_id', 'occurrence_start'):
+            materialized.setdefault(series_id, set()).add(occurrence_start)
+        for recurring in series:
+            buffer.extend(fold(line) for line in series_lines(recurring, host, materialized.get(recurring.pk, ())))
+    buffer.append(fold('END:VCALENDAR'))
+    yield ''.join(buffer)
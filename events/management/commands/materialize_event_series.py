@@ -0,0 +1,25 @@
+import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from events.models import EventSeries
+
+
+class Command(BaseCommand):
+    help = 'Create Event rows for recurring series occurrences inside the rolling window.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.EVENT_SERIES_WINDOW_DAYS,
+            help='Materialize occurrences starting within this many days (default: EVENT_SERIES_WINDOW_DAYS).',
+        )
+
+    def handle(self, *args, **options):
+        until = timezone.now() + datetime.timedelta(days=options['days'])
+        created = 0
+        series = EventSeries.objects.filter(is_active=True).prefetch_related('exceptions')
+        for recurring in series.iterator(chunk_size=200):
+            created += recurring.materialize_until(until)
+        self.stdout.write(self.style.SUCCESS(f'Created {created} event(s) up to {until:%Y-%m-%d %H:%M}.'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Q
+from events.models import Event
+from ministries.models import Ministry
+
+
+class Command(BaseCommand):
+    help = 'Recompute the counter-cache columns on events and ministries, or check them for drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report rows whose cached counts have drifted; exit non-zero if any.',
+        )
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for model in (Event, Ministry):
+            expressions = model.counter_expressions()
+            expected = {f'expected_{field}': expression for field, expression in expressions.items()}
+            mismatch = Q()
+            for field in expressions:
+                mismatch |= ~Q(**{field: F(f'expected_{field}')})
+
+            stale = model.objects.annotate(**expected).filter(mismatch).count()
+            drifted += stale
+            label = str(model._meta.verbose_name_plural).capitalize()
+            if options['check']:
+                self.stdout.write(f'{label}: {stale} row(s) with stale counters')
+            else:
+                model.recount()
+                self.stdout.write(f'{label}: recounted, {stale} row(s) were stale')
+
+        if options['check'] and drifted:
+            raise CommandError(f'{drifted} row(s) have drifted counters.')
+        self.stdout.write(self.style.SUCCESS('Counters are consistent.'))
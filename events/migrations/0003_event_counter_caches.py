@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Task = apps.get_model('events', 'Task')
+    EventReport = apps.get_model('events', 'EventReport')
+
+    def count_of(queryset):
+        counts = queryset.filter(event=OuterRef('pk')).order_by().values('event').annotate(n=Count('pk')).values('n')
+        return Coalesce(Subquery(counts), Value(0))
+
+    Event.objects.update(
+        volunteers_count=count_of(Event.assigned_volunteers.through.objects.all()),
+        tasks_count=count_of(Task.objects.all()),
+        reports_count=count_of(EventReport.objects.all()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_eventreport_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='reports_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='tasks_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='volunteers_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
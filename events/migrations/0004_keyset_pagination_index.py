@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_event_counter_caches'),
+        ('ministries', '0002_ministry_volunteers_count'),
+        ('volunteers', '0004_keyset_pagination_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_datetime', 'id'], name='events_start_id_idx'),
+        ),
+    ]
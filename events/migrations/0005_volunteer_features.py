@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_keyset_pagination_index'),
+        ('volunteers', '0005_availability_windows'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VolunteerFeatures',
+            fields=[
+                ('volunteer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommendation_features', serialize=False, to='volunteers.volunteer')),
+                ('skill_terms', models.TextField(blank=True)),
+                ('attended_score', models.FloatField(default=0)),
+                ('marked_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('last_assigned_on', models.DateField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
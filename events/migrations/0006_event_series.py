@@ -0,0 +1,80 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_volunteer_features'),
+        ('ministries', '0002_ministry_volunteers_count'),
+        ('volunteers', '0005_availability_windows'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSeriesException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('reason', models.CharField(blank=True, max_length=200)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='occurrence_start',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='EventSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('event_type', models.CharField(choices=[('mass', 'Mass'), ('meeting', 'Meeting'), ('outreach', 'Outreach Program'), ('fundraiser', 'Fundraiser'), ('celebration', 'Celebration'), ('other', 'Other')], default='other', max_length=20)),
+                ('location', models.CharField(max_length=300)),
+                ('max_volunteers', models.PositiveIntegerField(blank=True, null=True)),
+                ('start_datetime', models.DateTimeField(help_text='Start of the first occurrence; later ones keep its time of day')),
+                ('duration', models.DurationField(help_text='Length of each occurrence, e.g. 01:30:00')),
+                ('frequency', models.CharField(choices=[('weekly', 'Weekly'), ('monthly', 'Monthly (by weekday)')], default='weekly', max_length=10)),
+                ('interval', models.PositiveSmallIntegerField(default=1, help_text='Repeat every N weeks or months')),
+                ('weekdays', models.CharField(blank=True, help_text="Comma-separated weekdays, 0 = Monday to 6 = Sunday; defaults to the first occurrence's weekday", max_length=20)),
+                ('set_position', models.SmallIntegerField(blank=True, choices=[(1, 'First'), (2, 'Second'), (3, 'Third'), (4, 'Fourth'), (-1, 'Last')], help_text="Monthly series only; defaults to the first occurrence's week of the month", null=True)),
+                ('until', models.DateField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('materialized_until', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('coordinator', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='coordinated_series', to=settings.AUTH_USER_MODEL)),
+                ('ministry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_series', to='ministries.ministry')),
+            ],
+            options={
+                'verbose_name_plural': 'Event series',
+                'ordering': ['title'],
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='events.eventseries'),
+        ),
+        migrations.AddConstraint(
+            model_name='event',
+            constraint=models.UniqueConstraint(fields=('series', 'occurrence_start'), name='events_series_occurrence_uniq'),
+        ),
+        migrations.AddField(
+            model_name='eventseriesexception',
+            name='series',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='events.eventseries'),
+        ),
+        migrations.AddConstraint(
+            model_name='eventseriesexception',
+            constraint=models.UniqueConstraint(fields=('series', 'date'), name='events_series_exception_uniq'),
+        ),
+    ]
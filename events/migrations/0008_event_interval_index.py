@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_calendar_token'),
+        ('ministries', '0002_ministry_volunteers_count'),
+        ('volunteers', '0005_availability_windows'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_datetime', 'end_datetime'], name='events_interval_idx'),
+        ),
+    ]
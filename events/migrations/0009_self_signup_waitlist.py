@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_event_interval_index'),
+        ('volunteers', '0005_availability_windows'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='self_signup',
+            field=models.BooleanField(default=False, help_text='Let volunteers of the ministry sign themselves up; once full they join a waitlist'),
+        ),
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='events.event')),
+                ('volunteer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='volunteers.volunteer')),
+            ],
+            options={
+                'verbose_name_plural': 'Waitlist entries',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['event', 'created_at', 'id'], name='events_waitlist_order_idx')],
+                'constraints': [models.UniqueConstraint(fields=('event', 'volunteer'), name='events_waitlist_uniq')],
+            },
+        ),
+    ]
@@ -1,5 +1,9 @@
-from django.db import models
+import datetime
+import secrets
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
+from django.utils import timezone
+from ccvms.counters import related_count
 
 
 class Event(models.Model):
@@ -22,18 +26,52 @@ class Event(models.Model):
     coordinator = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='coordinated_events')
     assigned_volunteers = models.ManyToManyField('volunteers.Volunteer', related_name='assigned_events', blank=True)
     max_volunteers = models.PositiveIntegerField(null=True, blank=True)
+    self_signup = models.BooleanField(default=False, help_text='Let volunteers of the ministry sign themselves up; once full they join a waitlist')
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Set on rows materialized from an EventSeries; occurrence_start is the
+    # slot the row stands for, even if the event is later moved.
+    series = models.ForeignKey('EventSeries', on_delete=models.SET_NULL, null=True, blank=True, related_name='events')
+    occurrence_start = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    is_virtual = False
+    
+    # Counter caches, kept current by events.signals and reconciled by
+    # `manage.py reconcile_counters`.
+    volunteers_count = models.IntegerField(default=0, editable=False)
+    tasks_count = models.IntegerField(default=0, editable=False)
+    reports_count = models.IntegerField(default=0, editable=False)
+    
     class Meta:
         ordering = ['-start_datetime']
+        indexes = [
+            models.Index(fields=['start_datetime', 'id'], name='events_start_id_idx'),
+            models.Index(fields=['start_datetime', 'end_datetime'], name='events_interval_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['series', 'occurrence_start'], name='events_series_occurrence_uniq'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.start_datetime.date()}"
     
     def volunteer_count(self):
-        return self.assigned_volunteers.count()
+        return self.volunteers_count
+    
+    @classmethod
+    def counter_expressions(cls):
+        return {
+            'volunteers_count': related_count(cls.assigned_volunteers.through.objects.all(), 'event'),
+            'tasks_count': related_count(Task.objects.all(), 'event'),
+            'reports_count': related_count(EventReport.objects.all(), 'event'),
+        }
+    
+    @classmethod
+    def recount(cls, pks=None):
+        queryset = cls.objects.all() if pks is None else cls.objects.filter(pk__in=pks)
+        return queryset.update(**cls.counter_expressions())
 
 
 class Task(models.Model):
@@ -88,3 +126,195 @@ class EventReport(models.Model):
     
     def __str__(self):
         return f"Report: {self.event.title} by {self.submitted_by.get_full_name()}"
+
+
+class WaitlistEntry(models.Model):
+    # A volunteer waiting for a place on a full self-signup event; the oldest
+    # entry is promoted when a place frees up (see events.signup).
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='waitlist')
+    volunteer = models.ForeignKey('volunteers.Volunteer', on_delete=models.CASCADE, related_name='waitlist_entries')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at', 'id']
+        verbose_name_plural = 'Waitlist entries'
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'volunteer'], name='events_waitlist_uniq'),
+        ]
+        indexes = [models.Index(fields=['event', 'created_at', 'id'], name='events_waitlist_order_idx')]
+    
+    def __str__(self):
+        return f"{self.volunteer} waiting for {self.event.title}"
+
+
+class EventSeries(models.Model):
+    # A recurring event. Occurrences stay virtual (see events.recurrence)
+    # until something needs a row: materialize() creates one occurrence when
+    # it is first touched, and materialize_until() fills the rolling window
+    # kept by `manage.py materialize_event_series`.
+    WEEKLY = 'weekly'
+    MONTHLY = 'monthly'
+    FREQUENCY_CHOICES = (
+        (WEEKLY, 'Weekly'),
+        (MONTHLY, 'Monthly (by weekday)'),
+    )
+    SET_POSITION_CHOICES = (
+        (1, 'First'),
+        (2, 'Second'),
+        (3, 'Third'),
+        (4, 'Fourth'),
+        (-1, 'Last'),
+    )
+    EVENT_TYPE_CHOICES = Event.EVENT_TYPE_CHOICES
+    
+    # Copied onto every Event materialized from the series.
+    EVENT_FIELDS = ('title', 'description', 'event_type', 'ministry_id', 'location', 'coordinator_id', 'max_volunteers', 'is_active')
+    
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES, default='other')
+    ministry = models.ForeignKey('ministries.Ministry', on_delete=models.CASCADE, related_name='event_series')
+    location = models.CharField(max_length=300)
+    coordinator = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='coordinated_series')
+    max_volunteers = models.PositiveIntegerField(null=True, blank=True)
+    start_datetime = models.DateTimeField(help_text='Start of the first occurrence; later ones keep its time of day')
+    duration = models.DurationField(help_text='Length of each occurrence, e.g. 01:30:00')
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default=WEEKLY)
+    interval = models.PositiveSmallIntegerField(default=1, help_text='Repeat every N weeks or months')
+    weekdays = models.CharField(max_length=20, blank=True, help_text="Comma-separated weekdays, 0 = Monday to 6 = Sunday; defaults to the first occurrence's weekday")
+    set_position = models.SmallIntegerField(choices=SET_POSITION_CHOICES, null=True, blank=True, help_text="Monthly series only; defaults to the first occurrence's week of the month")
+    until = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    materialized_until = models.DateTimeField(null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['title']
+        verbose_name_plural = 'Event series'
+    
+    def __str__(self):
+        return f"{self.title} ({self.get_frequency_display().lower()})"
+    
+    def get_weekdays(self):
+        weekdays = sorted({int(day) for day in self.weekdays.split(',') if day.strip().isdigit() and int(day) < 7})
+        return weekdays or [timezone.localtime(self.start_datetime).weekday()]
+    
+    def get_set_position(self):
+        if self.set_position:
+            return self.set_position
+        return (timezone.localtime(self.start_datetime).day - 1) // 7 + 1
+    
+    def occurrences(self, start, end):
+        from .recurrence import occurrence_starts
+        return occurrence_starts(self, start, end)
+    
+    def occurrence_at(self, second):
+        # The occurrence starting within the whole second `second`, which is
+        # how occurrence URLs address them, or None.
+        return next(iter(self.occurrences(second, second + datetime.timedelta(seconds=1))), None)
+    
+    def build_event(self, occurrence_start):
+        return Event(
+            series=self,
+            occurrence_start=occurrence_start,
+            start_datetime=occurrence_start,
+            end_datetime=occurrence_start + self.duration,
+            **{field: getattr(self, field) for field in self.EVENT_FIELDS},
+        )
+    
+    def materialize(self, occurrence_start):
+        # The Event row for one occurrence, created on first use.
+        event = self.events.filter(occurrence_start=occurrence_start).first()
+        if event is not None:
+            return event
+        event = self.build_event(occurrence_start)
+        try:
+            with transaction.atomic():
+                event.save()
+        except IntegrityError:
+            event = self.events.get(occurrence_start=occurrence_start)
+        return event
+    
+    def materialize_until(self, until):
+        # Creates rows for every occurrence from now (or the previous
+        # high-water mark) up to `until` in one insert; returns how many.
+        from reports.models import DashboardStats
+        from ccvms import fragments
+        
+        start = max(filter(None, [self.materialized_until, timezone.now()]))
+        if until <= start:
+            return 0
+        in_range = self.events.filter(occurrence_start__gte=start, occurrence_start__lt=until)
+        taken = set(in_range.values_list('occurrence_start', flat=True))
+        events = [self.build_event(occurrence) for occurrence in self.occurrences(start, until) if occurrence not in taken]
+        with transaction.atomic():
+            # The first write of its transaction, so under SQLite's single
+            # writer no other request can add an occurrence between the two
+            # counts below.
+            type(self).objects.filter(pk=self.pk).update(materialized_until=until)
+            existing = in_range.count()
+            Event.objects.bulk_create(events, ignore_conflicts=True)
+            # ignore_conflicts skips occurrences a concurrent materialize()
+            # created since `taken` was read, so count what was inserted.
+            # bulk_create skips post_save, so keep the dashboard counter and
+            # cached widgets in step.
+            created = in_range.count() - existing
+            if self.is_active and created:
+                DashboardStats.apply_deltas({'active_events': created})
+            transaction.on_commit(lambda: fragments.bump(Event))
+        self.materialized_until = until
+        return created
+
+
+class EventSeriesException(models.Model):
+    # A date on which the series does not take place.
+    series = models.ForeignKey(EventSeries, on_delete=models.CASCADE, related_name='exceptions')
+    date = models.DateField()
+    reason = models.CharField(max_length=200, blank=True)
+    
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['series', 'date'], name='events_series_exception_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.series.title}: no occurrence on {self.date}"
+
+
+class VolunteerFeatures(models.Model):
+    # Per-volunteer inputs to the recommendation score, cached so ranking a
+    # large ministry doesn't aggregate attendance and ratings every time. A
+    # missing row means "stale"; events.recommendations rebuilds it on demand.
+    volunteer = models.OneToOneField('volunteers.Volunteer', on_delete=models.CASCADE, primary_key=True, related_name='recommendation_features')
+    skill_terms = models.TextField(blank=True)
+    attended_score = models.FloatField(default=0)
+    marked_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    last_assigned_on = models.DateField(null=True, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Features for volunteer #{self.volunteer_id}"
+
+
+class CalendarToken(models.Model):
+    # Secret in a user's calendar feed URLs; calendar apps can't log in, so
+    # the token stands in for the session. Resetting it revokes old links.
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='calendar_token')
+    token = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Calendar token for {self.user}"
+    
+    @classmethod
+    def for_user(cls, user):
+        calendar_token, _ = cls.objects.get_or_create(user=user, defaults={'token': secrets.token_urlsafe(32)})
+        return calendar_token
+    
+    def reset(self):
+        self.token = secrets.token_urlsafe(32)
+        self.save(update_fields=['token', 'created_at'])
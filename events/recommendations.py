@@ -0,0 +1,192 @@
+import heapq
+import math
+import operator
+import re
+from collections import namedtuple
+from django.db.models import Case, Count, FloatField, Max, Sum, Value, When
+from django.utils import timezone
+from attendance.models import Attendance
+from feedback.models import VolunteerEvaluation
+from volunteers.availability import availability_condition, unrecorded_condition
+from volunteers.models import Volunteer
+from .models import Event, VolunteerFeatures
+
+SIGNALS = ('skills', 'reliability', 'rating', 'availability', 'recency')
+
+# Relative weight of each signal; every signal is scaled to 0..1 first.
+WEIGHTS = {
+    'skills': 0.35,
+    'reliability': 0.25,
+    'rating': 0.15,
+    'availability': 0.15,
+    'recency': 0.10,
+}
+
+# Volunteers with little history are pulled towards these values instead of
+# scoring 0 or 100% on one or two records.
+RELIABILITY_PRIOR = (0.7, 3)
+RATING_PRIOR = (3.0, 2)
+
+# Days since the volunteer's nearest other assignment at which the recency
+# signal (spreading the load) reaches its maximum.
+RECENCY_HORIZON_DAYS = 90
+
+ID_BATCH_SIZE = 500
+
+STOPWORDS = frozenset(
+    'the and for with from this that will are our your you all any can into '
+    'who has have was were not but its their them they other event program'.split()
+)
+
+Recommendation = namedtuple('Recommendation', ['volunteer_id', 'score', 'signals'])
+
+_FEATURE_FIELDS = ('volunteer_id', 'skill_terms', 'attended_score', 'marked_count', 'rating_sum', 'rating_count', 'last_assigned_on')
+
+
+def terms(text):
+    words = re.findall(r'[a-z]{3,}', (text or '').lower())
+    return {word[:-1] if word.endswith('s') and len(word) > 3 else word for word in words} - STOPWORDS
+
+
+def event_terms(event):
+    return terms(' '.join([event.get_event_type_display(), event.event_type, event.title, event.description]))
+
+
+def invalidate(volunteer_ids):
+    VolunteerFeatures.objects.filter(volunteer_id__in=list(volunteer_ids)).delete()
+
+
+def _batches(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), ID_BATCH_SIZE):
+        yield ids[start:start + ID_BATCH_SIZE]
+
+
+def refresh(volunteer_ids):
+    # Rebuilds feature rows with one aggregate query per signal per batch.
+    rows = []
+    for ids in _batches(volunteer_ids):
+        attendance = {
+            row['volunteer_id']: row
+            for row in Attendance.objects.filter(volunteer_id__in=ids).exclude(status='excused')
+            .values('volunteer_id')
+            .annotate(
+                marked=Count('id'),
+                attended=Sum(Case(
+                    When(status='present', then=1.0),
+                    When(status='late', then=0.5),
+                    default=0.0,
+                    output_field=FloatField(),
+                )),
+            )
+        }
+        ratings = {
+            row['volunteer_id']: row
+            for row in VolunteerEvaluation.objects.filter(volunteer_id__in=ids)
+            .values('volunteer_id').annotate(total=Sum('rating'), count=Count('id'))
+        }
+        last_assigned = dict(
+            Event.assigned_volunteers.through.objects.filter(volunteer_id__in=ids)
+            .values('volunteer_id').annotate(last=Max('event__start_datetime__date'))
+            .values_list('volunteer_id', 'last')
+        )
+        for volunteer_id, skills, interests in Volunteer.objects.filter(id__in=ids).values_list('id', 'skills', 'interests'):
+            marked = attendance.get(volunteer_id, {})
+            rated = ratings.get(volunteer_id, {})
+            rows.append(VolunteerFeatures(
+                volunteer_id=volunteer_id,
+                skill_terms=' '.join(sorted(terms(f'{skills} {interests}'))),
+                attended_score=marked.get('attended') or 0,
+                marked_count=marked.get('marked') or 0,
+                rating_sum=rated.get('total') or 0,
+                rating_count=rated.get('count') or 0,
+                last_assigned_on=last_assigned.get(volunteer_id),
+            ))
+    VolunteerFeatures.objects.bulk_create(rows, ignore_conflicts=True)
+    return [tuple(getattr(row, field) for field in _FEATURE_FIELDS) for row in rows]
+
+
+def _availability(event):
+    # 1 free, 0.5 unknown (no weekly windows and not away), 0 busy.
+    return Case(
+        When(availability_condition(event.start_datetime, event.end_datetime), then=Value(1.0)),
+        When(unrecorded_condition(event.start_datetime, event.end_datetime), then=Value(0.5)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _features(candidates, event=None):
+    # One query: the candidates LEFT JOINed to their cached rows, with the
+    # availability signal (1 free, 0.5 unknown, 0 busy) for `event` as a
+    # computed column. Anyone without a cached row is rebuilt and appended.
+    rows = []
+    missing = {}
+    columns = ['id', *(f'recommendation_features__{field}' for field in _FEATURE_FIELDS[1:])]
+    if event is not None:
+        columns.append(_availability(event))
+    for row in candidates.order_by().values_list(*columns):
+        if row[1] is None:
+            missing[row[0]] = row[len(_FEATURE_FIELDS):]
+        else:
+            rows.append(row)
+    if missing:
+        rows += [features + missing[features[0]] for features in refresh(missing)]
+    return rows
+
+
+def _scored(event, rows):
+    # Per volunteer the signals are a plain tuple dotted with the weight
+    # vector; callers build named breakdowns only for what they return.
+    wanted = event_terms(event)
+    reliability_mean, reliability_weight = RELIABILITY_PRIOR
+    rating_mean, rating_weight = RATING_PRIOR
+    event_day = timezone.localdate(event.start_datetime)
+    weights = tuple(WEIGHTS[name] for name in SIGNALS)
+
+    scored = []
+    for (volunteer_id, skill_terms, attended, marked, rating_sum, rating_count, last_assigned_on,
+         availability) in rows:
+        overlap = len(wanted.intersection(skill_terms.split())) if wanted else 0
+        signals = (
+            overlap / math.sqrt(len(wanted) * (skill_terms.count(' ') + 1)) if overlap else 0.0,
+            (attended + reliability_mean * reliability_weight) / (marked + reliability_weight),
+            ((rating_sum + rating_mean * rating_weight) / (rating_count + rating_weight) - 1) / 4,
+            availability,
+            min(abs((event_day - last_assigned_on).days), RECENCY_HORIZON_DAYS) / RECENCY_HORIZON_DAYS
+            if last_assigned_on else 1.0,
+        )
+        scored.append((sum(map(operator.mul, weights, signals)), volunteer_id, signals))
+    return scored
+
+
+def rank(event, candidates, limit=None):
+    # Scores every volunteer in `candidates` (a Volunteer queryset) for
+    # `event` and returns Recommendations, best first, from a single query
+    # for the whole pool.
+    scored = _scored(event, _features(candidates, event))
+    best = sorted(scored, reverse=True) if limit is None else heapq.nlargest(limit, scored)
+    return [Recommendation(volunteer_id, score, dict(zip(SIGNALS, signals))) for score, volunteer_id, signals in best]
+
+
+def scores(events, candidates, available_only=False, key=operator.attrgetter('id')):
+    # {key(event): {volunteer id: score}} for scoring one pool against many
+    # events. The cached features are read once; each event then only costs
+    # a query for who is free, or unknown and not away, at that time. With
+    # `available_only`, volunteers known to be busy or away are left out.
+    features = _features(candidates)
+    result = {}
+    for event in events:
+        known = dict(
+            candidates.filter(
+                availability_condition(event.start_datetime, event.end_datetime)
+                | unrecorded_condition(event.start_datetime, event.end_datetime)
+            ).order_by().values_list('id', _availability(event))
+        )
+        rows = [
+            row + (known.get(row[0], 0.0),)
+            for row in features
+            if not available_only or row[0] in known
+        ]
+        result[key(event)] = {volunteer_id: score for score, volunteer_id, _ in _scored(event, rows)}
+    return result
@@ -0,0 +1,124 @@
+import calendar
+import datetime
+from django.urls import reverse
+from django.utils import timezone
+
+
+def _local(value):
+    return timezone.localtime(value).replace(tzinfo=None)
+
+
+def _nth_weekday(year, month, weekday, position):
+    # Day of the month of the `position`th `weekday` (-1 for the last one),
+    # or None when the month doesn't have that many.
+    days_in_month = calendar.monthrange(year, month)[1]
+    if position < 0:
+        return days_in_month - (datetime.date(year, month, days_in_month).weekday() - weekday) % 7
+    day = 1 + (weekday - datetime.date(year, month, 1).weekday()) % 7 + (position - 1) * 7
+    return day if day <= days_in_month else None
+
+
+def occurrence_starts(series, start, end):
+    # Start times of the series' occurrences in [start, end), in order.
+    # Weekly and monthly rules are evaluated in local time so a Mass stays at
+    # 9:00 across DST changes, and iteration jumps straight to the first
+    # period overlapping `start` rather than walking from the first one.
+    first = _local(series.start_datetime)
+    low = max(_local(start), first)
+    high = _local(end)
+    if series.until:
+        high = min(high, datetime.datetime.combine(series.until + datetime.timedelta(days=1), datetime.time.min))
+    if low >= high:
+        return
+
+    skipped = {exception.date for exception in series.exceptions.all()}
+    weekdays = series.get_weekdays()
+    time_of_day = first.time()
+    interval = max(series.interval, 1)
+
+    if series.frequency == series.WEEKLY:
+        first_week = first.date() - datetime.timedelta(days=first.weekday())
+        period = (low.date() - first_week).days // 7 // interval * interval
+        while True:
+            monday = first_week + datetime.timedelta(weeks=period)
+            if datetime.datetime.combine(monday, datetime.time.min) >= high:
+                return
+            for weekday in weekdays:
+                local = datetime.datetime.combine(monday + datetime.timedelta(days=weekday), time_of_day)
+                if low <= local < high and local.date() not in skipped:
+                    yield timezone.make_aware(local)
+            period += interval
+    else:
+        position = series.get_set_position()
+        first_month = first.year * 12 + first.month - 1
+        period = (low.year * 12 + low.month - 1 - first_month) // interval * interval
+        while True:
+            year, month = divmod(first_month + period, 12)
+            month += 1
+            if datetime.datetime(year, month, 1) >= high:
+                return
+            days = sorted(
+                day for day in (_nth_weekday(year, month, weekday, position) for weekday in weekdays)
+                if day is not None
+            )
+            for day in days:
+                local = datetime.datetime.combine(datetime.date(year, month, day), time_of_day)
+                if low <= local < high and local.date() not in skipped:
+                    yield timezone.make_aware(local)
+            period += interval
+
+
+class Occurrence:
+    # Stand-in for a series occurrence that has no Event row yet. It has the
+    # attributes list and calendar templates read from an Event; anything
+    # that needs a real row (assignments, attendance, tasks) goes through
+    # materialize() first.
+    is_virtual = True
+    pk = id = None
+    volunteers_count = 0
+
+    def __init__(self, series, start):
+        self.series = series
+        self.series_id = series.pk
+        self.occurrence_start = self.start_datetime = start
+        self.end_datetime = start + series.duration
+        for field in series.EVENT_FIELDS:
+            setattr(self, field, getattr(series, field))
+
+    def __str__(self):
+        return f"{self.title} - {self.start_datetime.date()}"
+
+    @property
+    def ministry(self):
+        return self.series.ministry
+
+    def get_event_type_display(self):
+        return dict(self.series.EVENT_TYPE_CHOICES).get(self.event_type, self.event_type)
+
+    def get_absolute_url(self):
+        return reverse('events:occurrence', args=[self.series_id, int(self.occurrence_start.timestamp())])
+
+    def materialize(self):
+        return self.series.materialize(self.occurrence_start)
+
+
+def expand(events, series, start, end):
+    # Events starting in [start, end) from the `events` queryset, plus
+    # virtual Occurrences for the `series` queryset in the same range that
+    # don't have a row yet, sorted by start time. Nothing is written.
+    from .models import Event
+
+    series = list(series.prefetch_related('exceptions'))
+    items = list(events.filter(start_datetime__gte=start, start_datetime__lt=end))
+    taken = set(
+        Event.objects.filter(series__in=series, occurrence_start__gte=start, occurrence_start__lt=end)
+        .values_list('series_id', 'occurrence_start')
+    )
+    for recurring in series:
+        items.extend(
+            Occurrence(recurring, occurrence)
+            for occurrence in occurrence_starts(recurring, start, end)
+            if (recurring.pk, occurrence) not in taken
+        )
+    items.sort(key=lambda item: item.start_datetime)
+    return items
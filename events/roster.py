@@ -0,0 +1,230 @@
+import datetime
+import heapq
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.utils import timezone
+from ccvms import fragments
+from volunteers.models import Volunteer
+from . import recommendations
+from .conflicts import overlapping
+from .models import Event, EventSeries
+from .recurrence import expand
+
+SESSION_KEY = 'roster_plan'
+
+# How much one extra assignment in the range outweighs suitability. Scores
+# are 0..1, so with a weight of 1 the least loaded volunteer always wins and
+# the score only breaks ties between equally loaded volunteers.
+LOAD_WEIGHT = 1.0
+
+
+def event_key(event):
+    # Events are keyed by id; series occurrences without a row yet by
+    # "<series id>:<start timestamp>", as in their URLs.
+    if event.id is not None:
+        return event.id
+    return f'{event.series_id}:{int(event.occurrence_start.timestamp())}'
+
+
+class RosterPlan:
+    def __init__(self, ministry, start, end):
+        self.ministry = ministry
+        self.start = start
+        self.end = end
+        self.events = []
+        self.assignments = defaultdict(list)
+        self.shortfalls = {}
+        self.uncapped = []
+
+    def __len__(self):
+        return sum(len(volunteer_ids) for volunteer_ids in self.assignments.values())
+
+    def pairs(self):
+        return [
+            (key, volunteer_id)
+            for key, volunteer_ids in self.assignments.items()
+            for volunteer_id in volunteer_ids
+        ]
+
+    def rows(self):
+        # Preview diff, one row per event in date order with the volunteers
+        # the plan would add.
+        volunteers = Volunteer.objects.select_related('user').in_bulk(
+            {volunteer_id for _, volunteer_id in self.pairs()}
+        )
+        return [
+            {
+                'event': event,
+                'added': [volunteers[volunteer_id] for volunteer_id in self.assignments.get(event_key(event), [])],
+                'shortfall': self.shortfalls.get(event_key(event), 0),
+            }
+            for event in sorted(self.events, key=lambda event: event.start_datetime)
+        ]
+
+    def to_session(self):
+        return {
+            'ministry': self.ministry.id,
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'pairs': self.pairs(),
+        }
+
+
+def _busy(volunteer_ids, start, end):
+    # Intervals each volunteer is already booked for, across all ministries,
+    # for active events overlapping start..end.
+    busy = defaultdict(list)
+    rows = Event.assigned_volunteers.through.objects.filter(overlapping(start, end, 'event__'))
+    if volunteer_ids is not None:
+        rows = rows.filter(volunteer_id__in=volunteer_ids)
+    for volunteer_id, event_start, event_end in rows.values_list(
+        'volunteer_id', 'event__start_datetime', 'event__end_datetime'
+    ):
+        busy[volunteer_id].append((event_start, event_end))
+    return busy
+
+
+def _overlaps(intervals, event):
+    return any(start < event.end_datetime and event.start_datetime < end for start, end in intervals)
+
+
+def solve(ministry, start, end):
+    # Fills every open slot of the ministry's upcoming capped events between
+    # start and end in one pass. Events with the fewest eligible volunteers
+    # per open slot are filled first; within an event volunteers are picked
+    # by fewest assignments in the range so far, then by recommendation
+    # score. Nobody is placed on two overlapping events, including events of
+    # other ministries they are already assigned to. Nothing is written:
+    # series occurrences without a row are planned as virtual Occurrences
+    # and only materialized by apply().
+    plan = RosterPlan(ministry, start, end)
+    events = expand(
+        Event.objects.filter(ministry=ministry, is_active=True).order_by('start_datetime', 'id'),
+        ministry.event_series.filter(is_active=True),
+        max(start, timezone.now()),
+        end,
+    )
+    plan.uncapped = [event for event in events if event.max_volunteers is None]
+    plan.events = [event for event in events if event.max_volunteers is not None]
+    if not plan.events:
+        return plan
+
+    window_start = min(event.start_datetime for event in plan.events)
+    window_end = max(event.end_datetime for event in plan.events)
+    candidates = Volunteer.objects.filter(ministries=ministry, is_active=True, user__is_active=True)
+    busy = _busy(candidates.values('id'), window_start, window_end)
+    load = Counter({volunteer_id: len(intervals) for volunteer_id, intervals in busy.items()})
+
+    assigned = defaultdict(set)
+    for event_id, volunteer_id in Event.assigned_volunteers.through.objects.filter(
+        event__in=[event.id for event in plan.events if event.id is not None]
+    ).values_list('event_id', 'volunteer_id'):
+        assigned[event_id].add(volunteer_id)
+
+    pools = recommendations.scores(plan.events, candidates, available_only=True, key=event_key)
+    for event in plan.events:
+        for volunteer_id in assigned[event.id]:
+            pools[event_key(event)].pop(volunteer_id, None)
+
+    def open_slots(event):
+        return max(event.max_volunteers - len(assigned[event.id]), 0)
+
+    def scarcity(event):
+        slots = open_slots(event)
+        return (len(pools[event_key(event)]) / slots if slots else float('inf'), event.start_datetime, str(event_key(event)))
+
+    for event in sorted(plan.events, key=scarcity):
+        slots = open_slots(event)
+        if not slots:
+            continue
+        chosen = heapq.nsmallest(slots, (
+            (load[volunteer_id] * LOAD_WEIGHT - score, volunteer_id)
+            for volunteer_id, score in pools[event_key(event)].items()
+            if not _overlaps(busy[volunteer_id], event)
+        ))
+        for _, volunteer_id in chosen:
+            plan.assignments[event_key(event)].append(volunteer_id)
+            busy[volunteer_id].append((event.start_datetime, event.end_datetime))
+            load[volunteer_id] += 1
+        if len(chosen) < slots:
+            plan.shortfalls[event_key(event)] = slots - len(chosen)
+    return plan
+
+
+def _materialize(keys):
+    # {key: event id} for the occurrence keys of a plan, creating their rows.
+    # Keys whose series is gone or inactive, or that are no longer an
+    # occurrence, are left out.
+    wanted = defaultdict(list)
+    for key in keys:
+        series_id, timestamp = key.split(':')
+        wanted[int(series_id)].append((key, int(timestamp)))
+    series = EventSeries.objects.filter(is_active=True).prefetch_related('exceptions').in_bulk(list(wanted))
+    ids = {}
+    for series_id, occurrences in wanted.items():
+        recurring = series.get(series_id)
+        if recurring is None:
+            continue
+        for key, timestamp in occurrences:
+            start = recurring.occurrence_at(datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc))
+            if start is not None:
+                ids[key] = recurring.materialize(start).id
+    return ids
+
+
+def apply(pairs):
+    # Writes a previewed plan with a single bulk insert into the
+    # assignment table, first creating rows for the series occurrences it
+    # covers. Anything that no longer fits because the roster changed since
+    # the preview (event full, inactive or already started, volunteer now
+    # double-booked) is dropped rather than forced in.
+    if not pairs:
+        return []
+    Through = Event.assigned_volunteers.through
+    with transaction.atomic():
+        ids = _materialize({key for key, _ in pairs if isinstance(key, str)})
+        pairs = [
+            (ids[key] if isinstance(key, str) else int(key), int(volunteer_id))
+            for key, volunteer_id in pairs
+            if not isinstance(key, str) or key in ids
+        ]
+        events = Event.objects.select_for_update().filter(
+            id__in={event_id for event_id, _ in pairs},
+            is_active=True,
+            start_datetime__gte=timezone.now(),
+        ).in_bulk()
+        if not events:
+            return []
+        current = set(Through.objects.filter(event_id__in=list(events)).values_list('event_id', 'volunteer_id'))
+        taken = Counter(event_id for event_id, _ in current)
+        busy = _busy(
+            list({volunteer_id for _, volunteer_id in pairs}),
+            min(event.start_datetime for event in events.values()),
+            max(event.end_datetime for event in events.values()),
+        )
+
+        accepted = []
+        for event_id, volunteer_id in pairs:
+            event = events.get(event_id)
+            if event is None or (event_id, volunteer_id) in current:
+                continue
+            if event.max_volunteers is not None and taken[event_id] >= event.max_volunteers:
+                continue
+            if _overlaps(busy[volunteer_id], event):
+                continue
+            accepted.append((event_id, volunteer_id))
+            taken[event_id] += 1
+            busy[volunteer_id].append((event.start_datetime, event.end_datetime))
+
+        # bulk_create bypasses m2m_changed, so the counter caches, feed
+        # timestamps, cached dashboard widgets and cached recommendation
+        # features are brought up to date here instead.
+        Through.objects.bulk_create(
+            [Through(event_id=event_id, volunteer_id=volunteer_id) for event_id, volunteer_id in accepted],
+            ignore_conflicts=True,
+        )
+        Event.recount(pks={event_id for event_id, _ in accepted})
+        Event.objects.filter(pk__in={event_id for event_id, _ in accepted}).update(updated_at=timezone.now())
+        transaction.on_commit(lambda: fragments.bump(Event, Through))
+    recommendations.invalidate({volunteer_id for _, volunteer_id in accepted})
+    return accepted
@@ -0,0 +1,97 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from ccvms.counters import track_fk_count, track_m2m_count
+from attendance.models import Attendance
+from feedback.models import VolunteerEvaluation
+from volunteers.models import Volunteer
+from .models import Event, EventSeries, EventSeriesException, Task, EventReport
+
+track_m2m_count(Event, 'assigned_volunteers', 'volunteers_count')
+track_fk_count(Task, 'event', 'tasks_count')
+track_fk_count(EventReport, 'event', 'reports_count')
+
+
+def _invalidate_features(volunteer_ids):
+    from .recommendations import invalidate
+    invalidate(volunteer_ids)
+
+
+@receiver(post_save, sender=Attendance, dispatch_uid='features_attendance_save')
+@receiver(post_delete, sender=Attendance, dispatch_uid='features_attendance_delete')
+@receiver(post_save, sender=VolunteerEvaluation, dispatch_uid='features_evaluation_save')
+@receiver(post_delete, sender=VolunteerEvaluation, dispatch_uid='features_evaluation_delete')
+def invalidate_features_for_record(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _invalidate_features([instance.volunteer_id])
+
+
+@receiver(post_save, sender=Volunteer, dispatch_uid='features_volunteer_save')
+def invalidate_features_for_volunteer(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        _invalidate_features([instance.pk])
+
+
+@receiver(post_save, sender=Event, dispatch_uid='features_event_save')
+def invalidate_features_for_event(sender, instance, created, raw=False, **kwargs):
+    # A moved event changes its volunteers' last-assignment date.
+    if not raw and not created:
+        _invalidate_features(instance.assigned_volunteers.values_list('id', flat=True))
+
+
+@receiver(m2m_changed, sender=Event.assigned_volunteers.through, dispatch_uid='features_assignment_changed')
+def invalidate_features_for_assignment(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove'):
+        _invalidate_features([instance.pk] if reverse else pk_set)
+    elif action == 'pre_clear':
+        _invalidate_features([instance.pk] if reverse else instance.assigned_volunteers.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Event, dispatch_uid='series_occurrence_deleted')
+def cancel_series_occurrence(sender, instance, **kwargs):
+    # Deleting a materialized occurrence cancels it; otherwise the series
+    # would offer it again as a virtual occurrence.
+    if instance.series_id and instance.occurrence_start:
+        EventSeriesException.objects.get_or_create(
+            series_id=instance.series_id,
+            date=timezone.localdate(instance.occurrence_start),
+        )
+
+
+@receiver(m2m_changed, sender=Event.assigned_volunteers.through, dispatch_uid='touch_events_on_assignment')
+def touch_assigned_events(sender, instance, action, reverse, pk_set, **kwargs):
+    # Assignments don't save the Event, but calendar feed ETags are built from
+    # Event.updated_at, so bump it for every event whose roster changed.
+    if action in ('post_add', 'post_remove'):
+        event_ids = pk_set if reverse else [instance.pk]
+    elif action == 'pre_clear' and reverse:
+        event_ids = list(instance.assigned_events.values_list('id', flat=True))
+    elif action == 'post_clear' and not reverse:
+        event_ids = [instance.pk]
+    else:
+        return
+    Event.objects.filter(pk__in=event_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=EventSeriesException, dispatch_uid='touch_series_on_exception_save')
+@receiver(post_delete, sender=EventSeriesException, dispatch_uid='touch_series_on_exception_delete')
+def touch_series(sender, instance, raw=False, **kwargs):
+    if not raw:
+        EventSeries.objects.filter(pk=instance.series_id).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Event.assigned_volunteers.through, dispatch_uid='promote_waitlist_on_assignment')
+def promote_waitlist_on_removal(sender, instance, action, reverse, pk_set, **kwargs):
+    # A coordinator removing someone frees a place just like a withdrawal.
+    # Runs after the counter cache receiver has recounted the event.
+    from .signup import promote
+
+    if action == 'post_remove':
+        event_ids = pk_set if reverse else [instance.pk]
+    elif action == 'post_clear' and not reverse:
+        event_ids = [instance.pk]
+    else:
+        return
+    for event_id in event_ids:
+        promote(event_id)
+
@@ -0,0 +1,164 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .conflicts import find_conflicts
+from .models import Event, WaitlistEntry
+
+SIGNED_UP = 'signed_up'
+WAITLISTED = 'waitlisted'
+ALREADY_SIGNED_UP = 'already_signed_up'
+ALREADY_WAITLISTED = 'already_waitlisted'
+
+MESSAGES = {
+    SIGNED_UP: 'You are signed up for {event}.',
+    WAITLISTED: '{event} is full. You are on the waitlist and will be added if a place opens up.',
+    ALREADY_SIGNED_UP: 'You are already signed up for {event}.',
+    ALREADY_WAITLISTED: 'You are already on the waitlist for {event}.',
+}
+
+
+class SignupError(Exception):
+    pass
+
+
+def _assignments():
+    return Event.assigned_volunteers.through.objects
+
+
+def _claim(event_id):
+    # Takes one place with a single conditional UPDATE on the counter cache.
+    # It is the first write of its transaction, so under SQLite's single
+    # writer no other signup can slip in between the check and the increment.
+    return Event.objects.filter(pk=event_id, is_active=True).filter(
+        Q(max_volunteers__isnull=True) | Q(volunteers_count__lt=F('max_volunteers'))
+    ).update(volunteers_count=F('volunteers_count') + 1, updated_at=timezone.now())
+
+
+def _release(event_id, count=1):
+    Event.objects.filter(pk=event_id).update(volunteers_count=F('volunteers_count') - count, updated_at=timezone.now())
+
+
+def _lock(event_id):
+    # For transactions that read before they write: writing to the event row
+    # first takes its row lock, or SQLite's write lock, so concurrent
+    # withdrawals queue here instead of failing with "database is locked"
+    # when they try to upgrade a read lock.
+    Event.objects.filter(pk=event_id).update(updated_at=timezone.now())
+
+
+def _check_event(event):
+    if not event.is_active:
+        raise SignupError('This event is not open for sign-up.')
+    if event.start_datetime <= timezone.now():
+        raise SignupError('This event has already started.')
+
+
+def _check_volunteer(event, volunteer):
+    if not volunteer.is_active:
+        raise SignupError('Your volunteer profile is inactive.')
+    if event.ministry_id and not volunteer.ministries.filter(pk=event.ministry_id).exists():
+        raise SignupError(f'Only members of {event.ministry.name} can sign up for this event.')
+    clashes = find_conflicts([volunteer.pk], event.start_datetime, event.end_datetime, event).get(volunteer.pk)
+    if clashes:
+        raise SignupError(f'You are already assigned to {clashes[0].title} at that time.')
+
+
+def check_eligible(event, volunteer):
+    if not event.self_signup:
+        raise SignupError('This event is not open for sign-up.')
+    _check_event(event)
+    _check_volunteer(event, volunteer)
+
+
+def signup(event, volunteer):
+    # Assigns the volunteer if a place is free, otherwise adds them to the
+    # waitlist. Safe to call concurrently for the same event: the counter
+    # never passes max_volunteers.
+    from .recommendations import invalidate
+
+    check_eligible(event, volunteer)
+    if _assignments().filter(event_id=event.pk, volunteer_id=volunteer.pk).exists():
+        return ALREADY_SIGNED_UP
+    try:
+        with transaction.atomic():
+            if _claim(event.pk):
+                _assignments().create(event_id=event.pk, volunteer_id=volunteer.pk)
+                WaitlistEntry.objects.filter(event_id=event.pk, volunteer_id=volunteer.pk).delete()
+                status = SIGNED_UP
+            else:
+                _, created = WaitlistEntry.objects.get_or_create(event_id=event.pk, volunteer_id=volunteer.pk)
+                status = WAITLISTED if created else ALREADY_WAITLISTED
+    except IntegrityError:
+        # Signed up by a concurrent request; the claim was rolled back with it.
+        return ALREADY_SIGNED_UP
+    if status == SIGNED_UP:
+        invalidate([volunteer.pk])
+    return status
+
+
+def withdraw(event, volunteer):
+    # Frees the volunteer's place (promoting from the waitlist) or takes them
+    # off the waitlist. Returns the ids of promoted volunteers.
+    with transaction.atomic():
+        _lock(event.pk)
+        removed, _ = _assignments().filter(event_id=event.pk, volunteer_id=volunteer.pk).delete()
+        if not removed:
+            WaitlistEntry.objects.filter(event_id=event.pk, volunteer_id=volunteer.pk).delete()
+            return []
+        _release(event.pk, removed)
+        promoted = promote(event.pk)
+    from .recommendations import invalidate
+    invalidate([volunteer.pk])
+    return promoted
+
+
+def promote(event_id):
+    # Moves waitlisted volunteers onto the event, oldest first, while places
+    # are free. Each goes through the same checks as a signup, apart from
+    # self_signup; anyone who fails them (inactive, left the ministry, now
+    # busy at that time) is skipped and stays on the waitlist. Places are
+    # taken with the same conditional increment as a signup.
+    from .recommendations import invalidate
+
+    if not WaitlistEntry.objects.filter(event_id=event_id).exists():
+        return []
+    promoted = []
+    with transaction.atomic():
+        _lock(event_id)
+        event = Event.objects.select_related('ministry').filter(pk=event_id).first()
+        if event is None:
+            return []
+        try:
+            _check_event(event)
+        except SignupError:
+            return []
+        for entry in WaitlistEntry.objects.filter(event_id=event_id).select_related('volunteer').order_by('created_at', 'id'):
+            try:
+                _check_volunteer(event, entry.volunteer)
+            except SignupError:
+                continue
+            if not _claim(event_id):
+                break
+            entry.delete()
+            try:
+                with transaction.atomic():
+                    _assignments().create(event_id=event_id, volunteer_id=entry.volunteer_id)
+            except IntegrityError:
+                _release(event_id)
+                continue
+            promoted.append(entry.volunteer_id)
+    invalidate(promoted)
+    return promoted
+
+
+def status_for(event, volunteer):
+    # (status, waitlist position) for showing on the event page.
+    if event.assigned_volunteers.filter(pk=volunteer.pk).exists():
+        return SIGNED_UP, None
+    entry = WaitlistEntry.objects.filter(event=event, volunteer=volunteer).first()
+    if entry is None:
+        return None, None
+    ahead = WaitlistEntry.objects.filter(event=event).filter(
+        Q(created_at__lt=entry.created_at) | Q(created_at=entry.created_at, id__lt=entry.id)
+    ).count()
+    return WAITLISTED, ahead + 1
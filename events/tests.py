@@ -1,3 +1,453 @@
-from django.test import TestCase
+import datetime
+import io
+import random
+import threading
+import time
+from collections import Counter
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from ccvms.testing import QueryCountMixin
+from ministries.models import Ministry
+from volunteers.models import AvailabilityWindow, Volunteer
+from . import signup
+from .conflicts import ministry_report
+from .forms import AddVolunteerToEventForm
+from .recommendations import rank
+from .models import CalendarToken, Event, EventReport, Task, WaitlistEntry
 
-# Create your tests here.
+
+@override_settings(AUDIT_ASYNC=False)
+class SignupConcurrencyTests(TransactionTestCase):
+    capacity = 5
+    volunteers = 20
+    
+    def setUp(self):
+        ministry = Ministry.objects.create(name='Choir', description='')
+        start = timezone.now() + datetime.timedelta(days=2)
+        self.event = Event.objects.create(
+            title='Mass',
+            description='',
+            location='Church',
+            ministry=ministry,
+            start_datetime=start,
+            end_datetime=start + datetime.timedelta(hours=1),
+            max_volunteers=self.capacity,
+            self_signup=True,
+        )
+        self.pool = []
+        for i in range(self.volunteers):
+            user = User.objects.create_user(f'volunteer{i}', role='volunteer')
+            self.pool.append(Volunteer.objects.create(user=user, gender='F', age=30))
+        ministry.volunteers.add(*self.pool)
+    
+    def run_parallel(self, func, volunteers):
+        # Starts every call at once, each on its own thread and connection.
+        barrier = threading.Barrier(len(volunteers))
+        results, errors = [], []
+        
+        def work(volunteer):
+            try:
+                barrier.wait()
+                results.append(func(Event.objects.get(pk=self.event.pk), volunteer))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+        
+        threads = [threading.Thread(target=work, args=(volunteer,)) for volunteer in volunteers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return results
+    
+    def assertConsistent(self):
+        self.event.refresh_from_db()
+        assigned = set(self.event.assigned_volunteers.values_list('pk', flat=True))
+        self.assertLessEqual(self.event.volunteers_count, self.capacity)
+        self.assertEqual(self.event.volunteers_count, len(assigned))
+        self.assertFalse(WaitlistEntry.objects.filter(event=self.event, volunteer__in=assigned).exists())
+        return assigned
+    
+    def test_parallel_signups_never_overbook(self):
+        results = self.run_parallel(signup.signup, self.pool)
+        
+        self.assertEqual(Counter(results), {signup.SIGNED_UP: self.capacity, signup.WAITLISTED: self.volunteers - self.capacity})
+        self.assertEqual(len(self.assertConsistent()), self.capacity)
+        self.assertEqual(WaitlistEntry.objects.filter(event=self.event).count(), self.volunteers - self.capacity)
+    
+    def test_parallel_withdrawals_promote_the_waitlist_in_order(self):
+        for volunteer in self.pool:
+            signup.signup(self.event, volunteer)
+        leaving = self.pool[:3]
+        waiting = list(WaitlistEntry.objects.filter(event=self.event).order_by('created_at', 'id').values_list('volunteer_id', flat=True))
+        
+        results = self.run_parallel(signup.withdraw, leaving)
+        
+        self.assertCountEqual([pk for promoted in results for pk in promoted], waiting[:3])
+        assigned = self.assertConsistent()
+        self.assertEqual(len(assigned), self.capacity)
+        self.assertEqual(assigned, {volunteer.pk for volunteer in self.pool[3:self.capacity]} | set(waiting[:3]))
+
+
+
+@override_settings(AUDIT_ASYNC=False)
+class SignupPromotionTests(TestCase):
+    def setUp(self):
+        self.ministry = Ministry.objects.create(name='Choir', description='')
+        self.start = timezone.now() + datetime.timedelta(days=2)
+        self.event = self.make_event('Mass', max_volunteers=1, self_signup=True)
+        self.volunteers = {}
+        for name in ('leaving', 'inactive', 'busy', 'eligible'):
+            user = User.objects.create_user(name, role='volunteer')
+            self.volunteers[name] = Volunteer.objects.create(user=user, gender='F', age=30)
+        self.ministry.volunteers.add(*self.volunteers.values())
+        for volunteer in self.volunteers.values():
+            signup.signup(self.event, volunteer)
+        
+        Volunteer.objects.filter(pk=self.volunteers['inactive'].pk).update(is_active=False)
+        self.make_event('Rehearsal').assigned_volunteers.add(self.volunteers['busy'])
+    
+    def make_event(self, title, **kwargs):
+        return Event.objects.create(
+            title=title,
+            description='',
+            location='Church',
+            ministry=self.ministry,
+            start_datetime=self.start,
+            end_datetime=self.start + datetime.timedelta(hours=1),
+            **kwargs,
+        )
+    
+    def waiting(self):
+        return set(WaitlistEntry.objects.filter(event=self.event).values_list('volunteer_id', flat=True))
+    
+    def test_promotion_skips_volunteers_who_are_no_longer_eligible(self):
+        promoted = signup.withdraw(self.event, self.volunteers['leaving'])
+        
+        self.assertEqual(promoted, [self.volunteers['eligible'].pk])
+        self.assertEqual(list(self.event.assigned_volunteers.values_list('pk', flat=True)), promoted)
+        self.assertEqual(self.waiting(), {self.volunteers['inactive'].pk, self.volunteers['busy'].pk})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.volunteers_count, 1)
+    
+    def test_nobody_is_promoted_once_the_event_has_started(self):
+        Event.objects.filter(pk=self.event.pk).update(start_datetime=timezone.now() - datetime.timedelta(minutes=5))
+        waiting = self.waiting()
+        
+        self.assertEqual(signup.withdraw(self.event, self.volunteers['leaving']), [])
+        self.assertFalse(self.event.assigned_volunteers.exists())
+        self.assertEqual(self.waiting(), waiting)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.volunteers_count, 0)
+
+@override_settings(AUDIT_ASYNC=False)
+class EventViewQueryTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.ministry = Ministry.objects.create(name='Choir', description='')
+        self.priest = User.objects.create_user('priest', role='priest', assigned_ministry=self.ministry)
+        self.coordinator = User.objects.create_user('coordinator', role='coordinator', assigned_ministry=self.ministry)
+        start = timezone.now() + datetime.timedelta(days=2)
+        self.event = Event.objects.create(
+            title='Mass',
+            description='',
+            location='Church',
+            ministry=self.ministry,
+            coordinator=self.coordinator,
+            start_datetime=start,
+            end_datetime=start + datetime.timedelta(hours=1),
+        )
+        self.volunteer = self.add_volunteer('volunteer')
+        self.task = Task.objects.create(event=self.event, title='Chairs', description='', assigned_to=self.volunteer)
+        self.report = EventReport.objects.create(
+            event=self.event,
+            submitted_by=self.coordinator,
+            title='Mass report',
+            summary='',
+            attendance_count=1,
+            volunteer_performance='',
+        )
+    
+    def add_volunteer(self, username):
+        user = User.objects.create_user(username, role='volunteer')
+        volunteer = Volunteer.objects.create(user=user, gender='F', age=30)
+        self.ministry.volunteers.add(volunteer)
+        self.event.assigned_volunteers.add(volunteer)
+        return volunteer
+    
+    def test_event_edit_and_delete_load_the_event_once(self):
+        self.client.force_login(self.priest)
+        self.assertReads(reverse('events:edit', args=[self.event.pk]), Event)
+        self.assertReads(reverse('events:delete', args=[self.event.pk]), Event)
+    
+    def test_coordinator_pages_load_their_object_once(self):
+        self.client.force_login(self.coordinator)
+        self.assertReads(reverse('events:coordinator_detail', args=[self.event.pk]), Event)
+        self.assertReads(reverse('events:task_create', args=[self.event.pk]), Event)
+        self.assertReads(reverse('events:task_edit', args=[self.task.pk]), Task)
+        self.assertReads(reverse('events:task_delete', args=[self.task.pk]), Task)
+        self.assertReads(reverse('events:report_create', args=[self.event.pk]), Event)
+        self.assertReads(reverse('events:report_edit', args=[self.report.pk]), EventReport)
+        self.assertReads(reverse('events:report_detail', args=[self.report.pk]), EventReport)
+    
+    def test_coordinator_detail_queries_do_not_grow_with_the_roster(self):
+        def grow():
+            for i in range(5):
+                volunteer = self.add_volunteer(f'extra{i}')
+                Task.objects.create(event=self.event, title=f'Task {i}', description='', assigned_to=volunteer)
+        
+        self.client.force_login(self.coordinator)
+        self.assertConstantQueries(reverse('events:coordinator_detail', args=[self.event.pk]), grow)
+    
+    def test_calendar_feed_requires_a_user_who_can_log_in(self):
+        url = reverse('events:feed_coordinator', args=[CalendarToken.for_user(self.coordinator).token])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        
+        self.coordinator.is_suspended = True
+        self.coordinator.save()
+        self.assertEqual(self.client.get(url).status_code, 404)
+        
+        self.coordinator.is_suspended = False
+        self.coordinator.approval_status = 'pending'
+        self.coordinator.save()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+@override_settings(AUDIT_ASYNC=False)
+class RecommendationTests(TestCase):
+    pool_size = 5000
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.ministry = Ministry.objects.create(name='Choir', description='')
+        cls.coordinator = User.objects.create_user('coordinator', role='coordinator', assigned_ministry=cls.ministry)
+        start = timezone.now() + datetime.timedelta(days=2)
+        cls.event = Event.objects.create(
+            title='Choir rehearsal',
+            description='Singing and sound setup',
+            event_type='mass',
+            location='Church',
+            ministry=cls.ministry,
+            coordinator=cls.coordinator,
+            start_datetime=start,
+            end_datetime=start + datetime.timedelta(hours=1),
+        )
+        users = User.objects.bulk_create([
+            User(username=f'volunteer{i}', role='volunteer') for i in range(cls.pool_size)
+        ])
+        skills = ['singing', 'sound', 'cooking', 'driving', '']
+        volunteers = Volunteer.objects.bulk_create([
+            Volunteer(user=user, gender='F', age=30, skills=skills[i % len(skills)], interests='', availability='')
+            for i, user in enumerate(users)
+        ])
+        cls.ministry.volunteers.add(*volunteers)
+        weekday = timezone.localtime(start).weekday()
+        AvailabilityWindow.objects.bulk_create([
+            AvailabilityWindow(volunteer=volunteer, weekday=weekday, start_minute=0, end_minute=24 * 60)
+            for volunteer in volunteers[::2]
+        ])
+    
+    def test_form_offers_the_top_n_and_can_list_everyone(self):
+        ranked = [item.volunteer_id for item in rank(self.event, self.ministry.volunteers.all())]
+        limit = AddVolunteerToEventForm.recommendation_limit
+        
+        form = AddVolunteerToEventForm(event=self.event, user=self.coordinator)
+        choices = list(form.fields['volunteers'].choices)
+        self.assertTrue(form.has_more)
+        self.assertEqual([value for value, _ in choices], ranked[:limit])
+        self.assertTrue(all(label.endswith('suggested)') for _, label in choices))
+        
+        form = AddVolunteerToEventForm(event=self.event, user=self.coordinator, show_all=True)
+        choices = list(form.fields['volunteers'].choices)
+        self.assertFalse(form.has_more)
+        self.assertEqual([value for value, _ in choices], ranked)
+        suggested = [label.endswith('suggested)') for _, label in choices]
+        self.assertEqual(suggested, [position < limit for position in range(self.pool_size)])
+    
+    def test_coordinator_page_with_the_top_n_is_fast_for_a_large_ministry(self):
+        # The whole GET of the page the coordinator opens, with warm feature
+        # rows; the first request builds them.
+        url = reverse('events:coordinator_detail', args=[self.event.pk])
+        self.client.force_login(self.coordinator)
+        self.assertContains(self.client.get(url), 'Show all available volunteers')
+        
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            self.client.get(url)
+            timings.append(time.perf_counter() - start)
+        self.assertLess(min(timings), 0.05)
+
+
+@override_settings(AUDIT_ASYNC=False)
+class MinistryReportTests(TestCase):
+    def setUp(self):
+        self.choir = Ministry.objects.create(name='Choir', description='')
+        self.youth = Ministry.objects.create(name='Youth', description='')
+        self.day = timezone.make_aware(datetime.datetime(2030, 1, 7))
+        self.range = (self.day, self.day + datetime.timedelta(days=1))
+    
+    def volunteer(self, name, *ministries):
+        user = User.objects.create_user(name, role='volunteer')
+        volunteer = Volunteer.objects.create(user=user, gender='F', age=30)
+        volunteer.ministries.add(*ministries)
+        return volunteer
+    
+    def event(self, title, start, end, volunteers, ministry=None, is_active=True):
+        # start and end in hours after midnight on self.day.
+        event = Event.objects.create(
+            title=title,
+            description='',
+            location='Church',
+            ministry=ministry or self.choir,
+            start_datetime=self.day + datetime.timedelta(hours=start),
+            end_datetime=self.day + datetime.timedelta(hours=end),
+            is_active=is_active,
+        )
+        event.assigned_volunteers.add(*volunteers)
+        return event
+    
+    def brute_force(self):
+        # Pairwise: an assignment clashes when any assignment ordered before
+        # it (by start, then id) is still running when it starts.
+        start, end = self.range
+        clashes = set()
+        for volunteer in Volunteer.objects.filter(ministries=self.choir):
+            events = sorted(
+                volunteer.assigned_events.filter(is_active=True, start_datetime__lt=end, end_datetime__gt=start),
+                key=lambda event: (event.start_datetime, event.id),
+            )
+            for index, event in enumerate(events):
+                if any(earlier.end_datetime > event.start_datetime for earlier in events[:index]):
+                    clashes.add((volunteer.pk, event.pk))
+        return clashes
+    
+    def report(self):
+        conflicts = ministry_report(self.choir, *self.range)
+        for conflict in conflicts:
+            if conflict.other is not None:
+                self.assertLess(conflict.event.start_datetime, conflict.other.end_datetime)
+        return {(conflict.volunteer.pk, conflict.event.pk) for conflict in conflicts}
+    
+    def test_adjacent_nested_and_cross_ministry_intervals(self):
+        ann = self.volunteer('ann', self.choir)
+        bob = self.volunteer('bob', self.choir, self.youth)
+        cat = self.volunteer('cat', self.youth)
+        
+        # Adjacent: one ends as the next starts.
+        self.event('Mass', 8, 9, [ann])
+        self.event('Rehearsal', 9, 10, [ann])
+        # Nested: both inner events clash with the outer one, the second
+        # although the first inner one has already ended.
+        self.event('Retreat', 11, 17, [ann])
+        workshop = self.event('Workshop', 12, 13, [ann])
+        supper = self.event('Supper', 14, 15, [ann])
+        # Cross-ministry: a youth event still counts for a choir member.
+        self.event('Camp', 8, 12, [bob], ministry=self.youth)
+        practice = self.event('Practice', 10, 11, [bob])
+        # Not in the report: a volunteer outside the ministry, an inactive
+        # event, and an event outside the range.
+        self.event('Youth mass', 8, 9, [cat], ministry=self.youth)
+        self.event('Youth social', 8, 9, [cat], ministry=self.youth)
+        self.event('Cancelled', 8, 9, [ann], is_active=False)
+        self.event('Tomorrow', 24, 26, [ann])
+        self.event('Tomorrow late', 25, 27, [ann])
+        
+        expected = {(ann.pk, workshop.pk), (ann.pk, supper.pk), (bob.pk, practice.pk)}
+        self.assertEqual(self.brute_force(), expected)
+        self.assertEqual(self.report(), expected)
+    
+    def test_matches_brute_force_on_random_schedules(self):
+        rng = random.Random(7)
+        volunteers = [self.volunteer(f'choir{i}', self.choir) for i in range(4)]
+        volunteers.append(self.volunteer('both', self.choir, self.youth))
+        for i in range(40):
+            start = rng.randint(-4, 23)
+            self.event(
+                f'Event {i}',
+                start,
+                start + rng.randint(1, 5),
+                rng.sample(volunteers, rng.randint(1, 3)),
+                ministry=rng.choice([self.choir, self.youth]),
+                is_active=rng.random() > 0.1,
+            )
+        
+        expected = self.brute_force()
+        self.assertTrue(expected)
+        self.assertEqual(self.report(), expected)
+
+
+@override_settings(AUDIT_ASYNC=False)
+class CounterTests(TestCase):
+    def setUp(self):
+        ministry = Ministry.objects.create(name='Choir', description='')
+        start = timezone.now() + datetime.timedelta(days=1)
+        self.mass, self.vigil = (
+            Event.objects.create(
+                title=title,
+                description='',
+                location='Church',
+                ministry=ministry,
+                start_datetime=start,
+                end_datetime=start + datetime.timedelta(hours=1),
+            )
+            for title in ('Mass', 'Vigil')
+        )
+        self.coordinator = User.objects.create_user('coordinator', role='coordinator')
+        user = User.objects.create_user('volunteer', role='volunteer')
+        self.volunteer = Volunteer.objects.create(user=user, gender='F', age=30)
+    
+    def assertCounts(self, mass, vigil):
+        self.assertEqual(
+            [
+                (event.tasks_count, event.reports_count)
+                for event in Event.objects.filter(pk__in=[self.mass.pk, self.vigil.pk]).order_by('title')
+            ],
+            [mass, vigil],
+        )
+        call_command('reconcile_counters', '--check', stdout=io.StringIO())
+    
+    def test_counters_follow_creates_moves_and_deletes(self):
+        tasks = [
+            Task.objects.create(event=self.mass, title=f'Task {i}', description='', assigned_to=self.volunteer)
+            for i in range(3)
+        ]
+        reports = [
+            EventReport.objects.create(
+                event=self.mass, submitted_by=self.coordinator, title=f'Report {i}', summary='',
+                attendance_count=10, volunteer_performance='',
+            )
+            for i in range(2)
+        ]
+        self.assertCounts((3, 2), (0, 0))
+        
+        tasks[0].event = self.vigil
+        tasks[0].save()
+        tasks[0].title = 'Renamed'
+        tasks[0].save()
+        # A row loaded without its foreign key still moves both counters.
+        report = EventReport.objects.only('title').get(pk=reports[0].pk)
+        report.event_id = self.vigil.pk
+        report.save()
+        self.assertCounts((2, 1), (1, 1))
+        
+        Task.objects.only('title').get(pk=tasks[0].pk).delete()
+        tasks[1].delete()
+        reports[1].delete()
+        self.assertCounts((1, 0), (0, 1))
+        
+        self.vigil.delete()
+        self.assertEqual(Event.objects.get(pk=self.mass.pk).tasks_count, 1)
+        call_command('reconcile_counters', '--check', stdout=io.StringIO())
+    
+    def test_check_reports_drift(self):
+        Event.objects.filter(pk=self.mass.pk).update(tasks_count=4)
+        with self.assertRaisesMessage(CommandError, '1 row(s) have drifted counters.'):
+            call_command('reconcile_counters', '--check', stdout=io.StringIO())
+        call_command('reconcile_counters', stdout=io.StringIO())
+        self.assertCounts((0, 0), (0, 0))
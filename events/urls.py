@@ -6,9 +6,21 @@ app_name = 'events'
 urlpatterns = [
     path('', views.EventListView.as_view(), name='list'),
     path('create/', views.EventCreateView.as_view(), name='create'),
+    path('roster/', views.RosterView.as_view(), name='roster'),
+    path('conflicts/', views.ConflictReportView.as_view(), name='conflicts'),
+    path('series/create/', views.EventSeriesCreateView.as_view(), name='series_create'),
+    path('series/<int:pk>/edit/', views.EventSeriesUpdateView.as_view(), name='series_edit'),
+    path('series/<int:pk>/<int:timestamp>/', views.OccurrenceView.as_view(), name='occurrence'),
+    
+    path('calendar/', views.CalendarSubscriptionsView.as_view(), name='calendar'),
+    path('calendar/<str:token>/mine.ics', views.CalendarFeedView.as_view(kind='volunteer'), name='feed_volunteer'),
+    path('calendar/<str:token>/coordinating.ics', views.CalendarFeedView.as_view(kind='coordinator'), name='feed_coordinator'),
+    path('calendar/<str:token>/ministry/<int:pk>.ics', views.CalendarFeedView.as_view(kind='ministry'), name='feed_ministry'),
     path('<int:pk>/', views.EventDetailView.as_view(), name='detail'),
     path('<int:pk>/edit/', views.EventUpdateView.as_view(), name='edit'),
     path('<int:pk>/delete/', views.EventDeleteView.as_view(), name='delete'),
+    path('<int:pk>/signup/', views.EventSignupView.as_view(), name='signup'),
+    path('<int:pk>/withdraw/', views.EventWithdrawView.as_view(), name='withdraw'),
     
     path('<int:pk>/coordinator/', views.CoordinatorEventDetailView.as_view(), name='coordinator_detail'),
     path('<int:pk>/add-volunteers/', views.AddVolunteerToEventView.as_view(), name='add_volunteers'),
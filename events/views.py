@@ -1,23 +1,70 @@
+import datetime
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib import messages
-from django.shortcuts import get_object_or_404, redirect
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.generic import TemplateView
+from django.shortcuts import get_object_or_404, redirect, render
 from django.views import View
 from django.utils import timezone
-from .models import Event, Task, EventReport
-from .forms import EventForm, TaskForm, EventReportForm, AddVolunteerToEventForm
+from ccvms.mixins import CachedObjectMixin
+from ccvms.pagination import KeysetPaginationMixin
+from ministries.models import Ministry
+from . import ical, roster, signup
+from .conflicts import ministry_report
+from .models import CalendarToken, Event, EventSeries, Task, EventReport
+from .forms import EventForm, EventSeriesForm, TaskForm, EventReportForm, AddVolunteerToEventForm
+from .recurrence import Occurrence, expand
 
-class EventListView(LoginRequiredMixin, ListView):
+
+class ParentEventMixin:
+    # Views nested under an event URL load that event once per request.
+    event_url_kwarg = 'event_pk'
+    
+    def get_event(self):
+        if not hasattr(self, '_event'):
+            self._event = get_object_or_404(Event, pk=self.kwargs[self.event_url_kwarg])
+        return self._event
+    
+    def is_event_coordinator(self):
+        user = self.request.user
+        return user.is_coordinator() and self.get_event().coordinator_id == user.id
+
+class EventListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Event
     template_name = 'events/list.html'
     context_object_name = 'events'
     paginate_by = 20
+    upcoming_days = 28
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Recurring series are expanded in memory; their occurrences only get
+        # Event rows once someone opens one to staff it.
+        now = timezone.now()
+        context['upcoming'] = expand(
+            Event.objects.filter(is_active=True).select_related('ministry'),
+            EventSeries.objects.filter(is_active=True).select_related('ministry'),
+            now,
+            now + datetime.timedelta(days=self.upcoming_days),
+        )
+        return context
 
 class EventDetailView(LoginRequiredMixin, DetailView):
     model = Event
     template_name = 'events/detail.html'
     context_object_name = 'event'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        volunteer = getattr(self.request.user, 'volunteer_profile', None)
+        if self.object.self_signup and volunteer is not None:
+            context['signup_status'], context['waitlist_position'] = signup.status_for(self.object, volunteer)
+            context['can_sign_up'] = self.object.start_datetime > timezone.now()
+        return context
 
 class EventCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     model = Event
@@ -48,7 +95,7 @@ class EventCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         messages.success(self.request, 'Event created successfully.')
         return super().form_valid(form)
 
-class EventUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class EventUpdateView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, UpdateView):
     model = Event
     form_class = EventForm
     template_name = 'events/form.html'
@@ -61,10 +108,7 @@ class EventUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         if not user.is_priest():
             return False
         
-        if not user.assigned_ministry:
-            return False
-        
-        return event.ministry == user.assigned_ministry
+        return self.request.scope.manages_event(event)
     
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
@@ -75,7 +119,7 @@ class EventUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         messages.success(self.request, 'Event updated successfully.')
         return super().form_valid(form)
 
-class EventDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class EventDeleteView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, DeleteView):
     model = Event
     template_name = 'events/confirm_delete.html'
     success_url = reverse_lazy('events:list')
@@ -87,86 +131,321 @@ class EventDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         if not user.is_priest():
             return False
         
-        if not user.assigned_ministry:
-            return False
-        
-        return event.ministry == user.assigned_ministry
+        return self.request.scope.manages_event(event)
+
+
+class EventSeriesCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
+    model = EventSeries
+    form_class = EventSeriesForm
+    template_name = 'events/form.html'
+    success_url = reverse_lazy('events:list')
+    extra_context = {'noun': 'Event Series'}
+    
+    def test_func(self):
+        user = self.request.user
+        return user.is_priest() and user.assigned_ministry is not None
+    
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+    
+    def form_valid(self, form):
+        form.instance.ministry = self.request.user.assigned_ministry
+        messages.success(self.request, 'Event series created successfully.')
+        return super().form_valid(form)
+
+class EventSeriesUpdateView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, UpdateView):
+    model = EventSeries
+    form_class = EventSeriesForm
+    template_name = 'events/form.html'
+    success_url = reverse_lazy('events:list')
+    extra_context = {'noun': 'Event Series'}
+    
+    def test_func(self):
+        user = self.request.user
+        return user.is_priest() and self.request.scope.ministry_id == self.get_object().ministry_id
+    
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+    
+    def form_valid(self, form):
+        messages.success(self.request, 'Event series updated. Occurrences that already have their own event keep their details.')
+        return super().form_valid(form)
+
+
+class OccurrenceView(LoginRequiredMixin, View):
+    # One occurrence of a series, addressed by its start time. Redirects to
+    # the Event once it exists; POST creates that Event so volunteers,
+    # tasks and attendance can be attached to it.
+    template_name = 'events/occurrence.html'
+    
+    def get_occurrence(self, pk, timestamp):
+        series = get_object_or_404(EventSeries.objects.select_related('ministry', 'coordinator'), pk=pk)
+        try:
+            second = datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            raise Http404('No such occurrence.')
+        # URLs carry whole seconds; match the occurrence starting within it.
+        event = series.events.filter(
+            occurrence_start__gte=second,
+            occurrence_start__lt=second + datetime.timedelta(seconds=1),
+        ).first()
+        start = event.occurrence_start if event is not None else series.occurrence_at(second)
+        if start is None:
+            raise Http404('No such occurrence.')
+        return series, start, event
+    
+    def can_manage(self, series):
+        user = self.request.user
+        scope = self.request.scope
+        return user.is_administrator() or (scope.is_ministry_staff and scope.ministry_id == series.ministry_id)
+    
+    def get(self, request, pk, timestamp):
+        series, start, event = self.get_occurrence(pk, timestamp)
+        if event is not None:
+            return redirect('events:detail', pk=event.pk)
+        return render(request, self.template_name, {
+            'occurrence': Occurrence(series, start),
+            'can_manage': self.can_manage(series),
+        })
+    
+    def post(self, request, pk, timestamp):
+        series, start, event = self.get_occurrence(pk, timestamp)
+        if not self.can_manage(series):
+            raise PermissionDenied
+        if event is None:
+            event = series.materialize(start)
+        if request.user.is_coordinator() and event.coordinator_id == request.user.id:
+            return redirect('events:coordinator_detail', pk=event.pk)
+        return redirect('events:detail', pk=event.pk)
 
 
-class CoordinatorEventDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+class CoordinatorEventDetailView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, DetailView):
     model = Event
     template_name = 'events/coordinator_detail.html'
     context_object_name = 'event'
+    select_related = ('ministry',)
     
     def test_func(self):
         user = self.request.user
         event = self.get_object()
-        return user.is_coordinator() and event.coordinator == user
+        return user.is_coordinator() and event.coordinator_id == user.id
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        event = self.get_object()
-        context['tasks'] = event.tasks.all()
+        event = self.object
+        context['assigned_volunteers'] = event.assigned_volunteers.select_related('user')
+        context['tasks'] = event.tasks.select_related('assigned_to__user')
         context['reports'] = event.reports.filter(submitted_by=self.request.user)
-        context['add_volunteer_form'] = AddVolunteerToEventForm(event=event, user=self.request.user)
+        context['add_volunteer_form'] = AddVolunteerToEventForm(
+            event=event, user=self.request.user, show_all='all_candidates' in self.request.GET,
+        )
         return context
 
 
-class AddVolunteerToEventView(LoginRequiredMixin, UserPassesTestMixin, View):
+class AddVolunteerToEventView(LoginRequiredMixin, UserPassesTestMixin, ParentEventMixin, View):
+    event_url_kwarg = 'pk'
+    
     def test_func(self):
-        event = get_object_or_404(Event, pk=self.kwargs['pk'])
-        user = self.request.user
-        return user.is_coordinator() and event.coordinator == user
+        return self.is_event_coordinator()
     
     def post(self, request, pk):
-        event = get_object_or_404(Event, pk=pk)
+        event = self.get_event()
         form = AddVolunteerToEventForm(request.POST, event=event, user=request.user)
         
         if form.is_valid():
             volunteers = form.cleaned_data['volunteers']
-            for volunteer in volunteers:
-                event.assigned_volunteers.add(volunteer)
-            messages.success(request, f'{volunteers.count()} volunteer(s) added to event.')
+            event.assigned_volunteers.add(*volunteers)
+            messages.success(request, f'{len(volunteers)} volunteer(s) added to event.')
+        elif 'volunteers' in form.errors:
+            for error in form.errors['volunteers']:
+                messages.error(request, error)
         else:
             messages.error(request, 'Error adding volunteers to event.')
         
         return redirect('events:coordinator_detail', pk=pk)
 
 
-class RemoveVolunteerFromEventView(LoginRequiredMixin, UserPassesTestMixin, View):
+class RemoveVolunteerFromEventView(LoginRequiredMixin, UserPassesTestMixin, ParentEventMixin, View):
     def test_func(self):
-        event = get_object_or_404(Event, pk=self.kwargs['event_pk'])
-        user = self.request.user
-        return user.is_coordinator() and event.coordinator == user
+        return self.is_event_coordinator()
     
     def post(self, request, event_pk, volunteer_pk):
-        event = get_object_or_404(Event, pk=event_pk)
-        volunteer = get_object_or_404(event.assigned_volunteers, pk=volunteer_pk)
+        event = self.get_event()
+        volunteer = get_object_or_404(event.assigned_volunteers.select_related('user'), pk=volunteer_pk)
         event.assigned_volunteers.remove(volunteer)
         messages.success(request, f'{volunteer.user.get_full_name()} removed from event.')
         return redirect('events:coordinator_detail', pk=event_pk)
 
 
-class TaskCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
+class EventSignupView(LoginRequiredMixin, UserPassesTestMixin, ParentEventMixin, View):
+    # A volunteer claiming a place on a self-signup event, or joining its
+    # waitlist when it is full.
+    event_url_kwarg = 'pk'
+    
+    def test_func(self):
+        return hasattr(self.request.user, 'volunteer_profile')
+    
+    def post(self, request, pk):
+        from audit.writer import record
+        
+        event = self.get_event()
+        volunteer = request.user.volunteer_profile
+        try:
+            status = signup.signup(event, volunteer)
+        except signup.SignupError as error:
+            messages.error(request, str(error))
+            return redirect('events:detail', pk=pk)
+        if status in (signup.SIGNED_UP, signup.WAITLISTED):
+            record(
+                'assign',
+                f'{request.user.get_full_name()} {"signed up for" if status == signup.SIGNED_UP else "joined the waitlist of"} {event.title}',
+                obj=event,
+                request=request,
+            )
+        message = signup.MESSAGES[status].format(event=event.title)
+        if status == signup.WAITLISTED:
+            messages.warning(request, message)
+        else:
+            messages.success(request, message)
+        return redirect('events:detail', pk=pk)
+
+
+class EventWithdrawView(LoginRequiredMixin, UserPassesTestMixin, ParentEventMixin, View):
+    event_url_kwarg = 'pk'
+    
+    def test_func(self):
+        return hasattr(self.request.user, 'volunteer_profile')
+    
+    def post(self, request, pk):
+        from audit.writer import record
+        
+        event = self.get_event()
+        if not event.self_signup or event.start_datetime <= timezone.now():
+            messages.error(request, 'Please contact the event coordinator to withdraw from this event.')
+            return redirect('events:detail', pk=pk)
+        signup.withdraw(event, request.user.volunteer_profile)
+        record('other', f'{request.user.get_full_name()} withdrew from {event.title}', obj=event, request=request)
+        messages.success(request, f'You are no longer signed up for {event.title}.')
+        return redirect('events:detail', pk=pk)
+
+
+class MinistryRangeMixin:
+    # Ministry-wide planning pages: ministry staff work on their own ministry,
+    # administrators pick one with ?ministry=. The date range defaults to the
+    # next `default_days` days and is capped at `max_days`.
+    default_days = 31
+    max_days = 92
+    
+    def test_func(self):
+        user = self.request.user
+        scope = self.request.scope
+        return user.is_administrator() or (scope.is_ministry_staff and scope.ministry is not None)
+    
+    def get_ministry(self, params):
+        if self.request.user.is_administrator():
+            ministry_id = params.get('ministry')
+            return Ministry.objects.filter(pk=ministry_id).first() if ministry_id and ministry_id.isdigit() else None
+        return self.request.scope.ministry
+    
+    def get_dates(self, params):
+        today = timezone.localdate()
+        try:
+            start = datetime.date.fromisoformat(params.get('start', ''))
+        except ValueError:
+            start = today
+        try:
+            end = datetime.date.fromisoformat(params.get('end', ''))
+        except ValueError:
+            end = start + datetime.timedelta(days=self.default_days - 1)
+        start = max(start, today)
+        return start, min(max(end, start), start + datetime.timedelta(days=self.max_days - 1))
+    
+    def get_range(self, start, end):
+        return (
+            timezone.make_aware(datetime.datetime.combine(start, datetime.time.min)),
+            timezone.make_aware(datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min)),
+        )
+    
+    def get_range_context(self, ministry, start, end):
+        return {
+            'ministry': ministry,
+            'start': start,
+            'end': end,
+            'ministries': Ministry.objects.order_by('name') if self.request.user.is_administrator() else None,
+        }
+
+
+class RosterView(LoginRequiredMixin, MinistryRangeMixin, UserPassesTestMixin, View):
+    # Previews an automatic roster for a ministry's upcoming events and, on
+    # POST, applies exactly the previewed assignments.
+    template_name = 'events/roster.html'
+    
+    def get(self, request):
+        ministry = self.get_ministry(request.GET)
+        start, end = self.get_dates(request.GET)
+        context = {**self.get_range_context(ministry, start, end), 'plan': None}
+        if ministry is not None:
+            plan = roster.solve(ministry, *self.get_range(start, end))
+            request.session[roster.SESSION_KEY] = plan.to_session()
+            context['plan'] = plan
+            context['rows'] = plan.rows()
+        return render(request, self.template_name, context)
+    
+    def post(self, request):
+        from audit.writer import record
+        
+        ministry = self.get_ministry(request.POST)
+        stored = request.session.pop(roster.SESSION_KEY, None)
+        if ministry is None or not stored or stored['ministry'] != ministry.id:
+            messages.error(request, 'The roster preview has expired. Please review it again before applying.')
+            return redirect('events:roster')
+        
+        accepted = roster.apply(stored['pairs'])
+        dropped = len(stored['pairs']) - len(accepted)
+        record(
+            'assign',
+            f'Applied roster for {ministry.name}: {len(accepted)} assignment(s) from {stored["start"][:10]} to {stored["end"][:10]}',
+            obj=ministry,
+            request=request,
+        )
+        messages.success(request, f'{len(accepted)} volunteer assignment(s) added.')
+        if dropped:
+            messages.warning(request, f'{dropped} assignment(s) were skipped because the roster changed since the preview.')
+        return redirect('events:list')
+
+
+class ConflictReportView(LoginRequiredMixin, MinistryRangeMixin, UserPassesTestMixin, View):
+    template_name = 'events/conflicts.html'
+    
+    def get(self, request):
+        ministry = self.get_ministry(request.GET)
+        start, end = self.get_dates(request.GET)
+        context = {**self.get_range_context(ministry, start, end), 'conflicts': None}
+        if ministry is not None:
+            context['conflicts'] = ministry_report(ministry, *self.get_range(start, end))
+        return render(request, self.template_name, context)
+
+
+class TaskCreateView(LoginRequiredMixin, UserPassesTestMixin, ParentEventMixin, CreateView):
     model = Task
     form_class = TaskForm
     template_name = 'events/task_form.html'
     
     def test_func(self):
-        event = get_object_or_404(Event, pk=self.kwargs['event_pk'])
-        user = self.request.user
-        return user.is_coordinator() and event.coordinator == user
+        return self.is_event_coordinator()
     
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        event = get_object_or_404(Event, pk=self.kwargs['event_pk'])
-        kwargs['event'] = event
+        kwargs['event'] = self.get_event()
         kwargs['user'] = self.request.user
         return kwargs
     
     def form_valid(self, form):
-        event = get_object_or_404(Event, pk=self.kwargs['event_pk'])
-        form.instance.event = event
+        form.instance.event = self.get_event()
         form.instance.assigned_by = self.request.user
         messages.success(self.request, 'Task created successfully.')
         return super().form_valid(form)
@@ -175,20 +454,20 @@ class TaskCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         return reverse_lazy('events:coordinator_detail', kwargs={'pk': self.kwargs['event_pk']})
 
 
-class TaskUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class TaskUpdateView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, UpdateView):
     model = Task
     form_class = TaskForm
     template_name = 'events/task_form.html'
+    select_related = ('event',)
     
     def test_func(self):
         task = self.get_object()
         user = self.request.user
-        return user.is_coordinator() and task.event.coordinator == user
+        return user.is_coordinator() and task.event.coordinator_id == user.id
     
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        task = self.get_object()
-        kwargs['event'] = task.event
+        kwargs['event'] = self.get_object().event
         kwargs['user'] = self.request.user
         return kwargs
     
@@ -200,32 +479,30 @@ class TaskUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         return reverse_lazy('events:coordinator_detail', kwargs={'pk': self.object.event.pk})
 
 
-class TaskDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class TaskDeleteView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, DeleteView):
     model = Task
     template_name = 'events/task_confirm_delete.html'
+    select_related = ('event', 'assigned_to__user')
     
     def test_func(self):
         task = self.get_object()
         user = self.request.user
-        return user.is_coordinator() and task.event.coordinator == user
+        return user.is_coordinator() and task.event.coordinator_id == user.id
     
     def get_success_url(self):
         return reverse_lazy('events:coordinator_detail', kwargs={'pk': self.object.event.pk})
 
 
-class EventReportCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
+class EventReportCreateView(LoginRequiredMixin, UserPassesTestMixin, ParentEventMixin, CreateView):
     model = EventReport
     form_class = EventReportForm
     template_name = 'events/report_form.html'
     
     def test_func(self):
-        event = get_object_or_404(Event, pk=self.kwargs['event_pk'])
-        user = self.request.user
-        return user.is_coordinator() and event.coordinator == user
+        return self.is_event_coordinator()
     
     def form_valid(self, form):
-        event = get_object_or_404(Event, pk=self.kwargs['event_pk'])
-        form.instance.event = event
+        form.instance.event = self.get_event()
         form.instance.submitted_by = self.request.user
         
         if form.instance.status not in ['draft', 'submitted']:
@@ -241,15 +518,16 @@ class EventReportCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView)
         return reverse_lazy('events:coordinator_detail', kwargs={'pk': self.kwargs['event_pk']})
 
 
-class EventReportUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class EventReportUpdateView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, UpdateView):
     model = EventReport
     form_class = EventReportForm
     template_name = 'events/report_form.html'
+    select_related = ('event',)
     
     def test_func(self):
         report = self.get_object()
         user = self.request.user
-        return user.is_coordinator() and report.submitted_by == user and report.status != 'reviewed'
+        return user.is_coordinator() and report.submitted_by_id == user.id and report.status != 'reviewed'
     
     def form_valid(self, form):
         if form.instance.status not in ['draft', 'submitted']:
@@ -265,14 +543,97 @@ class EventReportUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView)
         return reverse_lazy('events:coordinator_detail', kwargs={'pk': self.object.event.pk})
 
 
-class EventReportDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+class EventReportDetailView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, DetailView):
     model = EventReport
     template_name = 'events/report_detail.html'
     context_object_name = 'report'
+    select_related = ('event', 'submitted_by', 'reviewed_by')
     
     def test_func(self):
         report = self.get_object()
         user = self.request.user
-        return (user.is_coordinator() and report.submitted_by == user) or \
-               (user.is_priest() and report.event.ministry == user.assigned_ministry) or \
+        return (user.is_coordinator() and report.submitted_by_id == user.id) or \
+               (user.is_priest() and self.request.scope.manages_event(report.event)) or \
                user.is_administrator()
+
+
+class CalendarSubscriptionsView(LoginRequiredMixin, TemplateView):
+    template_name = 'events/calendar.html'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        token = CalendarToken.for_user(user).token
+        feeds = []
+        ministries = []
+        if hasattr(user, 'volunteer_profile'):
+            feeds.append(('My volunteer schedule', reverse('events:feed_volunteer', args=[token])))
+            ministries += user.volunteer_profile.ministries.filter(is_active=True)
+        if user.is_coordinator():
+            feeds.append(('Events I coordinate', reverse('events:feed_coordinator', args=[token])))
+        if self.request.scope.ministry is not None and self.request.scope.ministry not in ministries:
+            ministries.append(self.request.scope.ministry)
+        feeds += [
+            (f'{ministry.name} events', reverse('events:feed_ministry', args=[token, ministry.pk]))
+            for ministry in ministries
+        ]
+        context['feeds'] = [(label, self.request.build_absolute_uri(url)) for label, url in feeds]
+        return context
+    
+    def post(self, request):
+        CalendarToken.for_user(request.user).reset()
+        messages.success(request, 'Your calendar links have been reset. Subscribe again with the new links.')
+        return redirect('events:calendar')
+
+
+class CalendarFeedView(View):
+    # iCalendar feeds for calendar apps, authenticated by the token in the
+    # URL. The ETag is computed from a single aggregate query, so polling
+    # clients that already have the current version get a 304 without the
+    # feed being rendered; otherwise it is streamed from one range query.
+    kind = None
+    
+    def get_feed(self, user, pk):
+        from ministries.models import Ministry
+        
+        if self.kind == 'volunteer':
+            volunteer = getattr(user, 'volunteer_profile', None)
+            if volunteer is None:
+                raise Http404
+            return 'My volunteer schedule', Event.objects.filter(assigned_volunteers=volunteer), None
+        if self.kind == 'coordinator':
+            if not user.is_coordinator():
+                raise Http404
+            return (
+                'Events I coordinate',
+                Event.objects.filter(coordinator=user),
+                EventSeries.objects.filter(coordinator=user, is_active=True),
+            )
+        ministry = get_object_or_404(Ministry, pk=pk)
+        allowed = (
+            user.is_administrator()
+            or user.get_managed_ministry() == ministry
+            or ministry.volunteers.filter(user=user).exists()
+        )
+        if not allowed:
+            raise Http404
+        return f'{ministry.name} events', ministry.events.all(), ministry.event_series.filter(is_active=True)
+    
+    def get(self, request, token, pk=None):
+        calendar_token = CalendarToken.objects.select_related('user').filter(token=token).first()
+        if calendar_token is None or not calendar_token.user.can_login():
+            raise Http404
+        name, events, series = self.get_feed(calendar_token.user, pk)
+        events = ical.window(events)
+        
+        etag = ical.etag(f'{self.kind}:{pk}', events, series)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = StreamingHttpResponse(
+                ical.stream(name, request.get_host(), events, series),
+                content_type='text/calendar; charset=utf-8',
+            )
+            response['Content-Disposition'] = f'inline; filename="{self.kind}.ics"'
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
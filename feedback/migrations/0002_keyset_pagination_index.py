@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_keyset_pagination_index'),
+        ('feedback', '0001_initial'),
+        ('volunteers', '0004_keyset_pagination_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='volunteerevaluation',
+            index=models.Index(fields=['created_at', 'id'], name='feedback_eval_created_id_idx'),
+        ),
+    ]
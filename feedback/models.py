@@ -19,6 +19,7 @@ class VolunteerEvaluation(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['created_at', 'id'], name='feedback_eval_created_id_idx')]
     
     def __str__(self):
         return f"Evaluation for {self.volunteer} - Rating: {self.rating}/5"
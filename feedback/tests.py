@@ -1,3 +1,23 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from accounts.models import User
+from ccvms.testing import QueryCountMixin
+from volunteers.models import Volunteer
+from .models import VolunteerEvaluation
 
-# Create your tests here.
+
+@override_settings(AUDIT_ASYNC=False)
+class EvaluationViewQueryTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        coordinator = User.objects.create_user('coordinator', role='coordinator')
+        user = User.objects.create_user('volunteer', role='volunteer')
+        self.volunteer = Volunteer.objects.create(user=user, gender='F', age=30)
+        self.evaluation = VolunteerEvaluation.objects.create(volunteer=self.volunteer, evaluated_by=coordinator, rating=5, comments='')
+        self.client.force_login(coordinator)
+    
+    def test_edit_and_delete_load_the_evaluation_once(self):
+        # Checked on POST: both views redirect, so no template is rendered.
+        url = reverse('feedback:evaluation_edit', args=[self.evaluation.pk])
+        self.assertReads(url, VolunteerEvaluation, method='post', data={'volunteer': self.volunteer.pk, 'rating': 4, 'comments': 'Good'})
+        url = reverse('feedback:evaluation_delete', args=[self.evaluation.pk])
+        self.assertReads(url, VolunteerEvaluation, method='post')
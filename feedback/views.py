@@ -3,11 +3,13 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404
+from ccvms.mixins import CachedObjectMixin
+from ccvms.pagination import KeysetPaginationMixin
 from .models import VolunteerEvaluation, EventFeedback
 from .forms import VolunteerEvaluationForm, EventFeedbackForm
 
 
-class FeedbackListView(LoginRequiredMixin, ListView):
+class FeedbackListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = VolunteerEvaluation
     template_name = 'feedback/list.html'
     context_object_name = 'evaluations'
@@ -19,12 +21,8 @@ class FeedbackListView(LoginRequiredMixin, ListView):
         
         if user.is_volunteer_user():
             queryset = queryset.filter(volunteer__user=user)
-        elif user.is_coordinator():
-            ministry = user.get_managed_ministry()
-            if ministry:
-                queryset = queryset.filter(volunteer__ministries=ministry)
-        elif user.is_priest():
-            ministry = user.get_managed_ministry()
+        elif self.request.scope.is_ministry_staff:
+            ministry = self.request.scope.ministry
             if ministry:
                 queryset = queryset.filter(volunteer__ministries=ministry)
         
@@ -46,7 +44,7 @@ class EvaluationCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         return super().form_valid(form)
 
 
-class EvaluationUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class EvaluationUpdateView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, UpdateView):
     model = VolunteerEvaluation
     form_class = VolunteerEvaluationForm
     template_name = 'feedback/evaluation_form.html'
@@ -54,21 +52,21 @@ class EvaluationUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     
     def test_func(self):
         evaluation = self.get_object()
-        return self.request.user.can_provide_feedback() and evaluation.evaluated_by == self.request.user
+        return self.request.user.can_provide_feedback() and evaluation.evaluated_by_id == self.request.user.id
     
     def form_valid(self, form):
         messages.success(self.request, 'Evaluation updated successfully.')
         return super().form_valid(form)
 
 
-class EvaluationDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class EvaluationDeleteView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, DeleteView):
     model = VolunteerEvaluation
     template_name = 'feedback/evaluation_confirm_delete.html'
     success_url = reverse_lazy('feedback:list')
     
     def test_func(self):
         evaluation = self.get_object()
-        return self.request.user.can_provide_feedback() and evaluation.evaluated_by == self.request.user
+        return self.request.user.can_provide_feedback() and evaluation.evaluated_by_id == self.request.user.id
 
 
 class EventFeedbackListView(LoginRequiredMixin, ListView):
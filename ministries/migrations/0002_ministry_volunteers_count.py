@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Ministry = apps.get_model('ministries', 'Ministry')
+    counts = Ministry.volunteers.through.objects.filter(
+        ministry=OuterRef('pk')
+    ).order_by().values('ministry').annotate(n=Count('pk')).values('n')
+    Ministry.objects.update(volunteers_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ministries', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ministry',
+            name='volunteers_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
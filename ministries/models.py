@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from ccvms.counters import related_count
 
 class Ministry(models.Model):
     name = models.CharField(max_length=200)
@@ -9,6 +10,10 @@ class Ministry(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
     
+    # Counter cache, kept current by ministries.signals and reconciled by
+    # `manage.py reconcile_counters`.
+    volunteers_count = models.IntegerField(default=0, editable=False)
+    
     class Meta:
         verbose_name_plural = 'Ministries'
         ordering = ['name']
@@ -17,7 +22,16 @@ class Ministry(models.Model):
         return self.name
     
     def volunteer_count(self):
-        return self.volunteers.count()
+        return self.volunteers_count
+    
+    @classmethod
+    def counter_expressions(cls):
+        return {'volunteers_count': related_count(cls.volunteers.through.objects.all(), 'ministry')}
+    
+    @classmethod
+    def recount(cls, pks=None):
+        queryset = cls.objects.all() if pks is None else cls.objects.filter(pk__in=pks)
+        return queryset.update(**cls.counter_expressions())
 
 class Program(models.Model):
     name = models.CharField(max_length=200)
@@ -0,0 +1,4 @@
+from ccvms.counters import track_m2m_count
+from .models import Ministry
+
+track_m2m_count(Ministry, 'volunteers', 'volunteers_count')
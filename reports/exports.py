@@ -0,0 +1,239 @@
+import csv
+import datetime
+import re
+import zipfile
+from itertools import chain
+from xml.sax.saxutils import escape
+from volunteers.models import Volunteer
+from attendance.models import Attendance
+from feedback.models import VolunteerEvaluation
+from events.models import EventReport
+
+CHUNK_SIZE = 2000
+
+
+def _scope(queryset, user, ministry_lookup):
+    # Same rules as the list views: administrators see everything, priests and
+    # coordinators only their assigned ministry.
+    if user.is_administrator():
+        return queryset
+    ministry = user.get_managed_ministry()
+    if ministry is None:
+        return queryset.none()
+    return queryset.filter(**{ministry_lookup: ministry})
+
+
+DATASETS = {
+    'volunteers': {
+        'title': 'Volunteers',
+        'queryset': lambda: Volunteer.objects.order_by('id'),
+        'ministry_lookup': 'ministries',
+        'columns': [
+            ('ID', 'id'),
+            ('First name', 'user__first_name'),
+            ('Last name', 'user__last_name'),
+            ('Email', 'user__email'),
+            ('Phone', 'user__phone'),
+            ('Gender', 'gender'),
+            ('Age', 'age'),
+            ('Skills', 'skills'),
+            ('Interests', 'interests'),
+            ('Availability', 'availability'),
+            ('Approval status', 'user__approval_status'),
+            ('Active', 'is_active'),
+            ('Date joined', 'date_joined'),
+        ],
+    },
+    'attendance': {
+        'title': 'Attendance',
+        'queryset': lambda: Attendance.objects.order_by('id'),
+        'ministry_lookup': 'event__ministry',
+        'columns': [
+            ('ID', 'id'),
+            ('Event', 'event__title'),
+            ('Event start', 'event__start_datetime'),
+            ('First name', 'volunteer__user__first_name'),
+            ('Last name', 'volunteer__user__last_name'),
+            ('Status', 'status'),
+            ('Notes', 'notes'),
+            ('Marked by', 'marked_by__username'),
+            ('Marked at', 'marked_at'),
+        ],
+    },
+    'evaluations': {
+        'title': 'Evaluations',
+        'queryset': lambda: VolunteerEvaluation.objects.order_by('id'),
+        'ministry_lookup': 'volunteer__ministries',
+        'columns': [
+            ('ID', 'id'),
+            ('First name', 'volunteer__user__first_name'),
+            ('Last name', 'volunteer__user__last_name'),
+            ('Event', 'event__title'),
+            ('Rating', 'rating'),
+            ('Comments', 'comments'),
+            ('Evaluated by', 'evaluated_by__username'),
+            ('Created at', 'created_at'),
+        ],
+    },
+    'event-reports': {
+        'title': 'Event reports',
+        'queryset': lambda: EventReport.objects.order_by('id'),
+        'ministry_lookup': 'event__ministry',
+        'columns': [
+            ('ID', 'id'),
+            ('Event', 'event__title'),
+            ('Event start', 'event__start_datetime'),
+            ('Title', 'title'),
+            ('Status', 'status'),
+            ('Attendance count', 'attendance_count'),
+            ('Summary', 'summary'),
+            ('Volunteer performance', 'volunteer_performance'),
+            ('Challenges', 'challenges'),
+            ('Recommendations', 'recommendations'),
+            ('Submitted by', 'submitted_by__username'),
+            ('Submitted at', 'submitted_at'),
+            ('Reviewed by', 'reviewed_by__username'),
+            ('Reviewed at', 'reviewed_at'),
+        ],
+    },
+}
+
+
+def export_rows(dataset, user):
+    spec = DATASETS[dataset]
+    queryset = _scope(spec['queryset'](), user, spec['ministry_lookup'])
+    fields = [field for _, field in spec['columns']]
+    header = [label for label, _ in spec['columns']]
+    return header, queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+# Text starting with one of these is read as a formula by spreadsheet apps;
+# volunteers can set most text columns themselves through public signup.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _format(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_format(value) for value in row])
+
+
+class _ChunkBuffer:
+    # Write-only file object for ZipFile. It has no tell()/seek(), so zipfile
+    # falls back to streaming mode and everything written can be handed out
+    # and forgotten straight away.
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+_XLSX_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+_XLSX_SHEET_TAIL = '</sheetData></worksheet>'
+
+_XML_ILLEGAL_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_cell(value):
+    value = _format(value)
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_XML_ILLEGAL_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def stream_xlsx(header, rows, sheet_name='Sheet1'):
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        workbook.writestr('_rels/.rels', _XLSX_ROOT_RELS)
+        workbook.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(name=escape(sheet_name[:31])))
+        workbook.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        yield buffer.drain()
+
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(_XLSX_SHEET_HEAD.encode())
+            for number, row in enumerate(chain([header], rows), start=1):
+                cells = ''.join(_xlsx_cell(value) for value in row)
+                sheet.write(f'<row r="{number}">{cells}</row>'.encode())
+                if number % CHUNK_SIZE == 0:
+                    yield buffer.drain()
+            sheet.write(_XLSX_SHEET_TAIL.encode())
+        yield buffer.drain()
+    yield buffer.drain()
+
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
@@ -0,0 +1,110 @@
+import statistics
+import time
+from importlib import import_module
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from accounts.models import User
+from ccvms.dashboard import fragments_for
+
+
+class Command(BaseCommand):
+    help = 'Time the dashboard pages and widgets for one user of each role, under WSGI or ASGI, and print p50/p95 latency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Requests per page (default 200).',
+        )
+        parser.add_argument(
+            '--asgi',
+            action='store_true',
+            help="Send the requests through Django's ASGI handler instead of WSGI.",
+        )
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        if count < 1:
+            raise CommandError('--requests must be at least 1.')
+
+        for role, _ in User.ROLE_CHOICES:
+            user = User.objects.filter(role=role, is_active=True, is_suspended=False, approval_status='approved').first()
+            if user is None:
+                self.stdout.write(f'{role}: no active user, skipped')
+                continue
+
+            urls = [reverse('dashboard')]
+            urls += [reverse('dashboard_fragment', args=[name]) for name in fragments_for(user)]
+            if user.can_view_reports():
+                urls.append(reverse('reports:dashboard'))
+
+            session = self.login(user)
+            try:
+                for url in urls:
+                    result = self.measure(url, count, session.session_key, options['asgi'])
+                    self.stdout.write(f'{role} {url}: {result}')
+            finally:
+                session.delete()
+
+        self.stdout.write(self.style.SUCCESS('Dashboard benchmark finished.'))
+
+    def login(self, user):
+        # Build the session directly: Client.force_login() would fire
+        # user_logged_in and write audit entries and last_login.
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session
+
+    def measure(self, url, count, session_key, asgi):
+        client = AsyncClient() if asgi else Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+        run = async_to_sync(self.atime) if asgi else self.time
+
+        # The first request warms the fragment and navigation caches.
+        (status, _), cold_queries = self.counted(run, client, url, 1)
+        if status != 200:
+            raise CommandError(f'{url} returned {status}.')
+
+        (_, timings), queries = self.counted(run, client, url, count)
+        warm_queries = queries / count
+
+        p50 = statistics.median(timings)
+        p95 = statistics.quantiles(timings, n=20)[-1] if count > 1 else timings[0]
+        return f'p50 {p50:.1f} ms, p95 {p95:.1f} ms, {cold_queries} queries cold, {warm_queries:.1f} warm'
+
+    def counted(self, run, *args):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            result = run(*args)
+        return result, queries
+
+    def time(self, client, url, count):
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+        return response.status_code, timings
+
+    async def atime(self, client, url, count):
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            response = await client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+        return response.status_code, timings
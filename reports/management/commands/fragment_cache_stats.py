@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from ccvms import fragments
+from ccvms.dashboard import FRAGMENTS
+
+NAMES = [*FRAGMENTS, 'navigation']
+
+
+class Command(BaseCommand):
+    help = 'Show hit and miss counts for the cached dashboard widgets and navigation links.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Clear the counters after printing them.',
+        )
+
+    def handle(self, *args, **options):
+        for name, (hits, misses) in fragments.stats(NAMES).items():
+            total = hits + misses
+            rate = f'{hits / total:.1%}' if total else '-'
+            self.stdout.write(f'{name}: {hits} hits, {misses} misses, hit rate {rate}')
+
+        if options['reset']:
+            fragments.reset_stats(NAMES)
+            self.stdout.write(self.style.SUCCESS('Fragment cache counters reset.'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from reports.models import DashboardStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the dashboard counters from the source tables, or check them for drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report drift between the stored counters and the source tables; exit non-zero if any.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            stats = DashboardStats.objects.filter(pk=DashboardStats.SINGLETON_PK).first()
+            if stats is None:
+                raise CommandError('Dashboard stats have not been built yet.')
+
+            drift = stats.drift()
+            if drift:
+                for field, (stored, actual) in sorted(drift.items()):
+                    self.stdout.write(f'{field}: stored {stored}, actual {actual}')
+                raise CommandError(f'{len(drift)} dashboard counter(s) have drifted.')
+
+            self.stdout.write(self.style.SUCCESS('Dashboard stats are up to date.'))
+            return
+
+        stats = DashboardStats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Dashboard stats rebuilt at {stats.rebuilt_at}.'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('active_volunteers', models.IntegerField(default=0)),
+                ('inactive_volunteers', models.IntegerField(default=0)),
+                ('male_volunteers', models.IntegerField(default=0)),
+                ('female_volunteers', models.IntegerField(default=0)),
+                ('active_ministries', models.IntegerField(default=0)),
+                ('active_events', models.IntegerField(default=0)),
+                ('total_attendance', models.IntegerField(default=0)),
+                ('rebuilt_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Dashboard stats',
+            },
+        ),
+    ]
@@ -1,3 +1,91 @@
 from django.db import models
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from volunteers.models import Volunteer
+from ministries.models import Ministry
+from events.models import Event
+from attendance.models import Attendance
 
-# Create your models here.
+
+class DashboardStats(models.Model):
+    SINGLETON_PK = 1
+
+    active_volunteers = models.IntegerField(default=0)
+    inactive_volunteers = models.IntegerField(default=0)
+    male_volunteers = models.IntegerField(default=0)
+    female_volunteers = models.IntegerField(default=0)
+    active_ministries = models.IntegerField(default=0)
+    active_events = models.IntegerField(default=0)
+    total_attendance = models.IntegerField(default=0)
+    rebuilt_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Dashboard stats'
+
+    def __str__(self):
+        return f"Dashboard stats (updated {self.updated_at})"
+
+    @classmethod
+    def compute(cls):
+        counts = Volunteer.objects.aggregate(
+            active_volunteers=Count('id', filter=Q(is_active=True)),
+            inactive_volunteers=Count('id', filter=Q(is_active=False)),
+            male_volunteers=Count('id', filter=Q(gender='M')),
+            female_volunteers=Count('id', filter=Q(gender='F')),
+        )
+        counts['active_ministries'] = Ministry.objects.filter(is_active=True).count()
+        counts['active_events'] = Event.objects.filter(is_active=True).count()
+        counts['total_attendance'] = Attendance.objects.count()
+        return counts
+
+    @classmethod
+    def rebuild(cls):
+        counts = cls.compute()
+        stats, _ = cls.objects.update_or_create(
+            pk=cls.SINGLETON_PK,
+            defaults={**counts, 'rebuilt_at': timezone.now()},
+        )
+        return stats
+
+    @classmethod
+    def load(cls):
+        stats = cls.objects.filter(pk=cls.SINGLETON_PK).first()
+        if stats is None:
+            stats = cls.rebuild()
+        return stats
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        updated = cls.objects.filter(pk=cls.SINGLETON_PK).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+        if not updated:
+            cls.rebuild()
+
+    def drift(self):
+        fresh = self.compute()
+        return {
+            field: (getattr(self, field), value)
+            for field, value in fresh.items()
+            if getattr(self, field) != value
+        }
+
+    @property
+    def gender_stats(self):
+        stats = [
+            {'gender': 'M', 'count': self.male_volunteers},
+            {'gender': 'F', 'count': self.female_volunteers},
+        ]
+        return [stat for stat in stats if stat['count']]
+
+    def as_context(self):
+        return {
+            'total_volunteers': self.active_volunteers,
+            'total_ministries': self.active_ministries,
+            'total_events': self.active_events,
+            'total_attendance': self.total_attendance,
+        }
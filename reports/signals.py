@@ -0,0 +1,100 @@
+from django.apps import apps
+from django.db.models.signals import post_init, post_save, post_delete
+from ccvms import dashboard
+from ccvms.fragments import bump_on
+from volunteers.models import Volunteer
+from ministries.models import Ministry
+from events.models import Event
+from attendance.models import Attendance
+from .models import DashboardStats
+
+
+def volunteer_counters(volunteer):
+    counters = {'active_volunteers' if volunteer.is_active else 'inactive_volunteers': 1}
+    if volunteer.gender == 'M':
+        counters['male_volunteers'] = 1
+    elif volunteer.gender == 'F':
+        counters['female_volunteers'] = 1
+    return counters
+
+
+def ministry_counters(ministry):
+    return {'active_ministries': 1} if ministry.is_active else {}
+
+
+def event_counters(event):
+    return {'active_events': 1} if event.is_active else {}
+
+
+def attendance_counters(attendance):
+    return {'total_attendance': 1}
+
+
+# model -> (counters the row contributes, fields those counters depend on)
+TRACKED_MODELS = {
+    Volunteer: (volunteer_counters, ('is_active', 'gender')),
+    Ministry: (ministry_counters, ('is_active',)),
+    Event: (event_counters, ('is_active',)),
+    Attendance: (attendance_counters, ()),
+}
+
+
+def _diff(new, old):
+    deltas = dict(new)
+    for field, value in old.items():
+        deltas[field] = deltas.get(field, 0) - value
+    return deltas
+
+
+def remember_counters(sender, instance, **kwargs):
+    counters, fields = TRACKED_MODELS[sender]
+    if instance.pk is None:
+        instance._dashboard_counters = {}
+    elif any(field not in instance.__dict__ for field in fields):
+        # Deferred fields: we can't tell what this row contributed without a query.
+        instance._dashboard_counters = None
+    else:
+        instance._dashboard_counters = counters(instance)
+
+
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    counters, _ = TRACKED_MODELS[sender]
+    new = counters(instance)
+    old = {} if created else getattr(instance, '_dashboard_counters', None)
+    if old is None:
+        DashboardStats.rebuild()
+    else:
+        DashboardStats.apply_deltas(_diff(new, old))
+    instance._dashboard_counters = new
+
+
+def update_counters_on_delete(sender, instance, **kwargs):
+    counters, _ = TRACKED_MODELS[sender]
+    old = getattr(instance, '_dashboard_counters', None)
+    if old is None:
+        old = counters(instance)
+    DashboardStats.apply_deltas(_diff({}, old))
+    instance._dashboard_counters = {}
+
+
+for model in TRACKED_MODELS:
+    uid = f'dashboard_stats_{model._meta.label_lower}'
+    post_init.connect(remember_counters, sender=model, dispatch_uid=uid)
+    post_save.connect(update_counters_on_save, sender=model, dispatch_uid=uid)
+    post_delete.connect(update_counters_on_delete, sender=model, dispatch_uid=uid)
+
+
+# Cached dashboard widgets (ccvms.dashboard) are keyed on the version stamps
+# of the models they are built from; any write bumps its model's stamp.
+fragment_models = {label for spec in dashboard.FRAGMENTS.values() for label in spec['models']}
+fragment_models |= {
+    'events.Event',
+    'communications.Announcement',
+    'ministries.Ministry',
+    'volunteers.Volunteer',
+    'feedback.VolunteerEvaluation',
+}
+for label in sorted(fragment_models):
+    bump_on(apps.get_model(label))
@@ -1,3 +1,130 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import zipfile
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from attendance.models import Attendance
+from events.models import Event
+from ministries.models import Ministry
+from volunteers.models import Volunteer
+from .exports import DATASETS
+from .models import DashboardStats
 
-# Create your tests here.
+
+@override_settings(AUDIT_ASYNC=False)
+class ExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', role='administrator')
+        values = [
+            ('=HYPERLINK("http://example.com")', '+1 555 0100', '-2+3', '@SUM(A1)', '\tTab'),
+            ('Ada', '', 'Singing', 'Reading', '\rReturn weekends'),
+        ]
+        for i, (first_name, phone, skills, interests, availability) in enumerate(values):
+            user = User.objects.create_user(f'volunteer{i}', role='volunteer', first_name=first_name, phone=phone)
+            Volunteer.objects.create(
+                user=user, gender='F', age=30, skills=skills, interests=interests, availability=availability,
+            )
+        self.client.force_login(self.admin)
+    
+    def export(self, file_format):
+        response = self.client.get(reverse('reports:export', args=['volunteers', file_format]))
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+    
+    def test_csv_has_the_header_and_neutralises_formulas(self):
+        rows = list(csv.reader(io.StringIO(self.export('csv').decode())))
+        
+        self.assertEqual(rows[0], [label for label, _ in DATASETS['volunteers']['columns']])
+        self.assertEqual(len(rows), 3)
+        first, second = (dict(zip(rows[0], row)) for row in rows[1:])
+        self.assertEqual(first['First name'], '\'=HYPERLINK("http://example.com")')
+        self.assertEqual(first['Phone'], "'+1 555 0100")
+        self.assertEqual(first['Skills'], "'-2+3")
+        self.assertEqual(first['Interests'], "'@SUM(A1)")
+        self.assertEqual(first['Availability'], "'\tTab")
+        self.assertEqual(second['First name'], 'Ada')
+        self.assertEqual(second['Skills'], 'Singing')
+        self.assertEqual(second['Availability'], "'\rReturn weekends")
+    
+    def test_xlsx_neutralises_formulas(self):
+        with zipfile.ZipFile(io.BytesIO(self.export('xlsx'))) as workbook:
+            sheet = workbook.read('xl/worksheets/sheet1.xml').decode()
+        
+        self.assertIn('<t xml:space="preserve">First name</t>', sheet)
+        self.assertIn('<t xml:space="preserve">\'=HYPERLINK("http://example.com")</t>', sheet)
+        self.assertIn("<t xml:space=\"preserve\">'@SUM(A1)</t>", sheet)
+        self.assertNotIn('<t xml:space="preserve">=', sheet)
+
+
+@override_settings(AUDIT_ASYNC=False)
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        DashboardStats.rebuild()
+        self.start = timezone.now() + datetime.timedelta(days=1)
+    
+    def assertNoDrift(self):
+        stats = DashboardStats.load()
+        self.assertEqual(stats.drift(), {})
+        self.assertEqual(
+            {field: getattr(stats, field) for field in DashboardStats.compute()},
+            DashboardStats.compute(),
+        )
+        call_command('rebuild_dashboard_stats', '--check', stdout=io.StringIO())
+    
+    def make_event(self, ministry, title):
+        return Event.objects.create(
+            title=title,
+            description='',
+            location='Church',
+            ministry=ministry,
+            start_datetime=self.start,
+            end_datetime=self.start + datetime.timedelta(hours=1),
+        )
+    
+    def test_counters_follow_creates_edits_and_deletes(self):
+        choir = Ministry.objects.create(name='Choir', description='')
+        youth = Ministry.objects.create(name='Youth', description='')
+        volunteers = []
+        for i, gender in enumerate('MFFM'):
+            user = User.objects.create_user(f'volunteer{i}', role='volunteer')
+            volunteers.append(Volunteer.objects.create(user=user, gender=gender, age=30))
+        mass = self.make_event(choir, 'Mass')
+        picnic = self.make_event(youth, 'Picnic')
+        Attendance.objects.create(event=mass, volunteer=volunteers[0], status='present')
+        Attendance.bulk_mark(picnic, {volunteer.id: ('late', '') for volunteer in volunteers})
+        self.assertNoDrift()
+        
+        volunteers[1].is_active = False
+        volunteers[1].save()
+        volunteers[2].gender = 'M'
+        volunteers[2].save()
+        youth.is_active = False
+        youth.save()
+        mass.is_active = False
+        mass.save()
+        Attendance.bulk_mark(picnic, {volunteers[0].id: ('present', '')})
+        self.assertNoDrift()
+        
+        Volunteer.objects.get(pk=volunteers[3].pk).delete()
+        picnic.delete()
+        Attendance.objects.get(event=mass, volunteer=volunteers[0]).delete()
+        choir.delete()
+        self.assertNoDrift()
+        
+        stats = DashboardStats.load()
+        self.assertEqual(
+            (stats.active_volunteers, stats.inactive_volunteers, stats.male_volunteers, stats.female_volunteers),
+            (2, 1, 2, 1),
+        )
+        self.assertEqual((stats.active_ministries, stats.active_events, stats.total_attendance), (0, 0, 0))
+    
+    def test_check_reports_drift(self):
+        DashboardStats.objects.update(active_events=5)
+        with self.assertRaisesMessage(CommandError, '1 dashboard counter(s) have drifted.'):
+            call_command('rebuild_dashboard_stats', '--check', stdout=io.StringIO())
+        call_command('rebuild_dashboard_stats', stdout=io.StringIO())
+        self.assertNoDrift()
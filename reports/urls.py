@@ -5,4 +5,5 @@ app_name = 'reports'
 
 urlpatterns = [
     path('', views.ReportsDashboardView.as_view(), name='dashboard'),
+    path('export/<slug:dataset>/<slug:file_format>/', views.ExportView.as_view(), name='export'),
 ]
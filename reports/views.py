@@ -1,10 +1,10 @@
-from django.views.generic import TemplateView
+from django.views.generic import TemplateView, View
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count, Q
-from volunteers.models import Volunteer
-from ministries.models import Ministry
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
 from events.models import Event
-from attendance.models import Attendance
+from .models import DashboardStats
+from . import exports
 
 class ReportsDashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
     template_name = 'reports/dashboard.html'
@@ -14,16 +14,35 @@ class ReportsDashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_volunteers'] = Volunteer.objects.filter(is_active=True).count()
-        context['total_ministries'] = Ministry.objects.filter(is_active=True).count()
-        context['total_events'] = Event.objects.filter(is_active=True).count()
-        context['total_attendance'] = Attendance.objects.count()
+        stats = DashboardStats.load()
+        context.update(stats.as_context())
         
-        context['active_volunteers'] = Volunteer.objects.filter(is_active=True).count()
-        context['inactive_volunteers'] = Volunteer.objects.filter(is_active=False).count()
+        context['active_volunteers'] = stats.active_volunteers
+        context['inactive_volunteers'] = stats.inactive_volunteers
         
-        context['gender_stats'] = Volunteer.objects.values('gender').annotate(count=Count('id'))
+        context['gender_stats'] = stats.gender_stats
         
         context['recent_events'] = Event.objects.filter(is_active=True).order_by('-start_datetime')[:5]
+        context['export_datasets'] = [(key, spec['title']) for key, spec in exports.DATASETS.items()]
         
         return context
+
+
+class ExportView(LoginRequiredMixin, UserPassesTestMixin, View):
+    def test_func(self):
+        return self.request.user.can_export_reports()
+    
+    def get(self, request, dataset, file_format):
+        if dataset not in exports.DATASETS or file_format not in exports.CONTENT_TYPES:
+            raise Http404('Unknown export.')
+        
+        header, rows = exports.export_rows(dataset, request.user)
+        if file_format == 'xlsx':
+            content = exports.stream_xlsx(header, rows, sheet_name=exports.DATASETS[dataset]['title'])
+        else:
+            content = exports.stream_csv(header, rows)
+        
+        response = StreamingHttpResponse(content, content_type=exports.CONTENT_TYPES[file_format])
+        filename = f"{dataset}-{timezone.now():%Y%m%d}.{file_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
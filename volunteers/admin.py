@@ -1,8 +1,19 @@
 from django.contrib import admin
-from .models import Volunteer
+from .models import Volunteer, AvailabilityWindow, AvailabilityException
+
+
+class AvailabilityWindowInline(admin.TabularInline):
+    model = AvailabilityWindow
+    extra = 0
+
+
+class AvailabilityExceptionInline(admin.TabularInline):
+    model = AvailabilityException
+    extra = 0
 
 @admin.register(Volunteer)
 class VolunteerAdmin(admin.ModelAdmin):
     list_display = ['user', 'gender', 'age', 'date_joined', 'is_active']
     list_filter = ['gender', 'is_active', 'date_joined']
     search_fields = ['user__first_name', 'user__last_name', 'user__email', 'skills', 'interests']
+    inlines = [AvailabilityWindowInline, AvailabilityExceptionInline]
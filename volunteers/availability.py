@@ -0,0 +1,204 @@
+import datetime
+import re
+from django.db.models import Q
+from django.utils import timezone
+from .models import AvailabilityWindow, AvailabilityException
+
+MINUTES_PER_DAY = 24 * 60
+
+DAY_NAMES = {
+    'monday': 0, 'mon': 0,
+    'tuesday': 1, 'tues': 1, 'tue': 1,
+    'wednesday': 2, 'wed': 2,
+    'thursday': 3, 'thurs': 3, 'thur': 3, 'thu': 3,
+    'friday': 4, 'fri': 4,
+    'saturday': 5, 'sat': 5,
+    'sunday': 6, 'sun': 6,
+}
+
+DAY_GROUPS = {
+    'weekday': (0, 1, 2, 3, 4),
+    'weekend': (5, 6),
+    'daily': tuple(range(7)),
+    'everyday': tuple(range(7)),
+    'every day': tuple(range(7)),
+    'any day': tuple(range(7)),
+    'anytime': tuple(range(7)),
+    'any time': tuple(range(7)),
+}
+
+PERIODS = {
+    'morning': (6 * 60, 12 * 60),
+    'afternoon': (12 * 60, 17 * 60),
+    'evening': (17 * 60, 22 * 60),
+    'night': (18 * 60, 23 * 60),
+}
+
+_DAY = '|'.join(sorted(DAY_NAMES, key=len, reverse=True))
+_CLOCK = r'(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?'
+
+_TOKEN = re.compile(
+    rf'(?P<day_range>\b(?:{_DAY})\b\s*(?:-|–|to|through|thru|until)\s*\b(?:{_DAY})\b)'
+    rf'|(?P<time_range>\b(?:from\s+)?{_CLOCK}\s*(?:-|–|to|until|till)\s*{_CLOCK})'
+    rf'|(?P<after>\b(?:after|from)\s+{_CLOCK})'
+    rf'|(?P<before>\b(?:before|until|till)\s+{_CLOCK})'
+    rf'|(?P<group>\b(?:{"|".join(DAY_GROUPS)})s?\b)'
+    rf'|(?P<day>\b(?:{_DAY})s?\b)'
+    rf'|(?P<period>\b(?:{"|".join(PERIODS)})s?\b)'
+)
+
+_RANGE = re.compile(rf'{_CLOCK}\s*(?:-|–|to|until|till)\s*{_CLOCK}')
+
+
+def _minutes(hour, minute, meridiem, default_meridiem=None):
+    hour, minute = int(hour), int(minute or 0)
+    meridiem = (meridiem or default_meridiem or '').replace('.', '')
+    if meridiem == 'pm' and hour < 12:
+        hour += 12
+    elif meridiem == 'am' and hour == 12:
+        hour = 0
+    return min(hour * 60 + minute, MINUTES_PER_DAY)
+
+
+def _time_range(match):
+    start_h, start_m, start_mer, end_h, end_m, end_mer = match.groups()
+    start = _minutes(start_h, start_m, start_mer, end_mer if int(start_h) <= int(end_h) else None)
+    if end_mer:
+        # Only an explicit end such as "10pm-2am" runs past midnight.
+        return start, _minutes(end_h, end_m, end_mer)
+    # "10am-2" or "10-2": the start's am/pm, or the next one if that would
+    # end before the start; failing both, the end of the day.
+    end = _minutes(end_h, end_m, None, start_mer)
+    if end <= start and end < 12 * 60:
+        end += 12 * 60
+    return start, end if end > start else MINUTES_PER_DAY
+
+
+def parse_availability(text):
+    # Best-effort reading of free-text availability such as "weekends",
+    # "Mon-Fri after 5pm" or "Saturday mornings and Sunday 2-6pm". Days and
+    # times are collected left to right; a day mentioned after a time starts a
+    # new group. Days without a time mean the whole day, times without a day
+    # mean every day. Returns merged (weekday, start_minute, end_minute) tuples.
+    groups = []
+    days, times = [], []
+    for match in _TOKEN.finditer((text or '').lower()):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind in ('day_range', 'group', 'day'):
+            if days and times:
+                groups.append((days, times))
+                days, times = [], []
+            if kind == 'day_range':
+                first, last = (DAY_NAMES[name] for name in re.findall(_DAY, value)[:2])
+                days.extend((first + offset) % 7 for offset in range((last - first) % 7 + 1))
+            elif kind == 'group':
+                days.extend(DAY_GROUPS[value if value in DAY_GROUPS else value[:-1]])
+            else:
+                days.append(DAY_NAMES[value if value in DAY_NAMES else value[:-1]])
+        elif kind == 'time_range':
+            times.append(_time_range(_RANGE.search(value)))
+        elif kind == 'after':
+            clock = re.search(_CLOCK, value)
+            times.append((_minutes(*clock.groups(), default_meridiem='pm'), MINUTES_PER_DAY))
+        elif kind == 'before':
+            clock = re.search(_CLOCK, value)
+            times.append((0, _minutes(*clock.groups())))
+        else:
+            times.append(PERIODS[value if value in PERIODS else value[:-1]])
+    if days or times:
+        groups.append((days, times))
+
+    windows = set()
+    for days, times in groups:
+        for weekday in days or range(7):
+            for start, end in times or [(0, MINUTES_PER_DAY)]:
+                if end > start:
+                    windows.add((weekday, start, end))
+                elif end < start:
+                    # Runs past midnight into the next day.
+                    windows.add((weekday, start, MINUTES_PER_DAY))
+                    windows.add(((weekday + 1) % 7, 0, end))
+    return merge_windows(windows)
+
+
+def merge_windows(windows):
+    merged = []
+    for weekday, start, end in sorted(windows):
+        if merged and merged[-1][0] == weekday and start <= merged[-1][2]:
+            merged[-1] = (weekday, merged[-1][1], max(end, merged[-1][2]))
+        else:
+            merged.append((weekday, start, end))
+    return merged
+
+
+def sync_windows(volunteer):
+    volunteer.availability_windows.all().delete()
+    AvailabilityWindow.objects.bulk_create([
+        AvailabilityWindow(volunteer=volunteer, weekday=weekday, start_minute=start, end_minute=end)
+        for weekday, start, end in parse_availability(volunteer.availability)
+    ])
+
+
+def day_segments(start, end):
+    # Splits [start, end) into per-day (date, start_minute, end_minute) pieces
+    # in local time, so an event running past midnight needs a window on both
+    # days.
+    start = timezone.localtime(start).replace(tzinfo=None)
+    end = timezone.localtime(end).replace(tzinfo=None)
+    if end <= start:
+        minute = start.hour * 60 + start.minute
+        return [(start.date(), minute, minute)]
+
+    segments = []
+    cursor = start
+    while cursor < end:
+        midnight = datetime.datetime.combine(cursor.date() + datetime.timedelta(days=1), datetime.time.min)
+        segment_end = min(end, midnight)
+        end_minute = MINUTES_PER_DAY if segment_end == midnight else segment_end.hour * 60 + segment_end.minute
+        segments.append((cursor.date(), cursor.hour * 60 + cursor.minute, end_minute))
+        cursor = segment_end
+    return segments
+
+
+def _away(date, start_minute, end_minute):
+    return AvailabilityException.objects.filter(date=date, is_available=False).filter(
+        Q(start_minute__isnull=True) | Q(start_minute__lt=end_minute, end_minute__gt=start_minute)
+    ).values('volunteer_id')
+
+
+def availability_condition(start, end):
+    # Q() matching volunteers free for the whole of [start, end). Each day is
+    # an uncorrelated IN (...) on the (weekday, start_minute, end_minute)
+    # index, minus date exceptions, so it stays part of one SELECT.
+    condition = Q()
+    for date, start_minute, end_minute in day_segments(start, end):
+        weekly = AvailabilityWindow.objects.filter(
+            weekday=date.weekday(), start_minute__lte=start_minute, end_minute__gte=end_minute,
+        ).values('volunteer_id')
+        extra = AvailabilityException.objects.filter(date=date, is_available=True).filter(
+            Q(start_minute__isnull=True) | Q(start_minute__lte=start_minute, end_minute__gte=end_minute)
+        ).values('volunteer_id')
+        condition &= (Q(id__in=weekly) | Q(id__in=extra)) & ~Q(id__in=_away(date, start_minute, end_minute))
+    return condition
+
+
+def unrecorded_condition(start=None, end=None):
+    # Volunteers without weekly windows; given a range, minus anyone who has
+    # said they are away during it.
+    condition = ~Q(id__in=AvailabilityWindow.objects.values('volunteer_id'))
+    if start is not None:
+        for date, start_minute, end_minute in day_segments(start, end):
+            condition &= ~Q(id__in=_away(date, start_minute, end_minute))
+    return condition
+
+
+def available_between(queryset, start, end, include_unrecorded=False):
+    condition = availability_condition(start, end)
+    if include_unrecorded:
+        condition |= unrecorded_condition(start, end)
+    return queryset.filter(condition)
+
+
+def available_for_event(queryset, event, include_unrecorded=False):
+    return available_between(queryset, event.start_datetime, event.end_datetime, include_unrecorded)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+from volunteers import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text volunteer search index from the volunteer and user tables.'
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('The volunteer search index is only available on SQLite; other backends use icontains filters.')
+
+        indexed = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} volunteers.'))
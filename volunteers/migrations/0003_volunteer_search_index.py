@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS volunteers_volunteer_search USING fts5("
+        "name, email, skills, interests, availability, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO volunteers_volunteer_search(rowid, name, email, skills, interests, availability) "
+        "SELECT v.id, u.first_name || ' ' || u.last_name, u.email, v.skills, v.interests, v.availability "
+        "FROM volunteers_volunteer v JOIN accounts_user u ON u.id = v.user_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS volunteers_volunteer_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_assigned_ministry_user_is_suspended'),
+        ('volunteers', '0002_volunteer_supporting_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volunteers', '0003_volunteer_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='volunteer',
+            index=models.Index(fields=['date_joined', 'id'], name='volunteers_joined_id_idx'),
+        ),
+    ]
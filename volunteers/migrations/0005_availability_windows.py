@@ -0,0 +1,184 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:04
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# A frozen copy of volunteers.availability.parse_availability as of this
+# migration, so later changes to the parser or the models cannot change what
+# it does.
+MINUTES_PER_DAY = 24 * 60
+
+DAY_NAMES = {
+    'monday': 0, 'mon': 0,
+    'tuesday': 1, 'tues': 1, 'tue': 1,
+    'wednesday': 2, 'wed': 2,
+    'thursday': 3, 'thurs': 3, 'thur': 3, 'thu': 3,
+    'friday': 4, 'fri': 4,
+    'saturday': 5, 'sat': 5,
+    'sunday': 6, 'sun': 6,
+}
+
+DAY_GROUPS = {
+    'weekday': (0, 1, 2, 3, 4),
+    'weekend': (5, 6),
+    'daily': tuple(range(7)),
+    'everyday': tuple(range(7)),
+    'every day': tuple(range(7)),
+    'any day': tuple(range(7)),
+    'anytime': tuple(range(7)),
+    'any time': tuple(range(7)),
+}
+
+PERIODS = {
+    'morning': (6 * 60, 12 * 60),
+    'afternoon': (12 * 60, 17 * 60),
+    'evening': (17 * 60, 22 * 60),
+    'night': (18 * 60, 23 * 60),
+}
+
+_DAY = '|'.join(sorted(DAY_NAMES, key=len, reverse=True))
+_CLOCK = r'(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?'
+
+_TOKEN = re.compile(
+    rf'(?P<day_range>\b(?:{_DAY})\b\s*(?:-|–|to|through|thru|until)\s*\b(?:{_DAY})\b)'
+    rf'|(?P<time_range>\b(?:from\s+)?{_CLOCK}\s*(?:-|–|to|until|till)\s*{_CLOCK})'
+    rf'|(?P<after>\b(?:after|from)\s+{_CLOCK})'
+    rf'|(?P<before>\b(?:before|until|till)\s+{_CLOCK})'
+    rf'|(?P<group>\b(?:{"|".join(DAY_GROUPS)})s?\b)'
+    rf'|(?P<day>\b(?:{_DAY})s?\b)'
+    rf'|(?P<period>\b(?:{"|".join(PERIODS)})s?\b)'
+)
+
+_RANGE = re.compile(rf'{_CLOCK}\s*(?:-|–|to|until|till)\s*{_CLOCK}')
+
+
+def _minutes(hour, minute, meridiem, default_meridiem=None):
+    hour, minute = int(hour), int(minute or 0)
+    meridiem = (meridiem or default_meridiem or '').replace('.', '')
+    if meridiem == 'pm' and hour < 12:
+        hour += 12
+    elif meridiem == 'am' and hour == 12:
+        hour = 0
+    return min(hour * 60 + minute, MINUTES_PER_DAY)
+
+
+def _time_range(match):
+    start_h, start_m, start_mer, end_h, end_m, end_mer = match.groups()
+    start = _minutes(start_h, start_m, start_mer, end_mer if int(start_h) <= int(end_h) else None)
+    end = _minutes(end_h, end_m, end_mer)
+    if not start_mer and not end_mer and end <= start:
+        end = min(end + 12 * 60, MINUTES_PER_DAY)
+    return start, end
+
+
+def parse_availability(text):
+    # Best-effort reading of free-text availability such as "weekends",
+    # "Mon-Fri after 5pm" or "Saturday mornings and Sunday 2-6pm". Days and
+    # times are collected left to right; a day mentioned after a time starts a
+    # new group. Days without a time mean the whole day, times without a day
+    # mean every day. Returns merged (weekday, start_minute, end_minute) tuples.
+    groups = []
+    days, times = [], []
+    for match in _TOKEN.finditer((text or '').lower()):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind in ('day_range', 'group', 'day'):
+            if days and times:
+                groups.append((days, times))
+                days, times = [], []
+            if kind == 'day_range':
+                first, last = (DAY_NAMES[name] for name in re.findall(_DAY, value)[:2])
+                days.extend((first + offset) % 7 for offset in range((last - first) % 7 + 1))
+            elif kind == 'group':
+                days.extend(DAY_GROUPS[value if value in DAY_GROUPS else value[:-1]])
+            else:
+                days.append(DAY_NAMES[value if value in DAY_NAMES else value[:-1]])
+        elif kind == 'time_range':
+            times.append(_time_range(_RANGE.search(value)))
+        elif kind == 'after':
+            clock = re.search(_CLOCK, value)
+            times.append((_minutes(*clock.groups(), default_meridiem='pm'), MINUTES_PER_DAY))
+        elif kind == 'before':
+            clock = re.search(_CLOCK, value)
+            times.append((0, _minutes(*clock.groups())))
+        else:
+            times.append(PERIODS[value if value in PERIODS else value[:-1]])
+    if days or times:
+        groups.append((days, times))
+
+    windows = set()
+    for days, times in groups:
+        for weekday in days or range(7):
+            for start, end in times or [(0, MINUTES_PER_DAY)]:
+                if end > start:
+                    windows.add((weekday, start, end))
+                elif end < start:
+                    # Runs past midnight into the next day.
+                    windows.add((weekday, start, MINUTES_PER_DAY))
+                    windows.add(((weekday + 1) % 7, 0, end))
+    return merge_windows(windows)
+
+
+def merge_windows(windows):
+    merged = []
+    for weekday, start, end in sorted(windows):
+        if merged and merged[-1][0] == weekday and start <= merged[-1][2]:
+            merged[-1] = (weekday, merged[-1][1], max(end, merged[-1][2]))
+        else:
+            merged.append((weekday, start, end))
+    return merged
+
+
+
+def parse_existing_availability(apps, schema_editor):
+    Volunteer = apps.get_model('volunteers', 'Volunteer')
+    AvailabilityWindow = apps.get_model('volunteers', 'AvailabilityWindow')
+    windows = [
+        AvailabilityWindow(volunteer_id=volunteer_id, weekday=weekday, start_minute=start, end_minute=end)
+        for volunteer_id, text in Volunteer.objects.values_list('id', 'availability').iterator()
+        for weekday, start, end in parse_availability(text)
+    ]
+    AvailabilityWindow.objects.bulk_create(windows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volunteers', '0004_keyset_pagination_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilityException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('is_available', models.BooleanField(default=False, help_text='Unchecked: away on this date. Checked: available outside the weekly windows.')),
+                ('start_minute', models.PositiveSmallIntegerField(blank=True, help_text='Leave empty for the whole day', null=True)),
+                ('end_minute', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('volunteer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_exceptions', to='volunteers.volunteer')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['date', 'is_available'], name='volunteers__date_28bc80_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AvailabilityWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_minute', models.PositiveSmallIntegerField(help_text='Minutes after midnight')),
+                ('end_minute', models.PositiveSmallIntegerField(help_text='Minutes after midnight; 1440 means end of day')),
+                ('volunteer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_windows', to='volunteers.volunteer')),
+            ],
+            options={
+                'ordering': ['weekday', 'start_minute'],
+                'indexes': [models.Index(fields=['weekday', 'start_minute', 'end_minute'], name='volunteers__weekday_336fd0_idx')],
+            },
+        ),
+        migrations.RunPython(parse_existing_availability, migrations.RunPython.noop),
+    ]
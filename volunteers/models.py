@@ -23,3 +23,44 @@ class Volunteer(models.Model):
     
     class Meta:
         ordering = ['-date_joined']
+        indexes = [models.Index(fields=['date_joined', 'id'], name='volunteers_joined_id_idx')]
+
+
+class AvailabilityWindow(models.Model):
+    WEEKDAY_CHOICES = (
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    )
+    
+    volunteer = models.ForeignKey(Volunteer, on_delete=models.CASCADE, related_name='availability_windows')
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_minute = models.PositiveSmallIntegerField(help_text='Minutes after midnight')
+    end_minute = models.PositiveSmallIntegerField(help_text='Minutes after midnight; 1440 means end of day')
+    
+    class Meta:
+        ordering = ['weekday', 'start_minute']
+        indexes = [models.Index(fields=['weekday', 'start_minute', 'end_minute'])]
+    
+    def __str__(self):
+        return f"{self.volunteer} - {self.get_weekday_display()} {self.start_minute // 60:02d}:{self.start_minute % 60:02d}-{self.end_minute // 60:02d}:{self.end_minute % 60:02d}"
+
+
+class AvailabilityException(models.Model):
+    volunteer = models.ForeignKey(Volunteer, on_delete=models.CASCADE, related_name='availability_exceptions')
+    date = models.DateField()
+    is_available = models.BooleanField(default=False, help_text='Unchecked: away on this date. Checked: available outside the weekly windows.')
+    start_minute = models.PositiveSmallIntegerField(null=True, blank=True, help_text='Leave empty for the whole day')
+    end_minute = models.PositiveSmallIntegerField(null=True, blank=True)
+    note = models.CharField(max_length=200, blank=True)
+    
+    class Meta:
+        ordering = ['date']
+        indexes = [models.Index(fields=['date', 'is_available'])]
+    
+    def __str__(self):
+        return f"{self.volunteer} - {self.date} ({'available' if self.is_available else 'away'})"
@@ -0,0 +1,102 @@
+import re
+from django.db import connection
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+from accounts.models import User
+from .models import Volunteer
+
+SEARCH_TABLE = 'volunteers_volunteer_search'
+
+# bm25() weights, in column order: name, email, skills, interests, availability.
+COLUMN_WEIGHTS = (10.0, 5.0, 3.0, 1.0, 1.0)
+
+_INDEX_COLUMNS = '(rowid, name, email, skills, interests, availability)'
+
+_INDEX_SELECT = f"""
+    SELECT v.id, u.first_name || ' ' || u.last_name, u.email, v.skills, v.interests, v.availability
+    FROM {Volunteer._meta.db_table} v
+    JOIN {User._meta.db_table} u ON u.id = v.user_id
+"""
+
+
+def is_supported():
+    return connection.vendor == 'sqlite'
+
+
+def index_volunteer(volunteer_id=None, user_id=None):
+    if not is_supported():
+        return
+    if user_id is not None:
+        where, param = 'v.user_id = %s', user_id
+    else:
+        where, param = 'v.id = %s', volunteer_id
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE}{_INDEX_COLUMNS} {_INDEX_SELECT} WHERE {where}",
+            [param],
+        )
+
+
+def remove_volunteer(volunteer_id):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [volunteer_id])
+
+
+def rebuild_index():
+    if not is_supported():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}{_INDEX_COLUMNS} {_INDEX_SELECT}")
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def build_match_query(text):
+    # Every term must match (implicit AND) as a prefix in any column. Terms are
+    # quoted so FTS5 operators typed into the search box are treated as text.
+    terms = re.findall(r'\w+', text)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def fallback_filter(queryset, text):
+    return queryset.filter(
+        Q(user__first_name__icontains=text) |
+        Q(user__last_name__icontains=text) |
+        Q(user__email__icontains=text) |
+        Q(skills__icontains=text)
+    )
+
+
+class SearchRank(Func):
+    # bm25() of each row's index entry, correlated on the primary key through
+    # the ORM so the column follows whatever alias the query gives the table
+    # (e.g. U0 inside a subquery).
+    output_field = FloatField()
+
+    def __init__(self, match):
+        super().__init__(F('pk'), Value(match))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        pk, match = self.get_source_expressions()
+        pk_sql, pk_params = compiler.compile(pk)
+        match_sql, match_params = compiler.compile(match)
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        sql = (
+            f"(SELECT bm25({SEARCH_TABLE}, {weights}) FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH {match_sql} AND rowid = {pk_sql})"
+        )
+        return sql, [*match_params, *pk_params]
+
+
+def search(queryset, text):
+    match = build_match_query(text)
+    if not is_supported() or not match:
+        return fallback_filter(queryset, text)
+
+    return queryset.filter(
+        id__in=RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match])
+    ).annotate(search_rank=SearchRank(match)).order_by('search_rank', '-date_joined')
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from .models import Volunteer
+from . import availability, search
+
+
+@receiver(post_save, sender=Volunteer, dispatch_uid='volunteer_search_index_save')
+def index_volunteer_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_volunteer(volunteer_id=instance.pk)
+
+
+@receiver(post_delete, sender=Volunteer, dispatch_uid='volunteer_search_index_delete')
+def remove_volunteer_on_delete(sender, instance, **kwargs):
+    search.remove_volunteer(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid='volunteer_search_index_user_save')
+def index_volunteer_on_user_save(sender, instance, created, raw=False, **kwargs):
+    # A brand-new user cannot have a volunteer profile yet.
+    if not raw and not created:
+        search.index_volunteer(user_id=instance.pk)
+
+
+@receiver(post_init, sender=Volunteer, dispatch_uid='volunteer_availability_snapshot')
+def snapshot_availability(sender, instance, **kwargs):
+    # Read through __dict__ so a deferred field isn't fetched for every row.
+    instance._availability_text = instance.__dict__.get('availability')
+
+
+@receiver(post_save, sender=Volunteer, dispatch_uid='volunteer_availability_sync')
+def sync_availability_windows(sender, instance, created, raw=False, **kwargs):
+    # Weekly windows are derived from the free-text field until volunteers can
+    # edit them directly, so only re-parse when that text changes.
+    if raw or (not created and instance.availability == instance._availability_text):
+        return
+    availability.sync_windows(instance)
+    instance._availability_text = instance.availability
@@ -1,3 +1,163 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
+from django.db import connection
+from django.db.models import OuterRef, Subquery
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from ccvms.testing import QueryCountMixin
+from ministries.models import Ministry
+from . import search
+from .availability import available_between, parse_availability
+from .models import AvailabilityException, Volunteer
 
-# Create your tests here.
+
+@override_settings(AUDIT_ASYNC=False)
+class VolunteerViewQueryTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', role='administrator')
+        user = User.objects.create_user('volunteer', role='volunteer')
+        self.volunteer = Volunteer.objects.create(user=user, gender='F', age=30)
+        self.client.force_login(self.admin)
+    
+    def test_detail_edit_and_delete_load_the_volunteer_once(self):
+        for name in ('detail', 'edit', 'delete'):
+            with self.subTest(name):
+                self.assertReads(reverse(f'volunteers:{name}', args=[self.volunteer.pk]), Volunteer)
+
+
+class AvailabilityParserTests(SimpleTestCase):
+    def test_days_and_times(self):
+        self.assertEqual(parse_availability('weekends'), [(5, 0, 1440), (6, 0, 1440)])
+        self.assertEqual(
+            parse_availability('Saturday mornings and Sunday 2-6pm'),
+            [(5, 360, 720), (6, 840, 1080)],
+        )
+        self.assertEqual(parse_availability('Mon-Wed after 5pm'), [(day, 1020, 1440) for day in range(3)])
+        self.assertEqual(parse_availability(''), [])
+    
+    def test_an_end_without_am_or_pm_follows_the_start(self):
+        cases = {
+            'Monday 10am-2': (600, 840),
+            'Monday 10-2': (600, 840),
+            'Monday 9-5': (540, 1020),
+            'Monday 10am-12': (600, 720),
+            'Monday 9pm-11': (1260, 1380),
+            # Nothing later the same day, so it ends at midnight.
+            'Monday 11pm-2': (1380, 1440),
+        }
+        for text, (start, end) in cases.items():
+            with self.subTest(text):
+                self.assertEqual(parse_availability(text), [(0, start, end)])
+    
+    def test_only_an_explicit_end_runs_past_midnight(self):
+        self.assertEqual(parse_availability('Friday 10pm-2am'), [(4, 1320, 1440), (5, 0, 120)])
+
+
+@override_settings(AUDIT_ASYNC=False)
+class AvailabilityQueryTests(TestCase):
+    def setUp(self):
+        # 2030-01-07 is a Monday.
+        self.day = datetime.date(2030, 1, 7)
+        self.start = timezone.make_aware(datetime.datetime(2030, 1, 7, 10))
+        self.end = self.start + datetime.timedelta(hours=2)
+        self.volunteers = {
+            name: self.make_volunteer(name, availability)
+            for name, availability in [
+                ('free', 'Mondays 9am-5pm'),
+                ('free_but_away', 'Mondays 9am-5pm'),
+                ('evenings', 'Mondays after 6pm'),
+                ('evenings_but_extra', 'Mondays after 6pm'),
+                ('unrecorded', ''),
+                ('unrecorded_but_away', ''),
+                ('unrecorded_away_later', ''),
+            ]
+        }
+        self.exception('free_but_away', is_available=False)
+        self.exception('evenings_but_extra', is_available=True)
+        self.exception('unrecorded_but_away', is_available=False, start_minute=11 * 60, end_minute=13 * 60)
+        self.exception('unrecorded_away_later', is_available=False, start_minute=12 * 60, end_minute=13 * 60)
+    
+    def make_volunteer(self, name, availability):
+        user = User.objects.create_user(name, role='volunteer')
+        return Volunteer.objects.create(user=user, gender='F', age=30, availability=availability)
+    
+    def exception(self, name, **kwargs):
+        AvailabilityException.objects.create(volunteer=self.volunteers[name], date=self.day, **kwargs)
+    
+    def available(self, include_unrecorded):
+        queryset = available_between(Volunteer.objects.all(), self.start, self.end, include_unrecorded)
+        return set(queryset.values_list('user__username', flat=True))
+    
+    def test_weekly_windows_and_exceptions(self):
+        self.assertEqual(self.available(False), {'free', 'evenings_but_extra'})
+    
+    def test_unrecorded_volunteers_who_are_away_are_left_out(self):
+        self.assertEqual(
+            self.available(True),
+            {'free', 'evenings_but_extra', 'unrecorded', 'unrecorded_away_later'},
+        )
+
+
+@override_settings(AUDIT_ASYNC=False)
+class VolunteerSearchTests(TestCase):
+    def setUp(self):
+        self.carol = self.make_volunteer('carol', 'Carol', 'Reyes', skills='Cooking', interests='')
+        self.dan = self.make_volunteer('dan', 'Dan', 'Okafor', skills='Singing, guitar', interests='')
+        self.erin = self.make_volunteer('erin', 'Erin', 'Walsh', skills='', interests='Carols at Christmas')
+    
+    def make_volunteer(self, username, first_name, last_name, **fields):
+        user = User.objects.create_user(
+            username, role='volunteer', first_name=first_name, last_name=last_name, email=f'{username}@example.com',
+        )
+        return Volunteer.objects.create(user=user, gender='F', age=30, availability='', **fields)
+    
+    def find(self, text, queryset=None):
+        return list(search.search(queryset or Volunteer.objects.all(), text))
+    
+    def indexed(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid FROM {search.SEARCH_TABLE}')
+            return {row[0] for row in cursor.fetchall()}
+    
+    def test_prefix_terms_all_have_to_match(self):
+        self.assertEqual(self.find('sing'), [self.dan])
+        self.assertEqual(self.find('gui sin'), [self.dan])
+        self.assertEqual(self.find('guitar cooking'), [])
+        # FTS5 syntax typed into the box is plain text.
+        self.assertEqual(self.find('sing OR "'), [])
+    
+    def test_name_matches_rank_above_interests(self):
+        self.assertEqual(self.find('carol'), [self.carol, self.erin])
+    
+    def test_index_follows_saves_and_deletes(self):
+        self.dan.skills = 'Baking'
+        self.dan.save()
+        self.assertEqual(self.find('sing'), [])
+        self.assertEqual(self.find('bak'), [self.dan])
+        
+        self.carol.user.last_name = 'Nguyen'
+        self.carol.user.save()
+        self.assertEqual(self.find('nguyen'), [self.carol])
+        
+        self.erin.delete()
+        self.assertNotIn(self.erin.pk, self.indexed())
+        self.assertEqual(self.find('carol'), [self.carol])
+        self.assertEqual(self.indexed(), {self.carol.pk, self.dan.pk})
+    
+    def test_rank_follows_the_table_alias(self):
+        # Inside a subquery the volunteers table is aliased, so the bm25()
+        # correlation must not name the table directly.
+        choir = Ministry.objects.create(name='Choir', description='')
+        choir.volunteers.add(self.dan, self.erin)
+        best = search.search(Volunteer.objects.filter(ministries=OuterRef('pk')), 'carol')
+        ministry = Ministry.objects.annotate(best=Subquery(best.values('pk')[:1])).get()
+        self.assertEqual(ministry.best, self.erin.pk)
+    
+    def test_falls_back_to_icontains(self):
+        with mock.patch.object(search, 'is_supported', return_value=False):
+            self.assertEqual(self.find('INGING'), [self.dan])
+            self.assertEqual(set(self.find('@example')), {self.carol, self.dan, self.erin})
+        # No searchable terms at all.
+        self.assertEqual(self.find('-'), [])
@@ -1,14 +1,18 @@
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
-from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
 from django.views import View
+from ccvms.mixins import CachedObjectMixin
+from ccvms.pagination import KeysetPaginationMixin
+from audit.writer import record
+from communications.notifications import notify_approval
 from .models import Volunteer
 from .forms import VolunteerForm
+from . import search
 
-class VolunteerListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class VolunteerListView(LoginRequiredMixin, UserPassesTestMixin, KeysetPaginationMixin, ListView):
     model = Volunteer
     template_name = 'volunteers/list.html'
     context_object_name = 'volunteers'
@@ -19,27 +23,22 @@ class VolunteerListView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     
     def get_queryset(self):
         queryset = super().get_queryset()
-        user = self.request.user
+        scope = self.request.scope
         
-        if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
-            if ministry:
-                queryset = queryset.filter(ministries=ministry)
+        if scope.is_ministry_staff:
+            if scope.ministry:
+                queryset = queryset.filter(ministries=scope.ministry)
             else:
                 queryset = queryset.none()
         
-        search = self.request.GET.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search) |
-                Q(user__email__icontains=search) |
-                Q(skills__icontains=search)
-            )
+        query = self.request.GET.get('search')
+        if query:
+            queryset = search.search(queryset, query)
         return queryset
 
-class VolunteerDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+class VolunteerDetailView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, DetailView):
     model = Volunteer
+    select_related = ('user',)
     template_name = 'volunteers/detail.html'
     context_object_name = 'volunteer'
     
@@ -54,9 +53,7 @@ class VolunteerDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
             return volunteer.user == user
         
         if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
-            if ministry:
-                return volunteer.ministries.filter(id=ministry.id).exists()
+            return self.request.scope.manages_volunteer(volunteer)
         
         return False
 
@@ -71,24 +68,22 @@ class VolunteerCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     
     def get_form(self, form_class=None):
         form = super().get_form(form_class)
-        user = self.request.user
+        scope = self.request.scope
         
-        if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
-            if ministry:
-                from ministries.models import Ministry
-                form.fields['ministries'].queryset = Ministry.objects.filter(id=ministry.id)
+        if scope.is_ministry_staff:
+            from ministries.models import Ministry
+            if scope.ministry:
+                form.fields['ministries'].queryset = Ministry.objects.filter(id=scope.ministry.id)
             else:
-                from ministries.models import Ministry
                 form.fields['ministries'].queryset = Ministry.objects.none()
         
         return form
     
     def form_valid(self, form):
-        user = self.request.user
+        scope = self.request.scope
         
-        if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
+        if scope.is_ministry_staff:
+            ministry = scope.ministry
             if not ministry:
                 messages.error(self.request, 'You must be assigned to a ministry to create volunteers.')
                 return self.form_invalid(form)
@@ -101,8 +96,9 @@ class VolunteerCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         
         return super().form_valid(form)
 
-class VolunteerUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class VolunteerUpdateView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, UpdateView):
     model = Volunteer
+    select_related = ('user',)
     form_class = VolunteerForm
     template_name = 'volunteers/form.html'
     success_url = reverse_lazy('volunteers:list')
@@ -115,32 +111,28 @@ class VolunteerUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
             return True
         
         if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
-            if ministry:
-                return volunteer.ministries.filter(id=ministry.id).exists()
+            return self.request.scope.manages_volunteer(volunteer)
         
         return False
     
     def get_form(self, form_class=None):
         form = super().get_form(form_class)
-        user = self.request.user
+        scope = self.request.scope
         
-        if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
-            if ministry:
-                from ministries.models import Ministry
-                form.fields['ministries'].queryset = Ministry.objects.filter(id=ministry.id)
+        if scope.is_ministry_staff:
+            from ministries.models import Ministry
+            if scope.ministry:
+                form.fields['ministries'].queryset = Ministry.objects.filter(id=scope.ministry.id)
             else:
-                from ministries.models import Ministry
                 form.fields['ministries'].queryset = Ministry.objects.none()
         
         return form
     
     def form_valid(self, form):
-        user = self.request.user
+        scope = self.request.scope
         
-        if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
+        if scope.is_ministry_staff:
+            ministry = scope.ministry
             if not ministry:
                 messages.error(self.request, 'You must be assigned to a ministry.')
                 return self.form_invalid(form)
@@ -153,8 +145,9 @@ class VolunteerUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         
         return super().form_valid(form)
 
-class VolunteerDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class VolunteerDeleteView(LoginRequiredMixin, UserPassesTestMixin, CachedObjectMixin, DeleteView):
     model = Volunteer
+    select_related = ('user',)
     template_name = 'volunteers/confirm_delete.html'
     success_url = reverse_lazy('volunteers:list')
     
@@ -166,9 +159,7 @@ class VolunteerDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
             return True
         
         if user.is_coordinator() or user.is_priest():
-            ministry = user.get_managed_ministry()
-            if ministry:
-                return volunteer.ministries.filter(id=ministry.id).exists()
+            return self.request.scope.manages_volunteer(volunteer)
         
         return False
 
@@ -177,18 +168,18 @@ class VolunteerApproveView(LoginRequiredMixin, UserPassesTestMixin, View):
         return self.request.user.can_approve_volunteers()
     
     def post(self, request, pk):
-        volunteer = get_object_or_404(Volunteer, pk=pk)
-        user = request.user
+        volunteer = get_object_or_404(Volunteer.objects.select_related('user'), pk=pk)
         
-        if user.is_priest():
-            ministry = user.get_managed_ministry()
-            if not ministry or not volunteer.ministries.filter(id=ministry.id).exists():
+        if request.user.is_priest():
+            if not request.scope.manages_volunteer(volunteer):
                 messages.error(request, 'You can only approve volunteers within your ministry.')
                 return redirect('volunteers:list')
         
         volunteer.user.approval_status = 'approved'
         volunteer.user.is_active = True
         volunteer.user.save()
+        record('approve', f'Approved volunteer {volunteer.user.username}', obj=volunteer.user, request=request)
+        notify_approval(volunteer.user, approved=True)
         messages.success(request, f'{volunteer.user.get_full_name()} has been approved and can now log in.')
         return redirect('volunteers:list')
 
@@ -197,17 +188,17 @@ class VolunteerRejectView(LoginRequiredMixin, UserPassesTestMixin, View):
         return self.request.user.can_approve_volunteers()
     
     def post(self, request, pk):
-        volunteer = get_object_or_404(Volunteer, pk=pk)
-        user = request.user
+        volunteer = get_object_or_404(Volunteer.objects.select_related('user'), pk=pk)
         
-        if user.is_priest():
-            ministry = user.get_managed_ministry()
-            if not ministry or not volunteer.ministries.filter(id=ministry.id).exists():
+        if request.user.is_priest():
+            if not request.scope.manages_volunteer(volunteer):
                 messages.error(request, 'You can only reject volunteers within your ministry.')
                 return redirect('volunteers:list')
         
         volunteer.user.approval_status = 'rejected'
         volunteer.user.is_active = False
         volunteer.user.save()
+        record('reject', f'Rejected volunteer {volunteer.user.username}', obj=volunteer.user, request=request)
+        notify_approval(volunteer.user, approved=False)
         messages.warning(request, f'{volunteer.user.get_full_name()} has been rejected.')
         return redirect('volunteers:list')